@@ -0,0 +1,286 @@
+"""
+Benchmark of the fracability pipeline on seeded synthetic networks.
+
+The synthetic networks are made of two fracture sets with uniformly distributed centers and lognormal lengths
+(built with general_use.centers_to_lines) in a square boundary whose side grows with the number of traces so that
+the fracture density is the same for all the sizes.
+
+For each size the stages of the pipeline are timed (best of --repeat runs) and the peak memory allocated by each
+stage is measured in a separate run with tracemalloc (memory allocated through the Python allocators, numpy
+included). The results are written to a json file and compared with a stored baseline, flagging the stages
+slower (or using more memory) than the baseline by more than the given tolerance.
+
+The stored baseline is machine specific: regenerate it with --save-baseline on the machine used for the
+comparisons.
+
+Examples:
+    python benchmark_pipeline.py --sizes 100 1000 10000
+    python benchmark_pipeline.py --sizes 100 1000 10000 100000 1000000 --repeat 1 --output results.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+from geopandas import GeoDataFrame
+from shapely.geometry import box
+
+import fracability
+from fracability.Entities import FractureNetwork, Fractures, Boundary
+from fracability.Statistics import NetworkFitter
+from fracability.operations import Geometry, Topology
+from fracability.utils.general_use import centers_to_lines, vtk_regions_to_lines, shp2vtk, KM
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+STAGES = ['shp2vtk', 'tidy_intersections', 'nodes_conn', 'calculate_backbone', 'KM', 'NetworkFitter.fit',
+          'GOF_distances']
+
+
+def synthetic_network(n_traces: int, seed: int = 0, mean_spacing: float = 1.0) -> FractureNetwork:
+    """
+    Create a seeded synthetic fracture network.
+
+    :param n_traces: Number of fractures
+    :param seed: Seed of the random generator. Default is 0
+    :param mean_spacing: Mean distance between the fracture centers. Default is 1
+    :return: FractureNetwork with two fracture sets and a square boundary
+    """
+
+    rng = np.random.default_rng(seed)
+    side = np.sqrt(n_traces) * mean_spacing
+
+    centers = np.column_stack((rng.uniform(0, side, n_traces), rng.uniform(0, side, n_traces), np.zeros(n_traces)))
+    lengths = rng.lognormal(mean=0, sigma=0.5, size=n_traces) * mean_spacing
+    sets = rng.integers(1, 3, n_traces)
+    directions = np.where(sets == 1, rng.normal(30, 10, n_traces), rng.normal(120, 10, n_traces)) % 360
+
+    lines = centers_to_lines(centers, lengths, directions)
+    _, geometry = vtk_regions_to_lines(lines, lines['RegionId'])
+
+    gdf = GeoDataFrame({'f_set': sets}, geometry=geometry)
+
+    fracture_network = FractureNetwork()
+    for set_n in [1, 2]:
+        fracture_network.add_fractures(Fractures(gdf=gdf.loc[gdf['f_set'] == set_n].reset_index(drop=True),
+                                                 set_n=set_n))
+    fracture_network.add_boundaries(Boundary(gdf=GeoDataFrame(geometry=[box(0, 0, side, side)]), group_n=1))
+
+    return fracture_network
+
+
+def run_pipeline(fracture_network: FractureNetwork, measure) -> dict:
+    """
+    Run the stages of the pipeline on a fracture network.
+
+    :param fracture_network: FractureNetwork object (modified in place)
+    :param measure: Function measure(function) that runs the function and returns (result, measurement)
+    :return: Dictionary {stage: measurement}
+    """
+
+    results = dict()
+
+    _, results['shp2vtk'] = measure(lambda: shp2vtk(fracture_network.fractures.entity_df))
+
+    _, results['tidy_intersections'] = measure(lambda: Geometry.tidy_intersections(fracture_network))
+
+    (nodes_dict, origin_dict), results['nodes_conn'] = measure(lambda: Topology.nodes_conn(fracture_network))
+    fracture_network.add_nodes_from_dict(nodes_dict, origin_dict=origin_dict)
+
+    _, results['calculate_backbone'] = measure(fracture_network.calculate_backbone)
+
+    entity_df = fracture_network.fractures.entity_df.sort_values(by='length')
+    lengths = entity_df['length'].values
+    delta = 1 - entity_df['censored'].values
+    _, results['KM'] = measure(lambda: KM(lengths, lengths, delta))
+
+    fitter = NetworkFitter(fracture_network)
+    _, results['NetworkFitter.fit'] = measure(lambda: fitter.fit('lognorm'))
+
+    distribution = fitter.get_fitted_distribution('lognorm')
+    _, results['GOF_distances'] = measure(lambda: (distribution.KS_distance, distribution.KG_distance,
+                                                   distribution.AD_distance))
+
+    return results
+
+
+def measure_time(function) -> tuple:
+    """Run the function and return its result and the elapsed time in seconds"""
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = function()
+
+    return result, time.perf_counter() - start
+
+
+def measure_memory(function) -> tuple:
+    """Run the function and return its result and the peak memory allocated while running it (in bytes)"""
+
+    tracemalloc.reset_peak()
+    start, _ = tracemalloc.get_traced_memory()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = function()
+
+    return result, tracemalloc.get_traced_memory()[1] - start
+
+
+def benchmark(sizes: list, repeat: int = 3, seed: int = 0, memory: bool = True) -> dict:
+    """
+    Benchmark the pipeline for the given network sizes.
+
+    :param sizes: List of the number of traces of the synthetic networks
+    :param repeat: Number of timed runs for each size (the best time is kept). Default is 3
+    :param seed: Seed used to generate the networks. Default is 0
+    :param memory: Measure the peak memory of each stage in an additional run. Default is True
+    :return: Dictionary with the machine information (meta), the results of each size and stage (results) and the
+     scaling exponent of the time of each stage with the number of traces (scaling)
+    """
+
+    results = []
+
+    run_pipeline(synthetic_network(min(sizes), seed), measure_time)  # warm up (imports and first calls)
+
+    for n_traces in sizes:
+        times = []
+        for _ in range(repeat):
+            times.append(run_pipeline(synthetic_network(n_traces, seed), measure_time))
+
+        peaks = dict()
+        if memory:
+            tracemalloc.start()
+            peaks = run_pipeline(synthetic_network(n_traces, seed), measure_memory)
+            tracemalloc.stop()
+
+        for stage in STAGES:
+            results.append({'n_traces': n_traces,
+                            'stage': stage,
+                            'time': min(run[stage] for run in times),
+                            'peak_memory': peaks.get(stage)})
+
+        print(f'{n_traces} traces: ' + ', '.join(f'{stage} {min(run[stage] for run in times):.4f}s'
+                                                 for stage in STAGES))
+
+    return {'meta': {'date': datetime.now().isoformat(timespec='seconds'),
+                     'fracability': fracability.__version__,
+                     'python': platform.python_version(),
+                     'numpy': np.__version__,
+                     'platform': platform.platform(),
+                     'processor': platform.processor(),
+                     'seed': seed,
+                     'repeat': repeat},
+            'results': results,
+            'scaling': scaling_exponents(results)}
+
+
+def scaling_exponents(results: list) -> dict:
+    """
+    Fit the exponent b of time = a * n_traces^b for each stage (slope of the log-log scaling curve).
+
+    :param results: List of results of benchmark
+    :return: Dictionary {stage: exponent} (None if less than two sizes are available)
+    """
+
+    exponents = dict()
+
+    for stage in STAGES:
+        stage_results = [r for r in results if r['stage'] == stage and r['time'] > 0]
+        if len(stage_results) < 2:
+            exponents[stage] = None
+        else:
+            n_traces = np.log([r['n_traces'] for r in stage_results])
+            times = np.log([r['time'] for r in stage_results])
+            exponents[stage] = float(np.polyfit(n_traces, times, 1)[0])
+
+    return exponents
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.25, min_time: float = 0.01) -> list:
+    """
+    Compare the results with a baseline.
+
+    :param current: Results of benchmark
+    :param baseline: Results of benchmark used as reference
+    :param tolerance: Relative increase of time or memory above which a stage is flagged as a regression.
+     Default is 0.25
+    :param min_time: Minimum increase of time (in seconds) flagged as a regression, used to ignore the noise of
+     very fast stages. Default is 0.01
+    :return: List with a dictionary for each size and stage present in both results, with the time and memory
+     ratios (current/baseline) and the regression flag
+    """
+
+    reference = {(r['n_traces'], r['stage']): r for r in baseline['results']}
+    comparison = []
+
+    for r in current['results']:
+        key = (r['n_traces'], r['stage'])
+        if key not in reference:
+            continue
+
+        ref = reference[key]
+        time_ratio = r['time'] / ref['time'] if ref['time'] > 0 else None
+        memory_ratio = None
+        if r['peak_memory'] is not None and ref['peak_memory']:
+            memory_ratio = r['peak_memory'] / ref['peak_memory']
+
+        slower = time_ratio is not None and time_ratio > 1 + tolerance and r['time'] - ref['time'] > min_time
+        larger = memory_ratio is not None and memory_ratio > 1 + tolerance
+
+        comparison.append({'n_traces': r['n_traces'], 'stage': r['stage'], 'time_ratio': time_ratio,
+                           'memory_ratio': memory_ratio, 'regression': slower or larger})
+
+    return comparison
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the fracability pipeline on synthetic networks.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000],
+                        help='Number of traces of the synthetic networks')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of timed runs for each size')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic networks')
+    parser.add_argument('--no-memory', action='store_true', help='Do not measure the peak memory')
+    parser.add_argument('--output', default='benchmark_results.json', help='Path of the output json file')
+    parser.add_argument('--baseline', default=BASELINE, help='Path of the baseline json file')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Relative increase of time or memory flagged as a regression')
+    parser.add_argument('--min-time', type=float, default=0.01,
+                        help='Minimum increase of time (in seconds) flagged as a regression')
+    parser.add_argument('--save-baseline', action='store_true', help='Save the results as the new baseline')
+    args = parser.parse_args(argv)
+
+    current = benchmark(args.sizes, args.repeat, args.seed, not args.no_memory)
+
+    regressions = []
+    if os.path.isfile(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        current['comparison'] = compare(current, baseline, args.tolerance, args.min_time)
+
+        print(f'\n{"n_traces":>10} {"stage":>20} {"time":>8} {"memory":>8}')
+        for c in current['comparison']:
+            time_ratio = f'{c["time_ratio"]:.2f}' if c['time_ratio'] is not None else '-'
+            memory_ratio = f'{c["memory_ratio"]:.2f}' if c['memory_ratio'] is not None else '-'
+            flag = '  REGRESSION' if c['regression'] else ''
+            print(f'{c["n_traces"]:>10} {c["stage"]:>20} {time_ratio:>8} {memory_ratio:>8}{flag}')
+
+        regressions = [c for c in current['comparison'] if c['regression']]
+
+    output = args.baseline if args.save_baseline else args.output
+    with open(output, 'w') as f:
+        json.dump(current, f, indent=2)
+    print(f'\nResults saved in {output}')
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
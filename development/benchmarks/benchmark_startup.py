@@ -0,0 +1,114 @@
+"""
+Benchmark of the import time of the fracability modules.
+
+Each module is imported in a fresh interpreter (best of --repeat runs) and the import time, the maximum resident
+memory of the process and the heavy optional modules loaded by the import are recorded. The plotting, clipboard
+and reporting dependencies must be loaded only when first used: the benchmark fails if a module imports one of
+the modules listed in FORBIDDEN or if it is slower than the given time limit.
+
+Note that the modules importing pyvista (e.g. Entities) load matplotlib and scooby through pyvista itself, so for
+them only the modules that fracability loads directly are checked.
+
+Examples:
+    python benchmark_startup.py
+    python benchmark_startup.py --modules fracability.Statistics --max-time 1.5 --repeat 10
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'time': elapsed,
+                  'max_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  'loaded': [name for name in {checked!r} if name in sys.modules]}}))
+"""
+
+# Modules that must not be loaded by the import of each fracability module
+FORBIDDEN = {'fracability.Statistics': ['matplotlib', 'seaborn', 'ternary', 'scooby', 'pyperclip', 'pyvista',
+                                        'vtkmodules', 'fracability.Plotters'],
+             'fracability.Entities': ['seaborn', 'ternary', 'pyperclip', 'fracability.Plotters'],
+             'fracability.Adapters': ['seaborn', 'ternary', 'pyperclip', 'fracability.Plotters'],
+             'fracability.utils.general_use': ['matplotlib', 'seaborn', 'ternary', 'scooby', 'pyperclip',
+                                               'pyvista', 'vtkmodules']}
+
+# Maximum import time (in seconds) of each module
+MAX_TIME = {'fracability.Statistics': 1.0}
+
+
+def import_stats(module: str) -> dict:
+    """
+    Import a module in a fresh interpreter.
+
+    :param module: Name of the module
+    :return: Dictionary with the import time (in seconds), the maximum resident memory of the process (in KB on
+     Linux) and the list of the forbidden modules loaded
+    """
+
+    probe = PROBE.format(module=module, checked=FORBIDDEN.get(module, []))
+    process = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True)
+
+    if process.returncode != 0:
+        raise ImportError(f'Import of {module} failed:\n{process.stderr}')
+
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def benchmark(modules: list, repeat: int = 5) -> list:
+    """
+    Benchmark the import of the given modules.
+
+    :param modules: List of the names of the modules
+    :param repeat: Number of imports of each module (the best time is kept). Default is 5
+    :return: List with a dictionary for each module with the time, max_rss and the forbidden modules loaded
+    """
+
+    results = []
+
+    for module in modules:
+        runs = [import_stats(module) for _ in range(repeat)]
+
+        results.append({'module': module,
+                        'time': min(run['time'] for run in runs),
+                        'max_rss': min(run['max_rss'] for run in runs),
+                        'forbidden': runs[0]['loaded']})
+
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the import time of the fracability modules.')
+    parser.add_argument('--modules', nargs='+', default=list(FORBIDDEN), help='Modules to import')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of imports of each module')
+    parser.add_argument('--max-time', type=float, default=None,
+                        help='Maximum import time in seconds (overrides the default limits)')
+    parser.add_argument('--output', default=None, help='Path of the output json file')
+    args = parser.parse_args(argv)
+
+    results = benchmark(args.modules, args.repeat)
+
+    failed = False
+    print(f'{"module":>30} {"time":>8} {"max_rss":>10}  forbidden')
+    for r in results:
+        max_time = args.max_time if args.max_time is not None else MAX_TIME.get(r['module'])
+        slow = max_time is not None and r['time'] > max_time
+        failed = failed or slow or bool(r['forbidden'])
+
+        flag = f'  SLOWER THAN {max_time}s' if slow else ''
+        print(f'{r["module"]:>30} {r["time"]:>8.3f} {r["max_rss"]:>10}  {", ".join(r["forbidden"]) or "-"}{flag}')
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'\nResults saved in {args.output}')
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,12 +6,16 @@ from fracability.examples.data import QgisStyle
 
 from geopandas import GeoDataFrame
 from geopandas import read_file
+from pandas import Index
 from pyvista import PolyData
 from networkx import Graph
 import scipy.stats as ss
 import numpy as np
-from copy import deepcopy
-from shapely import remove_repeated_points
+from copy import copy, deepcopy
+from itertools import count
+from shapely import remove_repeated_points, boundary, get_type_id
+
+_cache_versions = count()  # Shared counter used to give a unique version to each state of the entities
 
 
 class BaseEntity(ABC):
@@ -44,6 +48,10 @@ class BaseEntity(ABC):
         """
 
         self._df: GeoDataFrame = GeoDataFrame()
+        self._cache_hits: int = 0
+        self._cache_misses: int = 0
+        self.clear_cache()
+
         if gdf is not None:
             self.entity_df = gdf
         elif csv is not None:
@@ -97,12 +105,76 @@ class BaseEntity(ABC):
 
         Notes
         -------
-        When the get method is applied the PolyData is build **on the fly** using the entity_df as a source.
+        When the get method is applied the PolyData is build using the entity_df as a source. The PolyData is
+        cached and rebuilt only when the entity_df is set (see clear_cache). A copy of the cached PolyData is
+        returned, so modifying it does not change the entity.
 
         When set the DataSet is **cast to a PolyData**.
         """
         pass
 
+    @property
+    def cache_info(self) -> dict:
+        """
+        Property used to return the hits and misses of the representation (vtk and network objects) cache
+        of the entity.
+
+        :return: Dictionary with the number of hits, misses and currently cached representations
+        """
+        return {'hits': self._cache_hits, 'misses': self._cache_misses, 'size': len(self._cache)}
+
+    @property
+    def cache_version(self) -> int:
+        """
+        Property used to return the version of the entity. A new version is given every time the cache is cleared
+        (i.e. when the entity_df is set). Versions are unique between different entities.
+        """
+        return self._cache_version
+
+    def clear_cache(self):
+        """
+        Clear the cached representations (vtk and network objects) of the entity.
+
+        Notes
+        -------
+        The cache is automatically cleared when the entity_df is set. If the entity_df is modified in place
+        (e.g. entity.entity_df.loc[...] = ...) this method must be called to rebuild the representations.
+        """
+        self._cache: dict = dict()
+        self._cache_version: int = next(_cache_versions)
+
+    def _cached(self, key, builder, copy: bool = False):
+        """
+        Internal method used to return the cached representation for the given key. If the representation is
+        not cached it is built using the builder function.
+
+        :param key: Hashable key of the representation
+        :param builder: Function without arguments used to build the representation
+        :param copy: Return a copy of the cached representation. Use it when the representation is mutable and
+                     handed out to the user, so that the cache cannot be modified through it. Default is False
+        :return: The cached representation (or its copy)
+        """
+        if key in self._cache:
+            self._cache_hits += 1
+        else:
+            self._cache_misses += 1
+            self._cache[key] = builder()
+
+        if copy and self._cache[key] is not None:
+            return self._cache[key].copy()
+        return self._cache[key]
+
+    def copy(self):
+        """
+        Method used to return a copy of the entity. The entity_df is copied while the cache of the representations
+        is shared with the entity, since the representations are copied when they are returned.
+
+        :return: Copy of the entity
+        """
+        entity = copy(self)
+        entity._df = self._df.copy()
+        return entity
+
     @property
     @abstractmethod
     def network_object(self) -> Graph:
@@ -116,7 +188,9 @@ class BaseEntity(ABC):
 
         Notes
         -------
-        When the get method is applied the Graph is build **on the fly** using the object and so the entity_df.
+        When the get method is applied the Graph is build using the object and so the entity_df. As the vtk object,
+        the Graph is cached and rebuilt only when the entity_df is set (see clear_cache) and a copy of it is returned.
+        With backend='csr' a compact CSRGraph (see Adapters.CSRGraph) is returned instead of the networkx Graph.
         """
 
         pass
@@ -318,15 +392,78 @@ class BaseEntity(ABC):
         else:
             print('Cannot save an empty entity')
 
+    @staticmethod
+    def normalize_geometries(gdf: GeoDataFrame, polygons_to_lines: bool = False, multilines: str = 'keep',
+                             remove_double_points: bool = False, tolerance: float = 0.000001) -> GeoDataFrame:
+        """
+        Normalize the geometries of the input dataframe in a single vectorized stage shared by the entity_df setters:
+
+        + Polygons are converted to Linestrings using the boundary (if polygons_to_lines is True)
+        + MultiLinestrings are kept (multilines='keep'), removed (multilines='drop') or converted to Linestrings
+          (multilines='explode'). The exploded parts keep the index of the original row.
+        + Double points are removed (if remove_double_points is True)
+
+        The input dataframe is not modified.
+
+        :param gdf: Input GeoDataFrame
+        :param polygons_to_lines: Convert Polygons and MultiPolygons to their boundary. Default is False
+        :param multilines: How to treat the MultiLinestrings, keep, drop or explode. Default is keep
+        :param remove_double_points: Remove repeated points in the geometries. Default is False
+        :param tolerance: Tolerance used to remove the double points
+        :return: Normalized GeoDataFrame
+        """
+
+        gdf = gdf.copy()
+        geometries = np.asarray(gdf.geometry.values)
+
+        if polygons_to_lines:
+            is_polygon = np.isin(get_type_id(geometries), [3, 6])  # Polygon and MultiPolygon
+            if is_polygon.any():
+                geometries[is_polygon] = boundary(geometries[is_polygon])
+
+        if remove_double_points:
+            geometries = remove_repeated_points(geometries, tolerance=tolerance)
+
+        gdf['geometry'] = geometries
+
+        is_multiline = get_type_id(geometries) == 5
+
+        if is_multiline.any():
+            if multilines == 'drop':
+                print(f'Multilines found, removing from database. If necessary correct them: '
+                      f'{np.array(gdf.index[is_multiline])+1}')
+                gdf = gdf.loc[~is_multiline]
+            elif multilines == 'explode':
+                gdf = gdf.explode(index_parts=False)
+
+        return gdf
+
+    def _set_region_geometries(self, regions: np.ndarray, geometry: np.ndarray):
+        """
+        Internal method used by the vtk_object setters to replace the geometries of the rows of the entity_df with
+        the given region ids (id column).
+
+        :param regions: Region ids
+        :param geometry: Geometries of the regions (same order of regions)
+        """
+
+        if len(regions) == 0:
+            return
+
+        # Position of the id of each row in the regions (-1 if missing, e.g. when the id is not set)
+        position = Index(regions).get_indexer(self.entity_df['id'].values)
+        rows = position >= 0
+
+        self.entity_df.loc[rows, 'geometry'] = geometry[position[rows]]
+        self.clear_cache()
+
     def remove_double_points(self):
         """
         Utility used to clean geometries with double points
         """
-        tot_geom = len(self.entity_df.geometry)
-        print('\n\n')
-        for line, geom in enumerate(self.entity_df.geometry):
-            print(f'Removing possible double points on geometries: {line}/{tot_geom}',end='\r')
-            self.entity_df.loc[line, 'geometry'] = remove_repeated_points(geom, tolerance=0.000001)
+        self.entity_df['geometry'] = remove_repeated_points(np.asarray(self.entity_df.geometry.values),
+                                                            tolerance=0.000001)
+        self.clear_cache()
 
 
 class BaseOperator(ABC):
@@ -10,6 +10,8 @@ TODO:
 
 """
 
+from __future__ import annotations
+
 import geopandas
 import networkx
 import numpy as np
@@ -19,14 +21,18 @@ from shapely.geometry import MultiLineString
 from vtkmodules.vtkFiltersCore import vtkAppendPolyData
 
 import networkx as nx
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components, shortest_path
 from vtkmodules.vtkFiltersGeometry import vtkGeometryFilter
 
 from fracability.operations.Geometry import connect_dots
-from fracability.utils.general_use import shp2vtk
+from fracability.utils.general_use import shp2vtk, vtk_lines_arrays
+from fracability.utils.profiling import profiled, add_items
 
 
 #  =============== VTK representations ===============
 
+@profiled
 def node_vtk_rep(input_df: geopandas.GeoDataFrame) -> PolyData:
     points_vtk = shp2vtk(input_df)
     # points = np.array([point.coords for point in input_df.geometry]).reshape(-1, 3)
@@ -40,6 +46,7 @@ def node_vtk_rep(input_df: geopandas.GeoDataFrame) -> PolyData:
     return points_vtk
 
 
+@profiled
 def frac_vtk_rep(input_df: geopandas.GeoDataFrame) -> PolyData:
 
     conn_obj = shp2vtk(input_df)
@@ -79,6 +86,7 @@ def frac_vtk_rep(input_df: geopandas.GeoDataFrame) -> PolyData:
     return conn_obj
 
 
+@profiled
 def bound_vtk_rep(input_df: geopandas.GeoDataFrame) -> PolyData:
 
     conn_obj = shp2vtk(input_df)
@@ -118,6 +126,7 @@ def bound_vtk_rep(input_df: geopandas.GeoDataFrame) -> PolyData:
     return conn_obj
 
 
+@profiled
 def fracture_network_vtk_rep(input_df: geopandas.GeoDataFrame, include_nodes=True) -> PolyData:
 
     fractures_df = input_df.loc[input_df['type'] == 'fracture']
@@ -150,21 +159,179 @@ def fracture_network_vtk_rep(input_df: geopandas.GeoDataFrame, include_nodes=Tru
     return conn_obj
 
 
-#  =============== Networkx representations ===============
-
+#  =============== Graph representations ===============
+
+
+class CSRGraph:
+    """
+    Compact undirected graph stored as CSR arrays. The neighbors of the node i are
+    indices[indptr[i]:indptr[i+1]] and, if present, the lengths of the corresponding edges are
+    lengths[indptr[i]:indptr[i+1]]. Each edge is stored in both directions.
+
+    Degree, connected components and shortest paths are calculated with scipy. The graph can be
+    converted to a networkx Graph with the to_networkx method.
+
+    :param indptr: Index pointer array (n_nodes + 1)
+    :param indices: Neighbor nodes array
+    :param lengths: Optional array of the edge lengths (same size of indices)
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, lengths: np.ndarray = None):
+        self.indptr = indptr
+        self.indices = indices
+        self.lengths = lengths
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.indices) // 2
+
+    @property
+    def edges(self) -> np.ndarray:
+        """
+        Array (n_edges, 2) of the edges (node_i, node_j) with node_i < node_j
+        """
+        nodes = np.repeat(np.arange(self.n_nodes), np.diff(self.indptr))
+        mask = nodes < self.indices
+        return np.column_stack((nodes[mask], self.indices[mask]))
+
+    @property
+    def matrix(self) -> csr_matrix:
+        """
+        Scipy sparse adjacency matrix of the graph. If present, the edge lengths are used as data.
+        """
+        data = self.lengths if self.lengths is not None else np.ones(len(self.indices))
+        return csr_matrix((data, self.indices, self.indptr), shape=(self.n_nodes, self.n_nodes))
+
+    def degree(self) -> np.ndarray:
+        """
+        Degree of each node
+        """
+        return np.diff(self.indptr)
+
+    def neighbors(self, node: int) -> np.ndarray:
+        """
+        Neighbors of the given node
+        """
+        return self.indices[self.indptr[node]:self.indptr[node+1]]
+
+    def connected_components(self) -> tuple[int, np.ndarray]:
+        """
+        Connected components of the graph
+        :return: Number of components and component label of each node
+        """
+        return connected_components(self.matrix, directed=False)
+
+    def shortest_path(self, source, weighted: bool = True) -> np.ndarray:
+        """
+        Shortest path distances from the source node(s) to all the nodes
+        :param source: Source node or list of source nodes
+        :param weighted: Use the edge lengths (if present). If False the number of edges is used. Default is True
+        :return: Array of distances (inf if the node cannot be reached)
+        """
+        unweighted = not weighted or self.lengths is None
+        return shortest_path(self.matrix, directed=False, unweighted=unweighted, indices=source)
+
+    def copy(self) -> 'CSRGraph':
+        """
+        Copy of the graph (the arrays are copied)
+        """
+        lengths = self.lengths.copy() if self.lengths is not None else None
+        return CSRGraph(self.indptr.copy(), self.indices.copy(), lengths)
+
+    def to_networkx(self) -> networkx.Graph:
+        """
+        Convert the graph to a networkx Graph. Only the nodes with at least one edge are added. If present, the
+        edge lengths are added as the length attribute.
+        """
+        network = nx.Graph()
+        edges = self.edges
+
+        if self.lengths is None:
+            network.add_edges_from(edges)
+        else:
+            nodes = np.repeat(np.arange(self.n_nodes), np.diff(self.indptr))
+            lengths = self.lengths[nodes < self.indices]
+            network.add_edges_from((i, j, {'length': length}) for (i, j), length in zip(edges.tolist(), lengths))
+
+        return network
+
+
+@profiled
+def csr_rep(input_object: PolyData, edge_lengths: bool = False) -> CSRGraph:
+    """
+    Build the CSR graph of a PolyData. Each pair of consecutive points of a line cell is an edge, so
+    polylines of any length are supported. Repeated edges and degenerate edges (same point) are removed.
+
+    :param input_object: Input PolyData
+    :param edge_lengths: Calculate and store the length of the edges. Default is False
+    :return: CSRGraph of the object
+    """
+
+    offsets, connectivity = vtk_lines_arrays(input_object)
+    n_nodes = input_object.n_points
+
+    conn_cells = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    same_cell = conn_cells[1:] == conn_cells[:-1]
+
+    edges = np.column_stack((connectivity[:-1][same_cell], connectivity[1:][same_cell]))
+    edges = np.sort(edges, axis=1)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    edges = np.unique(edges, axis=0)
+    add_items(len(edges))
+
+    rows = np.concatenate((edges[:, 0], edges[:, 1]))
+    cols = np.concatenate((edges[:, 1], edges[:, 0]))
+
+    order = np.lexsort((cols, rows))
+    rows, cols = rows[order], cols[order]
+
+    indptr = np.zeros(n_nodes + 1, dtype=int)
+    indptr[1:] = np.cumsum(np.bincount(rows, minlength=n_nodes))
+
+    if edge_lengths:
+        points = input_object.points
+        lengths = np.linalg.norm(points[rows] - points[cols], axis=1)
+    else:
+        lengths = None
+
+    return CSRGraph(indptr, cols, lengths)
+
+
+def graph_rep(input_object: PolyData, backend: str = 'networkx', edge_lengths: bool = False):
+    """
+    Build the graph of a PolyData with the given backend.
+
+    :param input_object: Input PolyData
+    :param backend: networkx (networkx Graph) or csr (CSRGraph). Default is networkx
+    :param edge_lengths: Calculate and store the length of the edges. Default is False
+    :return: Graph of the object
+    """
+
+    if backend == 'csr':
+        return csr_rep(input_object, edge_lengths)
+    elif backend == 'networkx':
+        return networkx_rep(input_object, edge_lengths)
+    else:
+        raise ValueError(f'Unknown graph backend {backend}, use networkx or csr')
 
-def networkx_rep(input_object: PolyData) -> networkx.Graph():
 
-    network = input_object
-    lines = network.lines  # Get the connectivity list of the object
+#  =============== Networkx representations ===============
 
-    lines = np.delete(lines,
-                      np.arange(0, lines.size, 3)).reshape(-1, 2)  # remove padding eg. [2 id1 id2 2 id3 id4 ...] -> remove the 2
 
-    network = nx.Graph()  # Create a networkx graph instance
+@profiled
+def networkx_rep(input_object: PolyData, edge_lengths: bool = False) -> networkx.Graph():
+    """
+    Build the networkx Graph of a PolyData. The edges are calculated as in csr_rep, so polylines of any length are
+    supported.
 
-    network.add_edges_from(lines)  # Add the edges
+    :param input_object: Input PolyData
+    :param edge_lengths: Add the length of the edges as the length attribute. Default is False
+    :return: networkx Graph of the object
+    """
 
-    output_obj = network
+    output_obj = csr_rep(input_object, edge_lengths).to_networkx()
     return output_obj
-
@@ -5,22 +5,25 @@ entity.
 
 todo make somehow nodes and fractures connected so that for example when only a set is displayed only the nodes of the corresponding set are considered
 """
+from __future__ import annotations
+
 import os.path
 
 import numpy as np
 from geopandas import GeoDataFrame, GeoSeries, read_file
 import pandas as pd
 from pandas import DataFrame
-from shapely.geometry import MultiLineString, Polygon, LineString, Point, MultiPoint
-from pyvista import PolyData, DataSet, wrap
+from shapely.geometry import Point, MultiPoint
+from pyvista import PolyData, DataSet
 from networkx import Graph
 from vtkmodules.vtkFiltersCore import vtkConnectivityFilter
 
-import fracability.Plotters as plts
-
 import fracability.Adapters as Rep
 from fracability.AbstractClasses import BaseEntity
 from fracability.operations import Geometry, Topology
+from fracability.utils.general_use import vtk_regions_to_lines
+from fracability.utils.persistence import save_network
+from fracability.utils.profiling import profiled
 
 
 class Nodes(BaseEntity):
@@ -52,6 +55,8 @@ class Nodes(BaseEntity):
             super().__init__(csv=csv)
         elif shp is not None:
             super().__init__(shp=shp)
+        else:
+            super().__init__()
 
     @property
     def entity_df(self) -> GeoDataFrame:
@@ -66,6 +71,7 @@ class Nodes(BaseEntity):
         """
 
         self._df = gdf
+        self.clear_cache()
         columns = self._df.columns
         if 'og_line_id' not in columns:
             self._df['og_line_id'] = np.array(gdf.index.values+1)
@@ -77,17 +83,18 @@ class Nodes(BaseEntity):
     @property
     def vtk_object(self) -> PolyData:
 
-        df = self.entity_df
-        vtk_obj = Rep.node_vtk_rep(df)
+        vtk_obj = self._cached('vtk_object', lambda: Rep.node_vtk_rep(self.entity_df), copy=True)
         return vtk_obj
 
     @vtk_object.setter
     def vtk_object(self, obj: DataSet):
         for index, point in enumerate(obj.points):
             self.entity_df.loc[self.entity_df['id'] == index, 'geometry'] = Point(point)
+        self.clear_cache()
 
-    def network_object(self) -> Graph:
-        network_obj = Rep.networkx_rep(self.vtk_object)
+    def network_object(self, backend: str = 'networkx', edge_lengths: bool = False) -> Graph | Rep.CSRGraph:
+        network_obj = self._cached(('network_object', backend, edge_lengths),
+                                   lambda: Rep.graph_rep(self.vtk_object, backend, edge_lengths), copy=True)
         return network_obj
 
     @property
@@ -200,6 +207,8 @@ class Nodes(BaseEntity):
         :param show_plot:
         :return:
         """
+        import fracability.Plotters as plts
+
         plts.matplot_nodes(self, markersize, return_plot, show_plot)
 
     def vtk_plot(self, markersize=7, return_plot=False, show_plot=True, notebook=True):
@@ -211,9 +220,13 @@ class Nodes(BaseEntity):
         :return:
         """
 
+        import fracability.Plotters as plts
+
         plts.vtkplot_nodes(self, markersize, return_plot, show_plot, notebook=notebook)
 
     def ternary_plot(self):
+        import fracability.Plotters as plts
+
         plts.matplot_ternary(self)
 
 
@@ -277,19 +290,10 @@ class Fractures(BaseEntity):
             + If no length column is present, it will be created (with length rounded to the 4th decimal point)
             + If no censoring column is present, it will be created setting all values to 0
         """
-        multiline_list = []
-        for index, geom in zip(gdf.index, gdf['geometry']):  # For each geometry in the df
-
-            if isinstance(geom, MultiLineString):
-                multiline_list.append(index)
-                continue
-        if len(multiline_list) > 0:
-            print(f'Multilines found, removing from database. If necessary correct them: {np.array(multiline_list)+1}')
+        gdf = self.normalize_geometries(gdf, multilines='drop', remove_double_points=self.check_geometries_flag)
 
-        gdf.drop(multiline_list, inplace=True)
-
-        self._df = gdf.copy()
-        self._df.reset_index(inplace=True, drop=True)
+        self._df = gdf.reset_index(drop=True)
+        self.clear_cache()
         columns = self._df.columns
         if 'og_line_id' not in columns:
             self._df['og_line_id'] = np.array(gdf.index.values+1)
@@ -303,13 +307,11 @@ class Fractures(BaseEntity):
             self._df['length'] = np.round(self._df['geometry'].length, 4)
 
         if self.check_geometries_flag:
-            self.remove_double_points()
             self.check_geometries()
 
     @property
     def vtk_object(self) -> PolyData:
-        df = self.entity_df
-        vtk_obj = Rep.frac_vtk_rep(df)
+        vtk_obj = self._cached('vtk_object', lambda: Rep.frac_vtk_rep(self.entity_df), copy=True)
         return vtk_obj
 
     @vtk_object.setter
@@ -318,54 +320,51 @@ class Fractures(BaseEntity):
             regions_ids = np.arange(0, obj.n_cells)
             obj['RegionId'] = regions_ids
 
+        regions, geometry = vtk_regions_to_lines(obj, obj['RegionId'])
+
         if not self.entity_df.empty:
-            for region_id in set(obj['RegionId']):
-                region = obj.extract_points(obj['RegionId'] == region_id)
-                self.entity_df.loc[self.entity_df['id'] == region, 'geometry'] = LineString(region.points)
+            self._set_region_geometries(regions, geometry)
         else:
-            idx = list(set(obj['RegionId']))
-            geometry = []
-            for region_id in idx:
-                region = wrap(obj.extract_cells(obj['RegionId'] == region_id))
-                index_list, ind = np.unique(region.cell_connectivity, return_index=True)
-                index_list = index_list[np.argsort(ind)]
-                geometry.append(LineString(region.points[index_list]))
-            d = {'id': idx, 'geometry': geometry}
+            d = {'id': regions, 'geometry': geometry}
             gdf = GeoDataFrame(d)
             self.entity_df = gdf
 
-    def network_object(self) -> Graph:
-        network_obj = Rep.networkx_rep(self.vtk_object)
+    def network_object(self, backend: str = 'networkx', edge_lengths: bool = False) -> Graph | Rep.CSRGraph:
+        network_obj = self._cached(('network_object', backend, edge_lengths),
+                                   lambda: Rep.graph_rep(self.vtk_object, backend, edge_lengths), copy=True)
         return network_obj
 
+    @profiled
     def check_geometries(self, remove_dup=True, save_shp=False):
         """
         Method used to check if the geometries are correct i.e.:
         + No repeating points
         + No overlaps
 
-        By default, the method will return a list of geometries that need to be fixed. Additionally, a shp file can be
-        saved with only the geometries that need to be corrected.
+        By default, the method will return a report of the geometries that need to be fixed. Additionally, a shp file
+        can be saved with only the geometries that need to be corrected.
 
         :param remove_dup: Automatically remove duplicate points. By default, True
         :param save_shp: Save in the same folder of the input shp with only the geometries that need to be corrected.
                          This is a useful support file to be imported in gis to quickly find the problematic geometries.
                          False by default. todo to be implemented
+        :return: GeoDataFrame with a row for each overlapping pair of fractures with the positional indices of the
+         pair (index_1, index_2), the og_line_id of the two fractures (og_line_id_1, og_line_id_2) and the overlap
+         geometry.
         """
 
-        overlaps_list = []
-        tot_geom = len(self.entity_df.geometry)
-        print('\n\n')
-        for line, geom in enumerate(self.entity_df.geometry):
-            print(f'Checking geometries: {line}/{tot_geom}',end='\r')
-            if geom is None:
-                print(f"\n\nWarning, empty geometry at line {line+1}, fix in GIS\n\n")
-            overlaps = self.entity_df.overlaps(geom)
-            if overlaps.any():
-                overlaps_list.append(self.entity_df.loc[line, 'og_line_id'])
-        if len(overlaps_list) > 0:
+        empty = self.entity_df.geometry.isna() | self.entity_df.geometry.is_empty
+        for line in np.where(empty)[0]:
+            print(f"\n\nWarning, empty geometry at line {line+1}, fix in GIS\n\n")
+
+        overlaps_report = Geometry.overlapping_pairs(self.entity_df)
+
+        if not overlaps_report.empty:
+            overlaps_list = list(np.unique(overlaps_report[['og_line_id_1', 'og_line_id_2']].values))
             print(f'\n\nDetected overlaps for set {self._set_n}: {overlaps_list}. Check geometries in gis and fix.\n\n')
 
+        return overlaps_report
+
     def mat_plot(self,
                  linewidth=1,
                  color='black',
@@ -383,6 +382,8 @@ class Fractures(BaseEntity):
         :return:
         """
 
+        import fracability.Plotters as plts
+
         plts.matplot_fractures(self,
                                linewidth,
                                color,
@@ -408,6 +409,8 @@ class Fractures(BaseEntity):
         :param display_property:
         :return:
         """
+        import fracability.Plotters as plts
+
         plts.vtkplot_fractures(self,
                                linewidth=linewidth,
                                color=color,
@@ -463,7 +466,8 @@ class Boundary(BaseEntity):
             super().__init__(csv=csv)
         elif shp is not None:
             super().__init__(shp=shp)
-
+        else:
+            super().__init__()
 
     @property
     def entity_df(self):
@@ -478,37 +482,11 @@ class Boundary(BaseEntity):
         A 'type' column is added if missing.
         """
 
-        self._df = gdf
-        self._df.reset_index(inplace=True, drop=True)
-
-        geom_list = []
-        # boundaries = df.boundary
-        #
-        # gdf = boundaries.explode(ignore_index=True)
-
-        # The following is horrible and I hate it but for some reason the commented lines above
-        # do not work for shapely 1.8 and geopandas 0.11 while they work perfectly with 2.0 and 0.13
-        # When PZero moves to shapely 2.0 remove the lines between these comments
-        # and uncomment the two lines above
-
-        # Remove from here
-        # This is to suppress the SettingWithCopyWarning (we are not working on a copy)
-        pd.options.mode.chained_assignment = None
-
-        for index, line in enumerate(self._df.loc[:, 'geometry']):
-            if isinstance(line, Polygon):
-                bound = line.boundary
-                if isinstance(bound, MultiLineString):
-                    for linestring in bound.geoms:
-                        geom_list.append(linestring)
-                else:
-                    geom_list.append(bound)
-            else:
-                geom_list.append(line)
+        gdf = self.normalize_geometries(gdf, polygons_to_lines=True, multilines='explode',
+                                        remove_double_points=self.check_geometries_flag)
 
-        for index, value in enumerate(geom_list):
-            self._df.loc[index, 'geometry'] = value
-        # Remove up to here
+        self._df = gdf.reset_index(drop=True)
+        self.clear_cache()
 
         columns = self._df.columns
         if 'og_line_id' not in columns:
@@ -518,14 +496,10 @@ class Boundary(BaseEntity):
         if 'b_group' not in columns:
             self._df['b_group'] = self.group_n
 
-        if self.check_geometries_flag:
-            self.remove_double_points()
-
     @property
     def vtk_object(self) -> PolyData:
 
-        df = self.entity_df
-        vtk_obj = Rep.bound_vtk_rep(df)
+        vtk_obj = self._cached('vtk_object', lambda: Rep.bound_vtk_rep(self.entity_df), copy=True)
         return vtk_obj
 
     @vtk_object.setter
@@ -535,30 +509,18 @@ class Boundary(BaseEntity):
             regions_ids = np.arange(0, obj.n_cells)
             obj['RegionId'] = regions_ids
 
-        if not self.entity_df.empty:
-            for region_id in set(obj['RegionId']):
-                region = obj.extract_points(obj['RegionId'] == region_id)
-                points = region.points
-                if points[0] != points[-1]:  # All boundaries must be closed
-                    points = np.append(points, [points[0]], axis=0)
+        regions, geometry = vtk_regions_to_lines(obj, obj['RegionId'], close=True)  # All boundaries must be closed
 
-                self.entity_df.loc[self.entity_df['id'] == region, 'geometry'] = LineString(points)
+        if not self.entity_df.empty:
+            self._set_region_geometries(regions, geometry)
         else:
-            idx = list(set(obj['RegionId']))
-            geometry = []
-            for region_id in idx:
-                region = obj.extract_cells(obj['RegionId'] == region_id)
-                points = region.points
-                if np.any(points[0, :] != points[-1, :]):  # All boundaries must be closed
-                    points = np.append(points, [points[0]], axis=0)
-                geometry.append(LineString(points))
-
-            d = {'id': idx, 'geometry': geometry}
+            d = {'id': regions, 'geometry': geometry}
             gdf = GeoDataFrame(d)
             self.entity_df = gdf
 
-    def network_object(self) -> Graph:
-        network_obj = Rep.networkx_rep(self.vtk_object)
+    def network_object(self, backend: str = 'networkx', edge_lengths: bool = False) -> Graph | Rep.CSRGraph:
+        network_obj = self._cached(('network_object', backend, edge_lengths),
+                                   lambda: Rep.graph_rep(self.vtk_object, backend, edge_lengths), copy=True)
         return network_obj
 
     def mat_plot(self,
@@ -575,6 +537,8 @@ class Boundary(BaseEntity):
         :return:
         """
 
+        import fracability.Plotters as plts
+
         plts.matplot_boundaries(self,
                                 linewidth,
                                 color,
@@ -597,6 +561,8 @@ class Boundary(BaseEntity):
         :param show_plot:
         :return:
         """
+        import fracability.Plotters as plts
+
         plts.vtkplot_boundaries(self,
                                 linewidth=linewidth,
                                 color=color,
@@ -651,8 +617,11 @@ class FractureNetwork(BaseEntity):
         :param csv: Path of a csv
         """
 
+        super().__init__()
+
         self.column_names = ['type', 'object', 'n_type', 'f_set', 'b_group', 'active']
         self._df: DataFrame = DataFrame(columns=self.column_names)
+        self._cached_state: tuple = ()
 
         if csv is not None:
             gdf = read_file(csv, GEOM_POSSIBLE_NAMES="geometry", KEEP_GEOM_COLUMNS="NO")
@@ -707,20 +676,19 @@ class FractureNetwork(BaseEntity):
 
     @property
     def crs(self):
-        return self.fracture_network_to_components_df().crs
+        return self._components_df.crs
 
     #  ==================== Nodes property ====================
 
     @property
     def nodes(self) -> Nodes:
         """
-        Property that returns a Node entity object of all the active nodes.
+        Property that returns a Node entity object of all the active nodes. A copy is returned, so modifying it
+        does not change the fracture network.
         :return: Nodes entity object
         """
-        if self._active_nodes_df is not None:
-            return Nodes(self._active_nodes_df)
-        else:
-            return None
+        return self._state_cached('nodes', lambda: Nodes(self._active_nodes_df.copy())
+                                  if self._active_nodes_df is not None else None, copy=True)
 
     @property
     def _nodes_components(self) -> DataFrame:
@@ -756,16 +724,7 @@ class FractureNetwork(BaseEntity):
         :return:
         """
 
-        gdf = GeoDataFrame()
-
-        nodes = self._active_nodes_components
-
-        if nodes is not None:
-            for row, fracture in nodes.iterrows():
-                gdf = pd.concat([gdf, fracture['object'].entity_df], ignore_index=True)
-            return gdf
-        else:
-            return None
+        return self._state_cached('active_nodes_df', lambda: self._concat_components(self._active_nodes_components))
 
     def add_nodes(self, nodes: Nodes = None):
         """
@@ -794,6 +753,8 @@ class FractureNetwork(BaseEntity):
             else:
                 self._df.loc[self._df['n_type'] == node_type, 'object'] = nodes_group
 
+        self.clear_cache()
+
     def add_nodes_from_dict(self, node_dict, classes=None, origin_dict: dict = None):
         """Add nodes a dict of shapely geometry (key), classes and optionally node origin (value).
 
@@ -834,6 +795,8 @@ class FractureNetwork(BaseEntity):
             for t in node_type:
                 self.entity_df.loc[self.entity_df['n_type'] == t, 'active'] = 1
 
+        self.clear_cache()
+
     def is_type_active(self, node_type: int) -> bool:
         """
         Method used to return if a given node type is active in the fracture network
@@ -851,18 +814,18 @@ class FractureNetwork(BaseEntity):
     @property
     def fractures(self) -> Fractures:
         """
-        Property that returns a Fracture entity object of all the active fracture sets.
+        Property that returns a Fracture entity object of all the active fracture sets. A copy is returned, so modifying it
+        does not change the fracture network.
         :return: Fracture entity object
         """
-        if self._active_fractures_df is not None:
-            return Fractures(self._active_fractures_df)
-        return None
+        return self._state_cached('fractures', lambda: Fractures(self._active_fractures_df.copy())
+                                  if self._active_fractures_df is not None else None, copy=True)
 
     @property
     def sets(self) -> list:
         """Return the list of the number of sets"""
 
-        sets = list(set(self.fractures.entity_df['f_set'].values))
+        sets = self._state_cached('sets', lambda: list(set(self.fractures.entity_df['f_set'].values)), copy=True)
         return sets
 
     @property
@@ -900,17 +863,8 @@ class FractureNetwork(BaseEntity):
         :return: Geopandas dataframe of the active fracture sets components
         """
 
-        gdf = GeoDataFrame()
-
-        fractures = self._active_fractures_components
-
-        if fractures is not None:
-            for row, fracture in fractures.iterrows():
-                gdf = pd.concat([gdf, fracture['object'].entity_df], ignore_index=True)
-
-            return gdf
-        else:
-            return None
+        return self._state_cached('active_fractures_df',
+                                  lambda: self._concat_components(self._active_fractures_components))
 
     def add_fractures(self, fractures: Fractures = None):
         """
@@ -937,6 +891,8 @@ class FractureNetwork(BaseEntity):
             else:
                 self._df.loc[self._df['f_set'] == set_n, 'object'] = fractures_group
 
+        self.clear_cache()
+
     def fracture_object(self, set_n: int) -> Fractures:
         """
         Method that returns the Fracture object of a given set
@@ -959,6 +915,8 @@ class FractureNetwork(BaseEntity):
                 for n in set_n:
                     self.entity_df.loc[self.entity_df['f_set'] == n, 'active'] = 1
 
+        self.clear_cache()
+
     def is_set_active(self, set_n: int) -> bool:
         """
         Method used to return if a given fracture set is active in the fracture network
@@ -977,13 +935,12 @@ class FractureNetwork(BaseEntity):
     @property
     def boundaries(self) -> Boundary:
         """
-        Property that returns a Boundary entity object of all the active boundary groups.
+        Property that returns a Boundary entity object of all the active boundary groups. A copy is returned, so modifying it
+        does not change the fracture network.
         :return: Boundary entity object
         """
-        if self._active_boundaries_df is not None:
-            return Boundary(self._active_boundaries_df)
-        else:
-            return None
+        return self._state_cached('boundaries', lambda: Boundary(self._active_boundaries_df.copy())
+                                  if self._active_boundaries_df is not None else None, copy=True)
 
     @property
     def _boundaries_components(self) -> DataFrame:
@@ -1022,18 +979,8 @@ class FractureNetwork(BaseEntity):
         :return: GeoPandas DataFrame of the active boundaries of the fracture network
         """
 
-        df = GeoDataFrame()
-
-        boundaries = self._active_boundaries_components
-
-        if boundaries is not None:
-
-            for row, fracture in boundaries.iterrows():
-                df = pd.concat([df, fracture['object'].entity_df], ignore_index=True)
-
-            return df
-        else:
-            return None
+        return self._state_cached('active_boundaries_df',
+                                  lambda: self._concat_components(self._active_boundaries_components))
 
     def add_boundaries(self, boundary: Boundary = None):
         """
@@ -1062,6 +1009,8 @@ class FractureNetwork(BaseEntity):
             else:
                 self._df.loc[self._df['b_group'] == group_n, 'object'] = boundary_group
 
+        self.clear_cache()
+
     def boundary_object(self, group_n: int) -> Boundary:
         """
         Method that returns the Node object of a given group_number
@@ -1085,6 +1034,8 @@ class FractureNetwork(BaseEntity):
             for n in group_n:
                 self.entity_df.loc[self.entity_df['b_group'] == n, 'active'] = 1
 
+        self.clear_cache()
+
     def is_group_active(self, group_n: int) -> bool:
         """
         Method used to return if a given boundary group is active in the fracture network
@@ -1099,6 +1050,7 @@ class FractureNetwork(BaseEntity):
 
     #  ==================== Backbone methods ====================
 
+    @profiled
     def calculate_backbone(self, biggest_region=True):
         """
         Calculate the backbone(s) of the network and add the calculated nodes to the network.
@@ -1124,10 +1076,50 @@ class FractureNetwork(BaseEntity):
         backbone.vtk_object = vtkbackbone
         backbone.crs = self.crs
 
-        new_df = DataFrame([['backbone', backbone, backbone_set_n, 0]],
+        self.add_backbone(backbone)
+
+    def add_backbone(self, backbone: Backbone):
+        """
+        Method used to add a backbone component to the fracture network Dataframe. Backbones are not active.
+        :param backbone: Backbone object to be added
+        """
+
+        new_df = DataFrame([['backbone', backbone, backbone.set_n, 0]],
                            columns=['type', 'object', 'f_set', 'active'])
         self._df = pd.concat([self._df, new_df], ignore_index=True)
 
+    @profiled
+    def calculate_clusters(self, top_k: int = None, spanning_tolerance: float = 0.01,
+                           return_labels: bool = False):
+        """
+        Calculate the clusters (connected components) of the active fractures of the network using the sparse
+        fracture/point adjacency graph. The clusters are sorted by number of fractures and total length (largest
+        first). The extent of the active boundaries (or of the fractures if no boundary is present) is used to define
+        if a cluster is spanning the network.
+
+        :param top_k: Return only the k largest clusters. If None (default) all the clusters are returned
+        :param spanning_tolerance: Tolerance used to define the spanning clusters as a fraction of the domain extent.
+         Default is 0.01
+        :param return_labels: If True return also the array with the cluster of each fracture (row of the fractures
+         entity_df, -1 if the cluster is not returned). Default is False
+        :return: Dataframe with for each cluster the number of fractures (n_fractures), the number of points
+         (n_points), the total length and the spanning flags (spanning_x, spanning_y and spanning).
+        """
+
+        fractures_vtk = self.fractures.vtk_object
+
+        if self.boundaries is not None:
+            domain_bounds = self.boundaries.vtk_object.bounds
+        else:
+            domain_bounds = fractures_vtk.bounds
+
+        labels, clusters_df = Topology.fracture_clusters(fractures_vtk, top_k=top_k, domain_bounds=domain_bounds,
+                                                         spanning_tolerance=spanning_tolerance)
+        if return_labels:
+            return clusters_df, labels
+        else:
+            return clusters_df
+
     @property
     def backbone(self):
         """
@@ -1145,19 +1137,28 @@ class FractureNetwork(BaseEntity):
         :return: Geopandas DataFrame of the whole fracture network
         """
 
-        gdf = DataFrame()
+        return self._components_df.copy()
 
-        nodes = self._active_nodes_df
-
-        gdf = pd.concat([gdf, nodes], ignore_index=True)
+    @property
+    def _components_df(self) -> DataFrame:
+        """
+        Internal property that returns the cached dataframe of all the active components. This must not be modified
+        in place, use fracture_network_to_components_df to get a copy.
+        :return: Geopandas DataFrame of the whole fracture network
+        """
 
-        fractures = self._active_fractures_df
+        return self._state_cached('components_df', self._build_components_df)
 
-        gdf = pd.concat([gdf, fractures], ignore_index=True)
+    def _build_components_df(self) -> DataFrame:
+        """
+        Internal method used to concatenate the active nodes, fractures and boundaries in a single dataframe.
+        :return: Geopandas DataFrame of the whole fracture network
+        """
 
-        boundaries = self._active_boundaries_df
+        components = [df for df in [self._active_nodes_df, self._active_fractures_df, self._active_boundaries_df]
+                      if df is not None]
 
-        gdf = pd.concat([gdf, boundaries], ignore_index=True)
+        gdf = pd.concat([DataFrame(), *components], ignore_index=True)
 
         if 'n_type' in gdf.columns:
             gdf['n_type'] = gdf['n_type'].fillna(-9999).astype('int64')
@@ -1167,124 +1168,193 @@ class FractureNetwork(BaseEntity):
             gdf['b_group'] = gdf['b_group'].fillna(-9999).astype('int64')
         return gdf
 
+    @staticmethod
+    def _concat_components(components: DataFrame) -> GeoDataFrame:
+        """
+        Internal method used to concatenate the entity_df of the given components in a single dataframe.
+        :param components: Slice of the fracture network df with the components to concatenate
+        :return: Geopandas DataFrame of the components or None if no components are given
+        """
+
+        if components is None:
+            return None
+
+        return pd.concat([GeoDataFrame(), *[component.entity_df for component in components['object']]],
+                         ignore_index=True)
+
+    def _state_cached(self, key, builder, copy: bool = False):
+        """
+        Internal method used to return a cached representation of the active components of the fracture network.
+        When the state of the network (see _components_state) changes the cache is cleared and the representations
+        are built again.
+
+        :param key: Hashable key of the representation
+        :param builder: Function without arguments used to build the representation
+        :param copy: Return a copy of the cached representation (see _cached). Default is False
+        :return: The cached representation (or its copy)
+        """
+
+        state = self._components_state
+        if state != self._cached_state:
+            self.clear_cache()
+            self._cached_state = state
+
+        return self._cached(key, builder, copy)
+
     def vtk_object(self, include_nodes: bool = True) -> PolyData:
 
         """
         Method used to return a vtkPolyData representation of the fracture network
         :param include_nodes: Bool flag used to control if include or not the nodes in the fracture network object
         :return: vtkPolyData of the fracture network
+
+        Notes
+        -------
+        The PolyData is cached and rebuilt only when the active components or their entity_df change. A copy of
+        the cached PolyData is returned.
         """
 
-        vtk_obj = Rep.fracture_network_vtk_rep(self.fracture_network_to_components_df(), include_nodes=include_nodes)
+        vtk_obj = self._state_cached(('vtk_object', include_nodes),
+                                     lambda: Rep.fracture_network_vtk_rep(self.fracture_network_to_components_df(),
+                                                                          include_nodes=include_nodes), copy=True)
         return vtk_obj
 
-    def network_object(self) -> Graph:
+    def network_object(self, backend: str = 'networkx', edge_lengths: bool = False) -> Graph | Rep.CSRGraph:
         """
-        Method used to return a networkx Graph representation of the fracture network
+        Method used to return a graph representation of the fracture network
+        :param backend: networkx to return a networkx Graph or csr to return a CSRGraph (CSR arrays). Default is networkx
+        :param edge_lengths: Add the length of the edges to the graph. Default is False
         :return: Graph of the fracture network
         """
 
-        network_object = Rep.networkx_rep(self.vtk_object(include_nodes=False))
+        network_object = self._state_cached(('network_object', backend, edge_lengths),
+                                            lambda: Rep.graph_rep(self.vtk_object(include_nodes=False), backend,
+                                                                  edge_lengths), copy=True)
         return network_object
 
+    @property
+    def _components_state(self) -> tuple:
+        """
+        Internal property that returns the state of the fracture network i.e. the versions of the active components.
+        The state changes when components are added or (de)activated or when the entity_df of a component is set.
+        :return: Tuple of component versions
+        """
+
+        active = self._df.loc[self._df['active'] == 1, 'object']
+        return tuple(component.cache_version for component in active)
+
+    @profiled
     def check_network(self, check_single=True, save_shp=None):
         """
         Method used to check if network-wide the geometries are correct i.e.:
-        + No repeating points
         + No overlaps
+        + No fractures crossing the boundaries (i.e. intersecting but not touching)
 
-        By default, the method will return a list of geometries that need to be fixed. Additionally, a shp file can be
-        saved with only the geometries that need to be corrected.
+        The checks are performed with bulk spatial index queries on all the active fractures and boundaries. By
+        default, the method will return a GeoDataFrame of the geometries that need to be fixed. Additionally, a shp
+        file can be saved with only the geometries that need to be corrected.
 
-        :param remove_dup: Automatically remove duplicate points. By default, True. When false, a point shapefile where double points are present will be saved
         :param check_single: Perform check also for the single components
         :param save_shp: Path to save the shp of the check. If check_single is true then also the results of the single component check will be saved.
+        :return: GeoDataFrame with a row for each problem found. The check column indicates the type of problem
+         (overlap or boundary_crossing). For each problem the positional indices (index_1, index_2), og_line_id,
+         type and f_set of the two geometries are given (with the suffixes _1 and _2). For boundary crossings the
+         second geometry is the boundary. The geometry column contains the intersection of the two geometries.
         """
 
         df = self.fracture_network_to_components_df()
-        df = df.loc[df['type'] != 'node']
-
-        set_n = np.array(list(set(df['f_set'])))
-
-        overlaps_list = []
-        overlaps_list_dict = {s: [] for s in set_n[set_n>0]}
-        overlaps_geometry_list = []
-        intersections_list = []
-        intersections_geometry_list = []
-
-        for line, geom in enumerate(df.geometry):
-
-            if df.loc[line, 'type'] == 'boundary':
-                mask = np.ones(df.geometry.size, dtype=bool)
-                mask[line] = False
-                sub_df = df[mask]
-                intersections = sub_df.intersects(geom)
-                touching = sub_df.touches(geom)
-                xor = intersections != touching
-                if xor.any():
-                    filtered_df = sub_df[xor]
-                    for n in set(filtered_df['f_set']):
-                        int_dict = dict()
-                        int_dict['boundary_int'] = list(filtered_df.loc[filtered_df['f_set'] == n, 'og_line_id'].values)
-                        overlaps_list_dict[n].append(int_dict)
-                    intersections_list = filtered_df['og_line_id'].values
-                    intersections_geometry_list = filtered_df['geometry'].values
+        df = df.loc[df['type'] != 'node'].reset_index(drop=True)
 
-            else:
-                overlaps = df.overlaps(geom)
-                if overlaps.any():
-                    overlaps_list.append(df.loc[line, 'og_line_id'])
-                    overlaps_geometry_list.append(df.loc[line, 'geometry'])
-                    set_n = df.loc[line, 'f_set']
-                    overlaps_list_dict[set_n].append(df.loc[line, 'og_line_id'])
+        overlaps = Geometry.overlapping_pairs(df)
+        overlaps.insert(0, 'check', 'overlap')
+
+        crossings = Geometry.boundary_crossing_pairs(df)
+        crossings.insert(0, 'check', 'boundary_crossing')
+
+        findings = pd.concat([overlaps, crossings], ignore_index=True)
+
+        for column in ['type', 'f_set']:
+            findings[f'{column}_1'] = df[column].values[findings['index_1'].values]
+            findings[f'{column}_2'] = df[column].values[findings['index_2'].values]
+
+        findings = GeoDataFrame(findings, geometry='geometry', crs=self.crs)
 
         if save_shp:
             path_frac = os.path.join(save_shp, 'frac_corr.shp')
 
-            f_out_dict = {'og_id': [*overlaps_list, *intersections_list],
-                          'geometry': [*overlaps_geometry_list, *intersections_geometry_list]}
+            index = np.unique(findings[['index_1', 'index_2']].values)
+
+            f_out_dict = {'og_id': df['og_line_id'].values[index],
+                          'type': df['type'].values[index],
+                          'geometry': df['geometry'].values[index]}
 
             out_df = GeoDataFrame(f_out_dict, crs=self.crs)
             out_df.to_file(path_frac)
 
         else:
-            print(overlaps_list_dict)
+            for check, check_df in findings.groupby('check'):
+                print(f'{check}: {len(check_df)} found. og_line_id: {list(np.unique(check_df["og_line_id_1"]))}')
+
+        return findings
 
-    def clean_network(self, buffer = 0.05, inplace=True):
+    @profiled
+    def clean_network(self, buffer = 0.05, inplace=True, tiles: tuple = None, halo: float = None, executor=None):
         """Tidy the intersection of the active entities in the fracture network. A buffer is applied to all the
         geometries to ensure intersection in a given radius.
 
         :param buffer: Applied buffer to the geometries of the entity.
         :param inplace: If true automatically replace the network with the clean one, if false then return the clean
          geopandas dataframe. Default is True
+        :param tiles: Number of tiles (n_x, n_y) used to split the network. If None (default) the whole network is
+         tidied at once. The result does not depend on the tiles.
+        :param halo: Width of the overlap around each tile. If None (default) the mean side of the fracture
+         bounding boxes is used
+        :param executor: concurrent.futures executor (e.g. ProcessPoolExecutor) used to tidy the tiles in parallel.
+         Default is None
          """
 
         if inplace:
-            Geometry.tidy_intersections(self)
+            Geometry.tidy_intersections(self, buffer=buffer, tiles=tiles, halo=halo, executor=executor)
         else:
-            return Geometry.tidy_intersections(self, inplace=False)
+            return Geometry.tidy_intersections(self, buffer=buffer, inplace=False, tiles=tiles, halo=halo,
+                                               executor=executor)
 
-    def calculate_topology(self, clean_network=True):
+    @profiled
+    def calculate_topology(self, clean_network=True, boundary_tolerance: float = 1e-5, tiles: tuple = None,
+                           halo: float = None, executor=None):
         """
         Calculate the topology of the network and add the calculated nodes to the network.
 
+        With tiles, the intersections between fractures are first calculated in a regular grid of tiles with an
+        overlapping halo that can be processed in parallel with the given executor (e.g. ProcessPoolExecutor). The
+        cleaned network (and so the topology) is the same of the untiled clean, see Geometry.tiled_tidy_geometries.
+
         :param clean_network: If true, before calculating the topology the network is cleaned with the clean_network. Default is True
+        :param boundary_tolerance: Maximum distance of a fracture point from the boundary to be considered a U node. Default is 1e-5
+        :param tiles: Number of tiles (n_x, n_y) used to clean the network. Default is None (no tiling)
+        :param halo: Width of the overlap around each tile. If None (default) the mean side of the fracture
+         bounding boxes is used
+        :param executor: concurrent.futures executor used to clean the tiles in parallel. Default is None
         """
         if clean_network is True:
-            self.clean_network()
+            self.clean_network(tiles=tiles, halo=halo, executor=executor)
 
-        nodes_dict, origin_dict = Topology.nodes_conn(self)
+        nodes_dict, origin_dict = Topology.nodes_conn(self, tolerance=boundary_tolerance)
         self.add_nodes_from_dict(nodes_dict,origin_dict=origin_dict, classes=None)
 
 
 
 
 
-
     @property
     def fraction_censored(self) -> float:
         """Get the fraction of censored fractures in the network """
 
+        return self._state_cached('fraction_censored', self._calculate_fraction_censored)
+
+    def _calculate_fraction_censored(self) -> float:
+        """Internal method used to calculate the fraction of censored fractures in the network """
+
         n_censored = self.fractures.entity_df['censored'] == 1
 
         total = self.fractures.entity_df['censored'] >= 0
@@ -1316,6 +1386,8 @@ class FractureNetwork(BaseEntity):
         :return:
         """
 
+        import fracability.Plotters as plts
+
         plts.vtkplot_frac_net(self,
                               markersize=markersize,
                               fracture_linewidth=fracture_linewidth,
@@ -1340,6 +1412,8 @@ class FractureNetwork(BaseEntity):
         Method used to plot the fracture network using vtk
         :return:
         """
+        import fracability.Plotters as plts
+
         if method == 'vtk':
             plts.vtkplot_backbone(self,
                                   fracture_linewidth=fracture_linewidth,
@@ -1379,6 +1453,8 @@ class FractureNetwork(BaseEntity):
         :param return_plot:
         :return:
         """
+        import fracability.Plotters as plts
+
         plts.matplot_frac_net(self,
                               markersize,
                               fracture_linewidth,
@@ -1394,6 +1470,8 @@ class FractureNetwork(BaseEntity):
         Method used to plot the ternary diagram of the fracture network
         :return:
         """
+        import fracability.Plotters as plts
+
         plts.matplot_ternary(self)
 
     #  ==================== Output methods ====================
@@ -1420,6 +1498,38 @@ class FractureNetwork(BaseEntity):
             for bb in self.backbone:
                 bb.save_csv(path)
 
+    def save_parquet(self, path: str, fitter=None):
+        """
+        Save the whole fracture network (nodes, fractures, boundaries, backbones and activation flags) in a
+        GeoParquet dataset that can be loaded with fracability.utils.persistence.load_network without calculating
+        again the topology.
+
+        :param path: Path of the directory of the dataset. If it does not exist it will be created
+        :param fitter: NetworkFitter object whose fitted distributions are saved with the network. Default is None
+        """
+
+        save_network(self, path, fitter)
+
+    def export_figures(self, output_dir: str, figures: list = None, formats: list = ('png',),
+                       distributions: list = ('lognorm',), fitter=None, dpi: int = 150,
+                       window_size: tuple = (1920, 1080)) -> list:
+        """
+        Save the figures of the fracture network (map, ternary diagram, fit summaries, ...) to files without
+        showing them. See fracability.utils.export.export_figures.
+
+        :param output_dir: Directory of the output files. If it does not exist it will be created
+        :param figures: List of the figures to export. If None (default) the map, ternary and summary figures
+        :param formats: List of the output formats. Default is png
+        :param distributions: Distributions fitted for the summary figures when no fitter is given. Default is lognorm
+        :param fitter: NetworkFitter object used for the summary figures. Default is None
+        :param dpi: Resolution of the matplotlib figures. Default is 150
+        :param window_size: Size in pixels of the pyvista figures (vtk_map). Default is (1920, 1080)
+        :return: List of the paths of the saved files
+        """
+        from fracability.utils.export import export_figures
+
+        return export_figures(self, output_dir, figures, formats, distributions, fitter, dpi, window_size)
+
     def save_shp(self, path: str):
         """
         Save the entity df as shp
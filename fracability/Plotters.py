@@ -357,7 +357,8 @@ def vtkplot_nodes(entity,
                   markersize=7,
                   return_plot=False,
                   show_plot=True,
-                  notebook=True):
+                  notebook=True,
+                  off_screen=False):
     """
     Plot a fracability Nodes entity using vtk.
 
@@ -366,13 +367,16 @@ def vtkplot_nodes(entity,
     :param return_plot: Bool. If true the plot is returned. By default, False
     :param show_plot: Bool. If true the plot is shown. By default, True
     :param notebook: Bool. if true plot using jupyter. By default, True
+    :param off_screen: Bool. If true the plot is built off screen, without the camera orientation widget (e.g. to
+     export it to a file). By default, False
     :return: If return_plot is true a matplotlib axis is returned
 
     """
-    plotter = Plotter(notebook=notebook)
+    plotter = Plotter(notebook=notebook, off_screen=off_screen)
     plotter.background_color = 'white'
     plotter.view_xy()
-    plotter.add_camera_orientation_widget()
+    if not off_screen:
+        plotter.add_camera_orientation_widget()
     plotter.enable_image_style()
 
     class_dict = {
@@ -428,7 +432,8 @@ def vtkplot_fractures(entity,
                       return_plot=False,
                       show_plot=True,
                       display_property: str = None,
-                      notebook=True):
+                      notebook=True,
+                      off_screen=False):
 
     """
     Plot a fracability Fracture entity using vtk.
@@ -441,15 +446,18 @@ def vtkplot_fractures(entity,
     :param show_plot: Bool. If true the plot is shown. By default, True
     :param display_property: str. Indicate which property to show. By default, None
     :param notebook: Bool. if true plot using jupyter. By default, True
+    :param off_screen: Bool. If true the plot is built off screen, without the camera orientation widget (e.g. to
+     export it to a file). By default, False
 
     :return: If return_plot is true a matplotlib axis is returned
 
     """
 
-    plotter = Plotter(notebook=notebook)
+    plotter = Plotter(notebook=notebook, off_screen=off_screen)
     plotter.background_color = 'white'
     plotter.view_xy()
-    plotter.add_camera_orientation_widget()
+    if not off_screen:
+        plotter.add_camera_orientation_widget()
     plotter.enable_image_style()
 
     vtk_object = entity.vtk_object
@@ -488,7 +496,8 @@ def vtkplot_boundaries(entity,
                        color='red',
                        return_plot=False,
                        show_plot=True,
-                       notebook=True):
+                       notebook=True,
+                       off_screen=False):
     """
     Plot a fracability Boundary entity using vtk.
 
@@ -498,13 +507,16 @@ def vtkplot_boundaries(entity,
     :param return_plot: Bool. If true the plot is returned. By default, False
     :param show_plot: Bool. If true the plot is shown. By default, True
     :param notebook: Bool. if true plot using jupyter. By default, True
+    :param off_screen: Bool. If true the plot is built off screen, without the camera orientation widget (e.g. to
+     export it to a file). By default, False
 
     :return: If return_plot is true a matplotlib axis is returned
     """
-    plotter = Plotter(notebook=notebook)
+    plotter = Plotter(notebook=notebook, off_screen=off_screen)
     plotter.background_color = 'white'
     plotter.view_xy()
-    plotter.add_camera_orientation_widget()
+    if not off_screen:
+        plotter.add_camera_orientation_widget()
     plotter.enable_image_style()
 
     actor = plotter.add_mesh(entity.vtk_object,
@@ -529,7 +541,8 @@ def vtkplot_frac_net(entity,
                      color_set=False,
                      show_plot=True,
                      return_plot=False,
-                     notebook=True):
+                     notebook=True,
+                     off_screen=False):
     """
     Plot a fracability FractureNetwork entity using Pyvista.
 
@@ -545,14 +558,17 @@ def vtkplot_frac_net(entity,
     :param return_plot: Bool. If true the plot is returned. By default, False
     :param show_plot: Bool. If true the plot is shown. By default, True
     :param notebook: Bool. if true plot using jupyter. By default, True
+    :param off_screen: Bool. If true the plot is built off screen, without the camera orientation widget (e.g. to
+     export it to a file). By default, False
 
     :return: If return_plot is true a matplotlib axis is returned
 
     """
-    plotter = Plotter(notebook=notebook)
+    plotter = Plotter(notebook=notebook, off_screen=off_screen)
     plotter.background_color = 'white'
     plotter.view_xy()
-    plotter.add_camera_orientation_widget()
+    if not off_screen:
+        plotter.add_camera_orientation_widget()
     plotter.enable_image_style()
 
     nodes = entity.nodes
@@ -560,17 +576,19 @@ def vtkplot_frac_net(entity,
     boundaries = entity.boundaries
 
     if nodes is not None:
-        node_actor = vtkplot_nodes(nodes, markersize=markersize, return_plot=True)
+        node_actor = vtkplot_nodes(nodes, markersize=markersize, return_plot=True, notebook=notebook,
+                                   off_screen=off_screen)
         plotter.add_actor(node_actor)
 
     if fractures is not None:
-        fractures_actor = vtkplot_fractures(fractures, linewidth=fracture_linewidth,
-                                            color=fracture_color, color_set=color_set, return_plot=True)
+        fractures_actor = vtkplot_fractures(fractures, linewidth=fracture_linewidth, color=fracture_color,
+                                            color_set=color_set, return_plot=True, notebook=notebook,
+                                            off_screen=off_screen)
         plotter.add_actor(fractures_actor)
 
     if boundaries is not None:
-        boundary_actor = vtkplot_boundaries(boundaries, linewidth=boundary_linewidth,
-                                            color=boundary_color, return_plot=True)
+        boundary_actor = vtkplot_boundaries(boundaries, linewidth=boundary_linewidth, color=boundary_color,
+                                            return_plot=True, notebook=notebook, off_screen=off_screen)
         plotter.add_actor(boundary_actor)
 
     if return_plot:
@@ -1046,7 +1064,8 @@ def matplot_tick_plot(fitter: NetworkFitter,
     ax = plt.subplot(111)
 
     figManager = plt.get_current_fig_manager()
-    figManager.window.showMaximized()
+    if hasattr(figManager, 'window'):  # Non-interactive backends (e.g. Agg) have no window
+        figManager.window.showMaximized()
 
     samples = fitter.network_data.lengths
     ecdf = fitter.network_data.ecdf
@@ -1,3 +1,6 @@
+from concurrent.futures import Executor
+from itertools import repeat
+
 import numpy as np
 
 from numpy import exp
@@ -7,8 +10,96 @@ from pandas import DataFrame
 import scipy.stats as ss
 from scipy.optimize import minimize
 
+from fracability.utils import mle
 from fracability.utils.general_use import KM
-import fracability.Plotters as plotter
+from fracability.utils.profiling import profiled, add_items
+
+
+def fit_distribution(distribution_name: str, uncensored: np.ndarray, censored: np.ndarray = None,
+                     use_scipy: bool = False, start: tuple = None) -> tuple:
+    """
+    Fit a scipy distribution on the given complete and right censored lengths. The location is fixed to 0 except for
+    the normal and logistic distributions. The distributions supported by fracability.utils.mle (lognorm,
+    weibull_min, expon and norm, gamma only without censored lengths) are fitted with closed-form likelihoods and
+    gradients, the others (or if the fit does not converge) with the scipy fit method. This is a module level
+    function so that it can be used in a process pool.
+
+    :param distribution_name: Name of the scipy distribution
+    :param uncensored: Array of the complete lengths
+    :param censored: Array of the right censored lengths. Default is None (no censored lengths)
+    :param use_scipy: Always use the scipy fit method. Default is False
+    :param start: Starting parameters of the fit in the scipy order (e.g. a previous fit). Default is None
+    :return: Tuple of the fitted parameters
+    """
+
+    has_censored = censored is not None and len(censored) > 0
+
+    if not use_scipy and distribution_name in (mle.CENSORED_DISTRIBUTIONS if has_censored else mle.DISTRIBUTIONS):
+        params = mle.fit(distribution_name, uncensored, censored, start)
+
+        if params is not None:
+            return params
+
+    if has_censored:
+        data = ss.CensoredData(uncensored=uncensored, right=censored)
+    else:
+        data = np.asarray(uncensored)
+
+    scipy_distribution = getattr(ss, distribution_name)
+
+    # The starting shapes are positional arguments of the scipy fit method, loc and scale are keyword arguments
+    shapes = () if start is None else tuple(start[:-2])
+    guesses = {} if start is None else {'scale': start[-1]}
+
+    if distribution_name == 'norm' or distribution_name == 'logistic':
+        if start is not None:
+            guesses['loc'] = start[-2]
+        params = scipy_distribution.fit(data, *shapes, **guesses)
+    else:
+        params = scipy_distribution.fit(data, *shapes, floc=0, **guesses)
+
+    return params
+
+
+def bootstrap_distribution(distribution_name: str, lengths: np.ndarray, delta: np.ndarray, start: tuple,
+                           probabilities: list, n_replicates: int, seed, use_scipy: bool = False) -> np.ndarray:
+    """
+    Fit a distribution on bootstrap replicates of a censored dataset. Each replicate is obtained by resampling with
+    replacement the (length, delta) pairs, so that the censoring of each length is kept. This is a module level
+    function so that it can be used in a process pool.
+
+    :param distribution_name: Name of the scipy distribution
+    :param lengths: Array of the lengths
+    :param delta: Array of the censoring flags of the lengths (1 complete, 0 censored)
+    :param start: Parameters fitted on the original dataset, used as starting parameters of each fit
+    :param probabilities: List of probabilities of the quantiles calculated for each replicate
+    :param n_replicates: Number of replicates
+    :param seed: Seed of the random generator (int or numpy SeedSequence)
+    :param use_scipy: Always use the scipy fit method. Default is False
+    :return: Array with a row for each replicate with the fitted parameters followed by the quantiles. The rows of
+     the replicates whose fit failed are NaN
+    """
+
+    rng = np.random.default_rng(seed)
+    scipy_distribution = getattr(ss, distribution_name)
+    n_lengths = len(lengths)
+
+    results = np.full((n_replicates, len(start) + len(probabilities)), np.nan)
+
+    for i in range(n_replicates):
+        index = rng.integers(0, n_lengths, n_lengths)
+        sample = lengths[index]
+        complete = delta[index] == 1
+
+        try:
+            params = fit_distribution(distribution_name, sample[complete], sample[~complete], use_scipy, start)
+        except (ValueError, RuntimeError, ArithmeticError, np.linalg.LinAlgError):
+            continue  # fit errors on degenerate replicates (e.g. no complete lengths), counted as failed
+
+        results[i, :len(start)] = params
+        results[i, len(start):] = scipy_distribution.ppf(probabilities, *params)
+
+    return results
 
 
 class NetworkData:
@@ -109,6 +200,24 @@ class NetworkData:
 
         return self._censored_lengths
 
+    @property
+    def fit_lengths(self) -> tuple:
+
+        """
+        This property returns the (complete, right censored) lengths fitted by NetworkFitter. Without survival analysis
+        the censored lengths are None and the complete lengths are the non-censored lengths (complete_only) or all the
+        lengths.
+
+        :getter: Return the tuple of the complete and censored lengths
+        """
+
+        if self.use_survival:
+            return self.non_censored_lengths, self.censored_lengths
+        elif self.complete_only:
+            return self.non_censored_lengths, None
+        else:
+            return self.lengths, None
+
     @property
     def function_list(self) -> list:
         """
@@ -402,9 +511,7 @@ class NetworkDistribution:
 
     @property
     def Akaike_rank(self):
-        fitter_records = self.parent.fit_records()
-        name = self.distribution_name
-        return fitter_records.loc[fitter_records['name'] == name, 'Akaike_rank'].values[0]
+        return self.parent.fit_record(self.distribution_name)['Akaike_rank']
 
     @property
     def BIC(self) -> float:
@@ -433,27 +540,14 @@ class NetworkDistribution:
         """
         Z = self.distribution.cdf(self.fit_data.lengths)
         G_n = self.fit_data.ecdf
-        tot_n = self.fit_data.total_n_fractures
         delta = self.fit_data.delta
 
-        complete_list_index = np.where(delta == 1)[0]
-        diff_plus_list = []
-        diff_minus_list = []
-
-        for j in complete_list_index:
-            diff_plus = G_n[j] - Z[j]  # Calculate the positive difference at index j (DC+)
-
-            if j + 1 > tot_n - 1:  # Check if j+1 (0 indexed) is bigger than the total number tot_n (1 indexed)
-                Z_j1 = 1
-            else:
-                Z_j1 = Z[j + 1]
+        Z_j1 = np.append(Z[1:], 1)  # Z[j+1] with Z = 1 after the last value
 
-            diff_minus = Z_j1 - G_n[j]  # Calculate the negative difference at index j (DC-)
-            diff_plus_list.append(diff_plus)
-            diff_minus_list.append(diff_minus)
+        complete = delta == 1
 
-        DCn_pos = max(diff_plus_list)
-        DCn_neg = max(diff_minus_list)
+        DCn_pos = np.max(G_n[complete] - Z[complete])  # Positive differences (DC+) at the complete values
+        DCn_neg = np.max(Z_j1[complete] - G_n[complete])  # Negative differences (DC-) at the complete values
 
         DCn = max(DCn_pos, DCn_neg)
 
@@ -461,9 +555,7 @@ class NetworkDistribution:
 
     @property
     def KS_rank(self):
-        fitter_records = self.parent.fit_records()
-        name = self.distribution_name
-        return fitter_records.loc[fitter_records['name'] == name, 'KS_rank'].values[0]
+        return self.parent.fit_record(self.distribution_name)['KS_rank']
 
     @property
     def KG_distance(self) -> float:
@@ -480,15 +572,10 @@ class NetworkDistribution:
         Z = self.distribution.cdf(self.fit_data.lengths)
         G_n = self.fit_data.ecdf
         tot_n = self.fit_data.total_n_fractures
-        kg_sum = 0
 
-        for j in range(tot_n):
+        Z_j1 = np.append(Z[1:], 1)  # Z[j+1] with Z = 1 after the last value
 
-            if j + 1 > tot_n - 1:  # Check if j+1 (0 indexed) is bigger than the total number tot_n (1 indexed)
-                Z_j1 = 1
-            else:
-                Z_j1 = Z[j + 1]
-            kg_sum += G_n[j] * (Z_j1 - Z[j]) * (G_n[j] - (Z_j1 + Z[j]))
+        kg_sum = np.sum(G_n * (Z_j1 - Z) * (G_n - (Z_j1 + Z)))
 
         psi_sq = (tot_n * kg_sum) + tot_n / 3
 
@@ -496,9 +583,7 @@ class NetworkDistribution:
 
     @property
     def KG_rank(self):
-        fitter_records = self.parent.fit_records()
-        name = self.distribution_name
-        return fitter_records.loc[fitter_records['name'] == name, 'KG_rank'].values[0]
+        return self.parent.fit_record(self.distribution_name)['KG_rank']
 
     @property
     def AD_distance(self) -> float:
@@ -516,26 +601,16 @@ class NetworkDistribution:
         G_n = self.fit_data.ecdf
         tot_n = self.fit_data.total_n_fractures
 
-        sum1 = 0  # First sum
-        sum2 = 0  # Second sum
-        if Z[-1] == 1:
-            Z[-1] -= smallest_number  # this is to avoid 0 in ln(1 - Z[-1])
-        elif Z[-1] == 0:
-            Z[-1] += smallest_number  # this is to avoid 0 in ln(Z[-1])
-        for j in range(tot_n - 1):
+        # this is to avoid 0 in ln(Z) and ln(1 - Z)
+        Z = np.where(Z == 0, smallest_number, Z)
+        Z = np.where(Z == 1, 1 - smallest_number, Z)
 
-            if Z[j + 1] == 0:
-                Z[j + 1] += smallest_number  # this is to avoid 0 in ln(Z[j + 1])
-            elif Z[j + 1] == 1:
-                Z[j + 1] -= smallest_number  # this is to avoid 0 in ln(1 - Z[j + 1])
+        ln_Z = ln(Z)
+        ln_1_Z = ln(1 - Z)
+        G_j = G_n[:-1]
 
-            if Z[j] == 0:
-                Z[j] += smallest_number  # this is to avoid 0 in ln(Z[j])
-            elif Z[j] == 1:
-                Z[j] -= smallest_number  # this is to avoid 0 in ln(1 - Z[j])
-
-            sum1 += (G_n[j] ** 2) * (-ln(1 - Z[j + 1]) + ln(Z[j + 1]) + ln(1 - Z[j]) - ln(Z[j]))
-            sum2 += G_n[j] * (-ln(1 - Z[j + 1]) + ln(1 - Z[j]))
+        sum1 = np.sum((G_j ** 2) * (-ln_1_Z[1:] + ln_Z[1:] + ln_1_Z[:-1] - ln_Z[:-1]))  # First sum
+        sum2 = np.sum(G_j * (-ln_1_Z[1:] + ln_1_Z[:-1]))  # Second sum
 
         AC_sq = (tot_n * sum1) - (2 * tot_n * sum2) - (tot_n * ln(1 - Z[-1])) - (tot_n * ln(Z[-1])) - tot_n
 
@@ -543,15 +618,11 @@ class NetworkDistribution:
 
     @property
     def AD_rank(self):
-        fitter_records = self.parent.fit_records()
-        name = self.distribution_name
-        return fitter_records.loc[fitter_records['name'] == name, 'AD_rank'].values[0]
+        return self.parent.fit_record(self.distribution_name)['AD_rank']
 
     @property
     def Mean_rank(self):
-        fitter_records = self.parent.fit_records()
-        name = self.distribution_name
-        return fitter_records.loc[fitter_records['name'] == name, 'Mean_rank'].values[0]
+        return self.parent.fit_record(self.distribution_name)['Mean_rank']
 
 
 class NetworkFitter:
@@ -583,6 +654,8 @@ class NetworkFitter:
                                                             'Akaike_rank', 'KS_rank',
                                                             'KG_rank', 'AD_rank',
                                                             'Mean_rank', 'distribution'])
+        self._records_version: int = 0  # incremented each time the fit records are modified
+        self._sorted_records: dict = {}  # sort_by: (version, sorted fit records, records by name)
 
         self.network_data = NetworkData(obj, use_survival, complete_only)
 
@@ -598,51 +671,126 @@ class NetworkFitter:
     def network_data(self, data: NetworkData):
         self._net_data = data
 
-    def fit(self, distribution_name: str):
+    @property
+    def use_AIC(self) -> bool:
+        """
+        Property that returns if AIC (True) or AICc (False) is used for model selection
+        :return:
+        """
+        return self._AIC_flag
+
+    @profiled
+    def fit(self, distribution_name: str, use_scipy: bool = False):
 
         """
         Fit the data of the entity_df using scipy available distributions
         :param distribution_name: Name of the distribution to fit
+        :param use_scipy: Always use the scipy fit method instead of the closed-form likelihoods (see
+         fit_distribution). Default is False
         :return:
         """
         print(f'Fitting {distribution_name} on data')
-        last_pos = len(self._fit_dataframe)  # The position of a new entry in the dataframe will be the last (i.e. the length of the dataframe)
 
-        self._fit_dataframe.loc[last_pos, 'name'] = distribution_name
+        uncensored, censored = self.network_data.fit_lengths
+        params = fit_distribution(distribution_name, uncensored, censored, use_scipy)
 
-        scipy_distribution = getattr(ss, distribution_name)
+        self._add_fit_records([distribution_name], [params])
 
-        if distribution_name == 'norm' or distribution_name == 'logistic':
-            params = scipy_distribution.fit(self.network_data.data)
-        else:
-            params = scipy_distribution.fit(self.network_data.data, floc=0)
+    @profiled
+    def fit_many(self, distribution_names: list, executor: Executor = None, use_scipy: bool = False):
+
+        """
+        Fit the data of the entity_df using a list of scipy available distributions. The fits are independent and
+        can be run in parallel using a concurrent.futures executor. The results are added to the fit records at the
+        end, once all the fits are done.
 
-        distribution = NetworkDistribution(parent=self, obj=scipy_distribution,
-                                           parameters=params, fit_data=self.network_data)
+        :param distribution_names: List of names of the distributions to fit
+        :param executor: concurrent.futures Executor (e.g. ProcessPoolExecutor or ThreadPoolExecutor) used to run the
+         fits. If None (default) the fits are run sequentially.
+        :param use_scipy: Always use the scipy fit method instead of the closed-form likelihoods (see
+         fit_distribution). Default is False
+        :return:
+
+        Examples
+        ---------
+        >>> from concurrent.futures import ProcessPoolExecutor
+        >>> with ProcessPoolExecutor() as executor:
+        ...     fitter.fit_many(['lognorm', 'weibull_min', 'gamma', 'expon'], executor=executor)
+        """
+        print(f'Fitting {", ".join(distribution_names)} on data')
+
+        uncensored, censored = self.network_data.fit_lengths
+        n_names = len(distribution_names)
+        args = (distribution_names, repeat(uncensored, n_names), repeat(censored, n_names), repeat(use_scipy, n_names))
 
-        if self._AIC_flag:
-            akaike = distribution.AIC
+        if executor is None:
+            params_list = list(map(fit_distribution, *args))
         else:
-            akaike = distribution.AICc
+            params_list = list(executor.map(fit_distribution, *args))
 
-        self._fit_dataframe.loc[last_pos, 'Akaike'] = akaike
+        self._add_fit_records(distribution_names, params_list)
 
-        log_likelihood = distribution.max_log_likelihood
+    def add_fitted_distributions(self, distribution_names: list, params_list: list):
+
+        """
+        Add to the fit records distributions with known parameters (for example fitted parameters saved with
+        the network) without fitting the data again.
+
+        :param distribution_names: List of names of the distributions
+        :param params_list: List of parameters of the distributions (same order of distribution_names)
+        :return:
+        """
+
+        self._add_fit_records(distribution_names, params_list)
+
+    @profiled
+    def _add_fit_records(self, distribution_names: list, params_list: list):
+
+        """
+        Internal method used to add the fitted distributions to the fit records dataframe. The goodness of fit
+        distances are calculated for the new distributions while delta_i, w_i and the ranks are updated once
+        for the whole dataframe.
+
+        :param distribution_names: List of names of the fitted distributions
+        :param params_list: List of fitted parameters (same order of distribution_names)
+        """
 
-        self._fit_dataframe.loc[last_pos, 'max_log_likelihood'] = log_likelihood
-        for i, AIC_val in enumerate(self._fit_dataframe['Akaike']):
-            d_i = AIC_val - min(self._fit_dataframe['Akaike'])
-            self._fit_dataframe.loc[i, 'delta_i'] = d_i
-        delta_values = (-self._fit_dataframe['delta_i'].values/2).astype(float)
-        total = exp(delta_values).sum()
+        records = []
+        add_items(len(distribution_names))
 
-        for d, delta_i in enumerate(self._fit_dataframe['delta_i']):
-            w_i = np.round(exp(-delta_i/2)/total, 5)
-            self._fit_dataframe.loc[d, 'w_i'] = w_i
+        for distribution_name, params in zip(distribution_names, params_list):
 
-        self._fit_dataframe.loc[last_pos, 'KS_distance'] = distribution.KS_distance
-        self._fit_dataframe.loc[last_pos, 'KG_distance'] = distribution.KG_distance
-        self._fit_dataframe.loc[last_pos, 'AD_distance'] = distribution.AD_distance
+            scipy_distribution = getattr(ss, distribution_name)
+
+            distribution = NetworkDistribution(parent=self, obj=scipy_distribution,
+                                               parameters=params, fit_data=self.network_data)
+
+            if self._AIC_flag:
+                akaike = distribution.AIC
+            else:
+                akaike = distribution.AICc
+
+            records.append({'name': distribution_name,
+                            'Akaike': akaike,
+                            'max_log_likelihood': distribution.max_log_likelihood,
+                            'KS_distance': distribution.KS_distance,
+                            'KG_distance': distribution.KG_distance,
+                            'AD_distance': distribution.AD_distance,
+                            'distribution': distribution})
+
+        new_records = DataFrame(records, columns=self._fit_dataframe.columns)
+
+        if self._fit_dataframe.empty:
+            self._fit_dataframe = new_records
+        else:
+            self._fit_dataframe = pd.concat([self._fit_dataframe, new_records], ignore_index=True)
+
+        akaike_values = self._fit_dataframe['Akaike'].values.astype(float)
+        delta_values = akaike_values - akaike_values.min()
+        total = exp(-delta_values/2).sum()
+
+        self._fit_dataframe['delta_i'] = delta_values
+        self._fit_dataframe['w_i'] = np.round(exp(-delta_values/2)/total, 5)
 
         self._fit_dataframe['Akaike_rank'] = ss.rankdata(self._fit_dataframe['Akaike']).astype(int)
         self._fit_dataframe['KS_rank'] = ss.rankdata(self._fit_dataframe['KS_distance']).astype(int)
@@ -650,15 +798,52 @@ class NetworkFitter:
         self._fit_dataframe['AD_rank'] = ss.rankdata(self._fit_dataframe['AD_distance']).astype(int)
         self._fit_dataframe['Mean_rank'] = self._fit_dataframe.iloc[:, 8:12].mean(axis=1)
 
-        self._fit_dataframe.loc[last_pos, 'distribution'] = distribution
+        self._records_version += 1
 
         # self._fit_dataframe.loc[last_pos, 'params'] = params  # this gives out an error for setting the df, I do not know why
 
+    def _sorted_fit_records(self, sort_by='Akaike') -> tuple:
+
+        """
+        Internal method that returns the fit dataframe sorted by sort_by and a dictionary of the records indexed by
+        distribution name. The sorted views are cached for each sort_by key and rebuilt only when the fit records
+        are modified (i.e. when the records version changes).
+
+        :param sort_by: Column name to sort the fit dataframe
+        :return: Tuple of the sorted dataframe and the dictionary of records
+        """
+
+        cached = self._sorted_records.get(sort_by)
+
+        if cached is None or cached[0] != self._records_version:
+            sorted_df = self._fit_dataframe.sort_values(by=sort_by, ignore_index=True)
+            records = {}
+            for record in sorted_df.to_dict('records'):
+                records.setdefault(record['name'], record)  # keep the first record in the sorted order
+            cached = (self._records_version, sorted_df, records)
+            self._sorted_records[sort_by] = cached
+
+        return cached[1], cached[2]
+
     def fit_records(self, sort_by='Akaike') -> DataFrame:
 
         """ Return the sorted fit dataframe"""
 
-        return self._fit_dataframe.sort_values(by=sort_by, ignore_index=True)
+        fit_records, _ = self._sorted_fit_records(sort_by)
+
+        return fit_records.copy()
+
+    def fit_record(self, distribution_name: str, sort_by='Akaike') -> dict:
+
+        """
+        Return the fit record of the given distribution as a dictionary (column: value)
+        :param distribution_name: name of the distribution
+        :param sort_by: Column name to sort the output order
+        :return:
+        """
+        _, records = self._sorted_fit_records(sort_by)
+
+        return records[distribution_name]
 
     def get_fitted_distribution(self, distribution_name: str, sort_by='Akaike') -> NetworkDistribution:
 
@@ -668,10 +853,8 @@ class NetworkFitter:
         :param sort_by: Column name to sort the output order
         :return:
         """
-        fit_records = self.fit_records(sort_by)
-        distribution = fit_records.loc[fit_records['name'] == distribution_name, 'distribution'].values[0]
 
-        return distribution
+        return self.fit_record(distribution_name, sort_by)['distribution']
 
     def get_fitted_distribution_names(self, sort_by='Akaike') -> list:
 
@@ -680,8 +863,9 @@ class NetworkFitter:
         :param sort_by: Column name to sort the output order
         :return:
         """
+        fit_records, _ = self._sorted_fit_records(sort_by)
 
-        return self.fit_records(sort_by)['name'].values
+        return fit_records['name'].values
 
     def get_fitted_distribution_list(self, distribution_names: list = None, sort_by='Akaike') -> list:
         """
@@ -690,15 +874,11 @@ class NetworkFitter:
         :param sort_by: Column name to sort the output order
         :return:
         """
-        fit_records = self.fit_records(sort_by)
+        fit_records, records = self._sorted_fit_records(sort_by)
         if distribution_names is None:
             distribution_names = fit_records['name'].tolist()
 
-        distribution_list = []
-
-        for name in distribution_names:
-            distribution = fit_records.loc[fit_records['name'] == name, 'distribution'].values[0]
-            distribution_list.append(distribution)
+        distribution_list = [records[name]['distribution'] for name in distribution_names]
 
         return distribution_list
 
@@ -708,8 +888,7 @@ class NetworkFitter:
         :param distribution_name: Name of the distribution
         :param sort_by: Column name to sort the output order
         """
-        fit_records = self.fit_records(sort_by)
-        dist = fit_records.loc[fit_records['name'] == distribution_name, 'distribution'].values[0]
+        dist = self.fit_record(distribution_name, sort_by)['distribution']
         parameters = dist.distribution_parameters
         return parameters
 
@@ -720,7 +899,7 @@ class NetworkFitter:
         :return: Pandas DataFrame
         """
 
-        fit_records = self.fit_records(sort_by)
+        fit_records, _ = self._sorted_fit_records(sort_by)
 
         if distribution_names is None:
             distribution_names = fit_records['name'].tolist()
@@ -739,9 +918,128 @@ class NetworkFitter:
         :return:
         """
 
-        df = self.fit_records(sort_by)
+        df, _ = self._sorted_fit_records(sort_by)
+
+        return df.loc[0].copy()
 
-        return df.loc[0]
+    @profiled
+    def bootstrap(self, distribution_names: list = None, n_replicates: int = 1000, seed: int = None,
+                  confidence: float = 0.95, probabilities: list = (0.05, 0.5, 0.95), executor: Executor = None,
+                  chunk_size: int = 100, use_scipy: bool = False, return_replicates: bool = False):
+
+        """
+        Calculate the bootstrap confidence intervals of the fitted parameters and of the quantiles of the given
+        distributions. The (length, delta) pairs of the network data are resampled with replacement and each
+        replicate is fitted starting from the parameters fitted on the original data. The intervals are the
+        percentile intervals of the replicates.
+
+        The replicates are split in chunks of chunk_size replicates, each with its own random generator spawned
+        from the seed, so that the results do not depend on the executor used. The chunks can be run in parallel
+        using a concurrent.futures executor.
+
+        :param distribution_names: List of names of the distributions. The distributions not yet fitted are fitted.
+         If None (default) all the fitted distributions are used
+        :param n_replicates: Number of bootstrap replicates. Default is 1000
+        :param seed: Seed of the random generator. Default is None (not reproducible)
+        :param confidence: Confidence level of the intervals. Default is 0.95
+        :param probabilities: Probabilities of the quantiles. Default is (0.05, 0.5, 0.95) i.e. b5, median and b95
+        :param executor: concurrent.futures Executor (e.g. ProcessPoolExecutor) used to run the chunks of
+         replicates. If None (default) the chunks are run sequentially.
+        :param chunk_size: Number of replicates of each chunk. Default is 100
+        :param use_scipy: Always use the scipy fit method (see fit_distribution). Default is False
+        :param return_replicates: Return also the fitted values of each replicate. Default is False
+        :return: DataFrame indexed by distribution and statistic (parameter names and b{percentage} for the quantiles)
+         with the estimate on the original data, the standard error, the lower and upper bounds, the number of
+         replicates that converged (n_valid) and that did not (n_failed). If no replicate of a distribution converged
+         (e.g. with very small or degenerate samples) its bounds and standard errors are NaN. If return_replicates
+         is True also a dictionary {name: DataFrame of the replicates}
+
+        Examples
+        ---------
+        >>> from concurrent.futures import ProcessPoolExecutor
+        >>> with ProcessPoolExecutor() as executor:
+        ...     intervals = fitter.bootstrap(['lognorm', 'weibull_min'], n_replicates=5000, seed=42, executor=executor)
+        """
+
+        if distribution_names is None:
+            distribution_names = list(self.get_fitted_distribution_names())
+        else:
+            fitted = set(self.get_fitted_distribution_names())
+            missing = [name for name in distribution_names if name not in fitted]
+            if missing:
+                self.fit_many(missing, use_scipy=use_scipy)
+
+        network_data = self.network_data
+
+        if network_data.use_survival:
+            lengths, delta = network_data.lengths, network_data.delta
+        elif network_data.complete_only:
+            lengths = network_data.non_censored_lengths
+            delta = np.ones(len(lengths), dtype=int)
+        else:
+            lengths, delta = network_data.lengths, np.ones(len(network_data.lengths), dtype=int)
+
+        print(f'Bootstrapping {", ".join(distribution_names)} with {n_replicates} replicates')
+
+        chunks = [chunk_size] * (n_replicates // chunk_size)
+        if n_replicates % chunk_size:
+            chunks.append(n_replicates % chunk_size)
+
+        seeds = np.random.SeedSequence(seed).spawn(len(distribution_names) * len(chunks))
+        probabilities = list(probabilities)
+        alpha = (1 - confidence) / 2
+
+        rows = []
+        replicates = dict()
+
+        for i, name in enumerate(distribution_names):
+            start = tuple(self.get_fitted_parameters(name))
+            n_chunks = len(chunks)
+
+            args = (repeat(name, n_chunks), repeat(lengths, n_chunks), repeat(delta, n_chunks),
+                    repeat(start, n_chunks), repeat(probabilities, n_chunks), chunks,
+                    seeds[i * n_chunks:(i + 1) * n_chunks], repeat(use_scipy, n_chunks))
+
+            if executor is None:
+                results = list(map(bootstrap_distribution, *args))
+            else:
+                results = list(executor.map(bootstrap_distribution, *args))
+
+            scipy_distribution = getattr(ss, name)
+            shapes = scipy_distribution.shapes.split(', ') if scipy_distribution.shapes else []
+            columns = shapes + ['loc', 'scale'] + [f'b{100 * p:g}' for p in probabilities]
+
+            values = DataFrame(np.vstack(results), columns=columns)
+            estimates = list(start) + list(scipy_distribution.ppf(probabilities, *start))
+
+            n_failed = int(values.isna().all(axis=1).sum())
+            if n_failed == n_replicates:
+                print(f'No bootstrap replicate of {name} converged, the intervals of {name} are NaN')
+            elif n_failed > 0:
+                print(f'{n_failed} of {n_replicates} bootstrap replicates of {name} did not converge')
+
+            for column, estimate in zip(columns, estimates):
+                if column == 'loc' and name != 'norm' and name != 'logistic':
+                    continue  # the location is fixed to 0
+                column_values = values[column].dropna().values
+                n_valid = len(column_values)
+                rows.append({'distribution': name, 'statistic': column, 'estimate': estimate,
+                             'std_error': np.std(column_values, ddof=1) if n_valid > 1 else np.nan,
+                             'lower': np.quantile(column_values, alpha) if n_valid > 0 else np.nan,
+                             'upper': np.quantile(column_values, 1 - alpha) if n_valid > 0 else np.nan,
+                             'n_valid': n_valid,
+                             'n_failed': n_replicates - n_valid})
+
+            replicates[name] = values
+
+        add_items(n_replicates * len(distribution_names))
+
+        intervals = DataFrame(rows).set_index(['distribution', 'statistic'])
+
+        if return_replicates:
+            return intervals, replicates
+        else:
+            return intervals
 
     # ====================== Plot ==========================
 
@@ -762,6 +1060,8 @@ class NetworkFitter:
         :return:
         """
 
+        import fracability.Plotters as plotter
+
         plotter.matplot_stats_uniform(self, show_plot, position, sort_by, bw, second_axis, n_ticks)
 
     def tick_plot(self, show_plot: bool = True,
@@ -776,6 +1076,8 @@ class NetworkFitter:
         :return:
         """
 
+        import fracability.Plotters as plotter
+
         plotter.matplot_tick_plot(self, show_plot=show_plot, position=position, n_ticks=n_ticks, sort_by=sort_by)
 
     def plot_summary(self, show_plot:bool = True, position: list = None, sort_by: str = 'Akaike'):
@@ -787,6 +1089,8 @@ class NetworkFitter:
         :return:
         """
 
+        import fracability.Plotters as plotter
+
         plotter.matplot_stats_summary(self, show_plot=show_plot, position=position, sort_by=sort_by)
 
     # ====================== Export ==========================
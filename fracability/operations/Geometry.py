@@ -1,10 +1,18 @@
+from concurrent.futures import Executor
 from copy import deepcopy
+from itertools import repeat
 
+import numpy as np
+
+from geopandas import GeoDataFrame
 from pyvista import PolyData
+from shapely import get_coordinates, intersection, overlaps, touches
 from vtkmodules.vtkFiltersCore import vtkCleanPolyData
 
 from fracability.AbstractClasses import BaseEntity
+from fracability.utils.profiling import profiled, add_items, progress
 from fracability.utils.shp_operations import int_node
+from fracability.utils.general_use import grid_bboxes
 
 def connect_dots(vtk_obj: PolyData) -> PolyData:
 
@@ -27,8 +35,20 @@ def connect_dots(vtk_obj: PolyData) -> PolyData:
 
 
 #@Halo(text='Calculating intersections', spinner='line', placement='right')
-def tidy_intersections(obj, buffer=0.05, inplace: bool = True):
-    """Method used to tidy shapefile intersections between fractures in a fracture or fracture network object."""
+@profiled
+def tidy_intersections(obj, buffer=0.05, inplace: bool = True, tiles: tuple = None, halo: float = None,
+                       executor: Executor = None):
+    """Method used to tidy shapefile intersections between fractures in a fracture or fracture network object.
+
+    :param obj: Fractures or FractureNetwork object
+    :param buffer: Buffer applied to the geometries to find the intersections. Default is 0.05
+    :param inplace: If true replace the geometries of the object, if false return a tidied copy. Default is True
+    :param tiles: Number of tiles (n_x, n_y) used to split the network. If None (default) the whole network is
+     tidied at once. See tiled_tidy_geometries
+    :param halo: Width of the overlap around each tile. Used only with tiles. Default is None
+    :param executor: concurrent.futures executor (e.g. ProcessPoolExecutor) used to tidy the tiles in parallel.
+     Used only with tiles. Default is None (tiles are tidied one after the other)
+    """
 
     if obj.name == 'FractureNetwork':
         gdf = obj.fracture_network_to_components_df()
@@ -39,35 +59,201 @@ def tidy_intersections(obj, buffer=0.05, inplace: bool = True):
         print('Cannot tidy intersection for nodes or only boundaries')
         return
 
+    gdf = gdf.reset_index(drop=True)
+
+    if tiles is None:
+        geometries = tidy_geometries(gdf, buffer)
+    else:
+        geometries = tiled_tidy_geometries(gdf, tiles, halo, buffer, executor)
+
+    gdf['geometry'] = geometries
+
+    if inplace:
+        obj.entity_df = gdf
+    else:
+        copy_obj = deepcopy(obj)
+        copy_obj.entity_df = gdf
+        return copy_obj
+
+
+@profiled
+def tidy_geometries(gdf: GeoDataFrame, buffer: float = 0.05, pair_cache: dict = None,
+                    record: dict = None) -> np.ndarray:
+    """Calculate and add the intersection nodes to the geometries of a GeoDataFrame of fractures and boundaries.
+
+    :param gdf: GeoDataFrame with a positional index (0...n-1). The type column is used to identify the boundaries.
+    :param buffer: Buffer applied to the geometries to find the intersections. Default is 0.05
+    :param pair_cache: Dictionary {(line index, other line index): (line, other line, {index: new geometry})} of
+     intersections already calculated. The new geometries are used only if the two lines are exactly the same of the
+     current ones, otherwise the intersection is calculated again. Default is None
+    :param record: If a dictionary is given, the (line, other line, {index: new geometry}) of each intersection
+     between two fractures is stored in it with the (line index, other line index) key. Default is None
+    :return: Array of the tidied geometries, in the same order of the GeoDataFrame
+    """
+
+    input_geometries = gdf['geometry'].values
+    geometries = np.array(input_geometries)  # Working copy of the geometries, returned once at the end
+    is_boundary = (gdf['type'] == 'boundary').values
+
+    # Get all the candidate pairs in one query: each line (input) is tested against the buffered lines (tree).
+    # The buffer only grows the search area so that T and Y intersections that are not pixel perfect are found.
     df_buffer = gdf.buffer(buffer)
-    print('\n\n')
-    for idx_line1, line in gdf.iterrows():
-        print(f'Calculating intersections on fracture: {idx_line1+1}/{len(gdf.index)}', end='\r')
+    idx_line, idx_buffer = df_buffer.sindex.query(gdf.geometry, predicate='intersects')
 
-        if line['type'] == 'boundary':
-            continue
+    # Boundaries are never used as reference line (line1) since they are only used to add nodes to the fractures.
+    # Pairs are sorted to follow the line1, line2 order of a full scan: int_node works on the geometries updated by
+    # the previous pairs so the order defines which nodes are inserted.
+    pair_mask = (idx_line != idx_buffer) & ~is_boundary[idx_line]
+    pairs = np.column_stack((idx_line[pair_mask], idx_buffer[pair_mask]))
+    pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+    add_items(len(pairs))
 
-        line1 = line['geometry']
+    tot_lines = len(gdf.index)
+    previous_line1 = -1
+    for idx_line1, idx_line2 in pairs:
+        if idx_line1 != previous_line1:
+            progress('Calculating intersections on fracture', idx_line1+1, tot_lines)
+            # As in the full scan, the first intersection of a reference line is calculated on its input geometry.
+            # The missing nodes are then added back when the other line is used as reference.
+            line1 = input_geometries[idx_line1]
+            previous_line1 = idx_line1
+        else:
+            line1 = geometries[idx_line1]  # Use as the reference line (in the int_node function) the new geometry.
 
-        idx_list = df_buffer.index[df_buffer.intersects(line1) == True]  # Subset the intersecting lines
-        idx_list = idx_list[idx_list != idx_line1]  # Exclude the reference line index to avoid self intersection
+        line2 = geometries[idx_line2]
 
-        intersections = gdf.loc[idx_list]
-        for line2, idx_line2 in zip(intersections['geometry'], idx_list):  # for each intersecting line:
+        cached = None if pair_cache is None else pair_cache.get((idx_line1, idx_line2))
+        if cached is not None and _same_line(cached[0], line1) and _same_line(cached[1], line2):
+            new_geom = cached[2]
+        else:
             new_geom = int_node(line1, line2, [idx_line1, idx_line2], gdf)  # Calculate and add the intersection node.
 
-            for key, value in new_geom.items():
-                gdf.loc[key, 'geometry'] = value  # substitute the original geometry with the new geometry
+        if record is not None and not is_boundary[idx_line2]:
+            record[(idx_line1, idx_line2)] = (line1, line2, new_geom)
 
-            line1 = gdf.loc[
-                idx_line1, 'geometry']  # Use as the reference line (in the int_node function) the new geometry.
+        for key, value in new_geom.items():
+            geometries[key] = value  # substitute the original geometry with the new geometry
 
-    if inplace:
-        obj.entity_df = gdf
+    progress('Calculating intersections on fracture', tot_lines, tot_lines)
+
+    return geometries
+
+
+@profiled
+def tiled_tidy_geometries(gdf: GeoDataFrame, tiles: tuple = (2, 2), halo: float = None, buffer: float = 0.05,
+                          executor: Executor = None) -> np.ndarray:
+    """Tidy the geometries of a GeoDataFrame splitting it in a regular grid of tiles that are processed
+    independently (and in parallel if an executor is given). The result is always the same of tidy_geometries.
+
+    Each fracture is owned by the tile containing the center of its bounding box. A tile is tidied together with
+    a halo made of the fractures closer than halo to the tile and of the fractures intersecting them, keeping the
+    order of the whole GeoDataFrame. Each tile stores the intersections calculated between two fractures with the
+    lines used to calculate them.
+
+    The whole GeoDataFrame is then tidied again in the order of the untiled run using the intersections stored by
+    the owner tile of the reference line: an intersection is used only if its two lines are exactly the lines of the
+    untiled run, otherwise it is calculated again. The intersections with the boundaries are calculated only in
+    this last step, since a boundary receives the nodes of all the tiles. Fractures touching a boundary, or reached
+    by a chain of intersections longer than the halo, are partly calculated again.
+
+    :param gdf: GeoDataFrame with a positional index (0...n-1). The type column is used to identify the boundaries.
+    :param tiles: Number of tiles (n_x, n_y). Default is (2, 2)
+    :param halo: Width of the overlap around each tile. If None (default) the mean side of the fracture
+     bounding boxes is used
+    :param buffer: Buffer applied to the geometries to find the intersections. Default is 0.05
+    :param executor: concurrent.futures executor (e.g. ProcessPoolExecutor) used to tidy the tiles in parallel.
+     Default is None (tiles are tidied one after the other)
+    :return: Array of the tidied geometries, in the same order of the GeoDataFrame
+    """
+
+    is_boundary = (gdf['type'] == 'boundary').values
+    fracture_indices = np.where(~is_boundary)[0]
+    if len(fracture_indices) == 0:
+        return tidy_geometries(gdf, buffer)
+
+    n_x, n_y = tiles
+    bounds = gdf.geometry.bounds.values
+    fracture_bounds = bounds[fracture_indices]
+    xmin, ymin = fracture_bounds[:, :2].min(axis=0)
+    xmax, ymax = fracture_bounds[:, 2:].max(axis=0)
+
+    # A network without width (or height) is not split along that axis
+    if xmax == xmin:
+        n_x = 1
+    if ymax == ymin:
+        n_y = 1
+
+    tile_bounds = grid_bboxes((xmin, ymin, xmax, ymax), n_x, n_y)
+
+    if halo is None:
+        halo = np.mean(fracture_bounds[:, 2:] - fracture_bounds[:, :2])
+
+    # Owner tile of each fracture (boundaries are owned by no tile)
+    center = (bounds[:, :2] + bounds[:, 2:]) / 2
+    column = _grid_cell(center[:, 0], xmin, xmax, n_x)
+    row = _grid_cell(center[:, 1], ymin, ymax, n_y)
+    owner = np.where(is_boundary, -1, row * n_x + column)
+
+    # Fractures intersecting the buffer of each fracture, the same candidates used by tidy_geometries
+    fracture_gdf = gdf.iloc[fracture_indices]
+    idx_line, idx_buffer = fracture_gdf.buffer(buffer).sindex.query(fracture_gdf.geometry, predicate='intersects')
+    idx_line, idx_buffer = fracture_indices[idx_line], fracture_indices[idx_buffer]
+
+    tile_rows = []  # (tile, index in gdf of each row of the tile)
+    for tile, (t_xmin, t_ymin, t_xmax, t_ymax) in enumerate(tile_bounds):
+        owned = owner == tile
+        if not owned.any():
+            continue
+        in_tile = (owned | (bounds[:, 0] <= t_xmax + halo) & (bounds[:, 2] >= t_xmin - halo) &
+                   (bounds[:, 1] <= t_ymax + halo) & (bounds[:, 3] >= t_ymin - halo)) & ~is_boundary
+        in_tile[idx_buffer[in_tile[idx_line]]] = True
+        tile_rows.append((tile, np.where(in_tile)[0]))
+
+    add_items(len(tile_rows))
+
+    arguments = ([gdf.iloc[rows].reset_index(drop=True) for _, rows in tile_rows], repeat(buffer))
+    if executor is None:
+        records = map(_tidy_tile, *arguments)
     else:
-        copy_obj = deepcopy(obj)
-        copy_obj.entity_df = gdf
-        return copy_obj
+        records = executor.map(_tidy_tile, *arguments)
+
+    # Intersections calculated by the owner tile of the reference line, with the indices of the whole GeoDataFrame
+    pair_cache = dict()
+    for (tile, rows), record in zip(tile_rows, records):
+        for (idx_line1, idx_line2), (line1, line2, new_geom) in record.items():
+            if owner[rows[idx_line1]] == tile:
+                pair_cache[(rows[idx_line1], rows[idx_line2])] = (line1, line2, {rows[key]: value for key, value
+                                                                                in new_geom.items()})
+
+    return tidy_geometries(gdf, buffer, pair_cache=pair_cache)
+
+
+def _grid_cell(values: np.ndarray, v_min: float, v_max: float, n: int) -> np.ndarray:
+    """Internal function used to get the cell (0...n-1) of a regular grid between v_min and v_max containing each
+    value"""
+
+    if n == 1:
+        return np.zeros(len(values), dtype=int)
+
+    return np.clip(((values - v_min) / (v_max - v_min) * n).astype(int), 0, n - 1)
+
+
+def _same_line(line_1, line_2) -> bool:
+    """Internal function used to check if two lines are exactly the same (z included)"""
+
+    return line_1.geom_type == line_2.geom_type and line_1.has_z == line_2.has_z and \
+        np.array_equal(get_coordinates(line_1, include_z=line_1.has_z),
+                       get_coordinates(line_2, include_z=line_2.has_z))
+
+
+def _tidy_tile(gdf: GeoDataFrame, buffer: float) -> dict:
+    """Internal function used to tidy a single tile in tiled_tidy_geometries. The function is defined at module
+    level so that it can be sent to a process pool."""
+
+    record = dict()
+    tidy_geometries(gdf, buffer, record=record)
+
+    return record
 
 
 def calculate_seg_length(obj: BaseEntity, inplace: bool = True):
@@ -97,3 +283,74 @@ def calculate_seg_length(obj: BaseEntity, inplace: bool = True):
         copy_obj.entity_df = df
         return copy_obj
 
+
+
+@profiled
+def overlapping_pairs(gdf: GeoDataFrame) -> GeoDataFrame:
+    """Find the overlapping geometries of a GeoDataFrame. The candidate pairs are obtained with a single spatial
+    index query (intersects predicate) and the overlap predicate is then evaluated in bulk only on the candidates.
+    Each pair is reported once.
+
+    :param gdf: GeoDataFrame of the geometries to check. The og_line_id column is used to identify the geometries.
+    :return: GeoDataFrame with a row for each overlapping pair with the positional indices of the pair (index_1,
+     index_2), the og_line_id of the two geometries (og_line_id_1, og_line_id_2) and the overlap geometry.
+    """
+
+    geometries = np.asarray(gdf.geometry.values)
+
+    idx_1, idx_2 = gdf.sindex.query(geometries, predicate='intersects')
+
+    pairs = idx_1 < idx_2  # report each pair once
+    idx_1, idx_2 = idx_1[pairs], idx_2[pairs]
+
+    overlapping = overlaps(geometries[idx_1], geometries[idx_2])
+    idx_1, idx_2 = idx_1[overlapping], idx_2[overlapping]
+
+    return _pairs_report(gdf, idx_1, idx_2)
+
+
+@profiled
+def boundary_crossing_pairs(gdf: GeoDataFrame) -> GeoDataFrame:
+    """Find the geometries of a GeoDataFrame that cross a boundary (type == 'boundary') i.e. that intersect but do
+    not touch it. The candidate pairs are obtained with a single spatial index query on the boundaries and the
+    touches predicate is evaluated in bulk only on the candidates. Pairs of boundaries are reported once.
+
+    :param gdf: GeoDataFrame of the geometries to check. The type column is used to identify the boundaries while
+     the og_line_id column is used to identify the geometries.
+    :return: GeoDataFrame with a row for each crossing with the positional indices of the crossing geometry (index_1)
+     and of the boundary (index_2), the og_line_id of the two geometries (og_line_id_1, og_line_id_2) and the
+     intersection geometry.
+    """
+
+    geometries = np.asarray(gdf.geometry.values)
+    is_boundary = (gdf['type'] == 'boundary').values
+    boundary_index = np.where(is_boundary)[0]
+
+    idx_boundary, idx_geometry = gdf.sindex.query(geometries[boundary_index], predicate='intersects')
+    idx_boundary = boundary_index[idx_boundary]
+
+    pairs = (idx_boundary != idx_geometry) & ~(is_boundary[idx_geometry] & (idx_geometry < idx_boundary))
+    idx_boundary, idx_geometry = idx_boundary[pairs], idx_geometry[pairs]
+
+    crossing = ~touches(geometries[idx_geometry], geometries[idx_boundary])
+
+    return _pairs_report(gdf, idx_geometry[crossing], idx_boundary[crossing])
+
+
+def _pairs_report(gdf: GeoDataFrame, idx_1: np.ndarray, idx_2: np.ndarray) -> GeoDataFrame:
+    """Internal function used to build the report of the pairs of geometries found by the checks. The pairs are
+    sorted and the intersection of each pair is used as geometry."""
+
+    geometries = np.asarray(gdf.geometry.values)
+    og_line_id = gdf['og_line_id'].values
+
+    order = np.lexsort((idx_2, idx_1))
+    idx_1, idx_2 = idx_1[order], idx_2[order]
+
+    report = GeoDataFrame({'index_1': idx_1,
+                           'index_2': idx_2,
+                           'og_line_id_1': og_line_id[idx_1],
+                           'og_line_id_2': og_line_id[idx_2]},
+                          geometry=intersection(geometries[idx_1], geometries[idx_2]), crs=gdf.crs)
+
+    return report
@@ -1,10 +1,77 @@
-from shapely.geometry import Point
+from __future__ import annotations
+
 import numpy as np
-from itertools import chain
+from pandas import DataFrame
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+from shapely import points, linestrings, STRtree
 from pyvista import PolyData
 
+from fracability.utils.general_use import vtk_lines_arrays
+from fracability.utils.profiling import profiled, add_items
+
 
-def nodes_conn(obj):
+def point_cell_adjacency(offsets: np.ndarray, connectivity: np.ndarray, n_points: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Build the point -> cell adjacency of a set of cells in CSR form.
+
+    :param offsets: Offsets array of the cells (see vtk_lines_arrays)
+    :param connectivity: Connectivity array of the cells (see vtk_lines_arrays)
+    :param n_points: Number of points
+    :return: indptr and indices arrays. The ids of the cells containing the point i are indices[indptr[i]:indptr[i+1]],
+     sorted by cell id. A cell id is repeated if the point is used more than once in the cell.
+    """
+
+    conn_cells = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    sort_index = np.argsort(connectivity, kind='stable')
+
+    indptr = np.zeros(n_points + 1, dtype=int)
+    indptr[1:] = np.cumsum(np.bincount(connectivity, minlength=n_points))
+    indices = conn_cells[sort_index]
+
+    return indptr, indices
+
+
+@profiled
+def boundary_contacts(fracture_points: np.ndarray, boundary_vtk: PolyData, tolerance: float = 1e-5) -> np.ndarray:
+    """
+    Find the fracture points that are in contact with the boundary, i.e. points that are closer than the given tolerance
+    to a boundary vertex or segment.
+
+    Vertex contacts (the usual case after the intersections are tidied) are searched with a KDTree of the boundary
+    vertices. The remaining points are then tested against the boundary segments using a spatial index.
+
+    :param fracture_points: Array of the fracture points
+    :param boundary_vtk: Boundary PolyData
+    :param tolerance: Maximum distance from the boundary for a point to be in contact. Default is 1e-5
+    :return: Sorted array of the indexes of the fracture points in contact with the boundary
+    """
+
+    xy = fracture_points[:, :2]
+
+    vertex_tree = cKDTree(boundary_vtk.points[:, :2])
+    distance, _ = vertex_tree.query(xy, distance_upper_bound=tolerance)
+    contact = np.isfinite(distance)
+
+    offsets, connectivity = vtk_lines_arrays(boundary_vtk)
+    cell_sizes = np.diff(offsets)
+    conn_cells = np.repeat(np.arange(len(cell_sizes)), cell_sizes)
+    segment_mask = conn_cells[:-1] == conn_cells[1:]
+
+    if segment_mask.any():
+        segment_points = np.stack((connectivity[:-1][segment_mask], connectivity[1:][segment_mask]), axis=1)
+        segments = linestrings(boundary_vtk.points[segment_points.ravel(), :2],
+                               indices=np.repeat(np.arange(len(segment_points)), 2))
+        others = np.where(~contact)[0]
+        point_index, _ = STRtree(segments).query(points(xy[others]), predicate='dwithin', distance=tolerance)
+        contact[others[point_index]] = True
+
+    return np.where(contact)[0]
+
+
+@profiled
+def nodes_conn(obj, tolerance: float = 1e-5):
 
     """
     Define the topology of a network using networkx.degree. With this method also censored fractures are defined and
@@ -18,6 +85,8 @@ def nodes_conn(obj):
         + X node with node origin [w, x, y, z] -> quadruple intersection, makes no sense -> problem in the geometry
 
     :param obj: Fractures or FractureNetwork object
+    :param tolerance: Distance tolerance used to find the fracture points in contact with the boundary (U nodes).
+    Default is 1e-5
     :return: list of shapely geometry points, a list of corresponding node classes and a list of node origin
     """
 
@@ -26,69 +95,84 @@ def nodes_conn(obj):
     entity_df_obj = obj.fracture_network_to_components_df()
     point_dict = dict()
     origin_dict = dict()
-    ids = []
-
-    # to get all the nodes we append the start and end of a line (I nodes) and then the entire point_id list
-    for i, cell in enumerate(fractures_vtk.cell):
-        cell_ids = cell.point_ids
-        ids.append([cell_ids[0]])
-        ids.append([cell_ids[-1]])
-        ids.append(cell_ids)
 
-    # we then create a flattened list of the indexes
-    ids = list(chain.from_iterable(ids))
+    offsets, connectivity = vtk_lines_arrays(fractures_vtk)
+    n_points = fractures_vtk.n_points
+    n_cells = len(offsets) - 1
+    cell_sizes = np.diff(offsets)
+    non_empty = cell_sizes > 0
+    conn_cells = np.repeat(np.arange(n_cells), cell_sizes)  # cell id of each entry of the connectivity array
 
-    # and get the unique values that repeat more than once.
+    # to get all the nodes we count the start and end of a line (I nodes) and then the entire point_id list and
+    # get the ids that repeat more than once.
     # i.e. I nodes and all the nodes that repeat because of intersection with the fractures
-    u, c = np.unique(ids, return_counts=True)
+    start_ids = connectivity[offsets[:-1][non_empty]]
+    end_ids = connectivity[offsets[1:][non_empty] - 1]
+    counts = (np.bincount(connectivity, minlength=n_points) + np.bincount(start_ids, minlength=n_points)
+              + np.bincount(end_ids, minlength=n_points))
 
-    ids = u[c > 1]
+    ids = np.where(counts > 1)[0]
 
-    # To define boundary intersection we search for overlapping points (with a decimal precision of e-5).
-    # This method has a bit of a problem because vtk and shapely do not have the same precision and thus when comparing
-    # points after the e-5 values are different
+    # To define boundary intersection we search for the fracture points that are closer than the tolerance to the
+    # boundary vertices or segments.
     fracture_points = fractures_vtk.points
-    boundary_points = boundary_vtk.points
+    boundary_index = boundary_contacts(fracture_points, boundary_vtk, tolerance)
+
+    # Point -> cell adjacency (CSR) of the fracture lines: the cells containing the point i are
+    # point_cells[cells_indptr[i]:cells_indptr[i+1]] sorted by cell id
+    cells_indptr, point_cells = point_cell_adjacency(offsets, connectivity, n_points)
+
+    # We then explode the lines to get all the unique segments (edges) of each line. As in vtkExtractEdges, each edge
+    # keeps the set of the first cell that uses it.
+    segment_mask = conn_cells[:-1] == conn_cells[1:]
+    segments = np.sort(np.column_stack((connectivity[:-1], connectivity[1:]))[segment_mask], axis=1)
+    segment_cells = conn_cells[:-1][segment_mask]
+    not_degenerate = segments[:, 0] != segments[:, 1]
+    segments, first_index = np.unique(segments[not_degenerate], axis=0, return_index=True)
+    segment_sets = fractures_vtk['f_set'][segment_cells[not_degenerate][first_index]]
+
+    # this indicates the degree of the node (i.e. I, Y or X)
+    degree = np.bincount(segments.ravel(), minlength=n_points)
 
-    boundary_common = np.isin(np.round(fracture_points, 5), np.round(boundary_points, 5)).all(axis=1)
-    boundary_index = np.where(boundary_common == 1)[0]
+    # To get the node origin we count the sets of the segments that share the given node and sort them by
+    # increasing frequency (and set value for equal frequencies).
+    node_sets = np.column_stack((segments.ravel(), np.repeat(segment_sets, 2)))
+    node_sets, set_count = np.unique(node_sets, axis=0, return_counts=True)
+    node_sets = node_sets[np.lexsort((node_sets[:, 1], set_count, node_sets[:, 0]))]
+    sets_indptr = np.searchsorted(node_sets[:, 0], np.arange(n_points + 1))
 
-    # After we explode the fractures_vtk to get all the segments of each line
-    fractures_segm = fractures_vtk.extract_all_edges(use_all_points=True)
+    # Number of different lines sharing each node
+    cell_count = np.bincount(np.unique(np.column_stack((connectivity, conn_cells)), axis=0)[:, 0],
+                             minlength=n_points)
 
-    # We then loop for each node id that we found at the start
-    for i in ids:
-        # this indicates the degree of the node (i.e. I, Y or X)
-        neigh = fracture_points[fractures_segm.point_neighbors(i)]
+    for i in ids[cell_count[ids] >= 3]:
+        cells = np.unique(point_cells[cells_indptr[i]:cells_indptr[i+1]])
+        print(f'\n\nInvalid point for lines: {fractures_vtk["og_line_id"][cells]} '
+              f'\n\nsets: {fractures_vtk["f_set"][cells]}, \n\nThe node will be classified accordingly'
+              f' to the number of intersection however, the intersection must be checked!')
 
-        # these will be the cells id that contain the given node idx
-        cells = fractures_vtk.point_cell_ids(i)
+    node_ids = ids[degree[ids] != 2]
+    node_points = points(fracture_points[node_ids])
+    origin_strings = dict()  # The same set combinations repeat for many nodes so the string is created only once
 
-        # To get the node origin we find the unique values of the fracture set at the given node idx and sort
-        # using argsort to get the order that we want (i.e. increasing frequency)
-        sets = fractures_segm['f_set'][fractures_segm.point_cell_ids(i)]
-        u_sets, f_sets = np.unique(sets, return_counts=True)
-        sorting_index = np.argsort(f_sets)
+    for point, i in zip(node_points, node_ids):
+        u_sets = tuple(node_sets[sets_indptr[i]:sets_indptr[i+1], 1])
+        if u_sets not in origin_strings:
+            origin_strings[u_sets] = f'{np.array(u_sets, dtype=segment_sets.dtype)}'
 
-        if len(cells) >= 3:
-            print(f'\n\nInvalid point for lines: {fractures_vtk["og_line_id"][cells]} '
-                  f'\n\nsets: {fractures_vtk["f_set"][cells]}, \n\nThe node will be classified accordingly'
-                  f' to the number of intersection however, the intersection must be checked!')
+        point_dict[point] = [degree[i], i]
+        origin_dict[point] = origin_strings[u_sets]
 
-        if len(neigh) != 2:
-            point = Point(fracture_points[i])
-            point_dict[point] = [len(neigh), i]
-            origin_dict[point] = f'{u_sets[sorting_index]}'
+    censored_lines = point_cells[cells_indptr[boundary_index]]  # first cell containing the boundary node
 
-    for i in boundary_index:
-        point = Point(fracture_points[i])
-        f_cells = fractures_vtk.point_cell_ids(i)
-        origin_set = f'{fractures_vtk["f_set"][f_cells][0]}'
+    for point, i, cell in zip(points(fracture_points[boundary_index]), boundary_index, censored_lines):
+        origin_set = f'{fractures_vtk["f_set"][cell]}'
 
         point_dict[point] = [5, i]
         origin_dict[point] = f'{[origin_set, "b"]}'
 
-    censored_lines = [fractures_vtk.point_cell_ids(idx)[0] for idx in boundary_index]
+    add_items(len(point_dict))
+
     entity_df_obj.loc[censored_lines, 'censored'] = 1
     obj.entity_df = entity_df_obj
     #fracture_nodes = PolyData(fractures_vtk.points)
@@ -172,3 +256,95 @@ def nodes_conn(obj):
 #     backbone = PolyData(connectivity.GetOutput())
 #
 #     return backbone
+
+
+@profiled
+def fracture_clusters(fractures_vtk: PolyData, top_k: int = None, domain_bounds: tuple = None,
+                      spanning_tolerance: float = 0.01) -> tuple[np.ndarray, DataFrame]:
+    """
+    Calculate the clusters (connected components) of a fracture vtk object. Two fractures are connected if they share
+    a point, so the clusters are the connected components of the sparse fracture/point adjacency graph calculated with
+    scipy.sparse.csgraph in a single linear pass.
+
+    The clusters are sorted by number of fractures and total length (largest first). A cluster is spanning in x (or y)
+    if its extent covers the extent of the domain, minus the spanning tolerance, in x (or y).
+
+    :param fractures_vtk: PolyData of the fractures (one line cell per fracture)
+    :param top_k: Return only the k largest clusters. If None (default) all the clusters are returned
+    :param domain_bounds: Bounds (xmin, xmax, ymin, ymax, ...) of the domain used to define the spanning clusters. If
+     None (default) the bounds of the fractures are used.
+    :param spanning_tolerance: Tolerance used to define the spanning clusters as a fraction of the domain extent.
+     Default is 0.01
+    :return: Array with the cluster of each fracture (cell), -1 if the cluster is not returned, and dataframe with for
+     each cluster the number of fractures (n_fractures), the number of points (n_points), the total length and the
+     spanning flags (spanning_x, spanning_y and spanning).
+    """
+
+    offsets, connectivity = vtk_lines_arrays(fractures_vtk)
+    vtk_points = fractures_vtk.points
+    n_cells = len(offsets) - 1
+    n_points = fractures_vtk.n_points
+    add_items(n_cells)
+
+    conn_cells = np.repeat(np.arange(n_cells), np.diff(offsets))
+
+    # Fracture/point bipartite graph: the fractures are the nodes 0...n_cells-1, the points the following nodes
+    adjacency = coo_matrix((np.ones(len(connectivity), dtype=bool), (conn_cells, n_cells + connectivity)),
+                           shape=(n_cells + n_points, n_cells + n_points))
+
+    _, labels = connected_components(adjacency, directed=False)
+    _, cell_labels = np.unique(labels[:n_cells], return_inverse=True)
+    n_clusters = cell_labels.max() + 1 if n_cells > 0 else 0
+
+    # Length of each fracture as the sum of the length of its segments
+    segments = np.linalg.norm(vtk_points[connectivity[1:]] - vtk_points[connectivity[:-1]], axis=1)
+    same_cell = conn_cells[1:] == conn_cells[:-1]
+    cell_lengths = np.bincount(conn_cells[1:][same_cell], weights=segments[same_cell], minlength=n_cells)
+
+    n_fractures = np.bincount(cell_labels, minlength=n_clusters)
+    lengths = np.bincount(cell_labels, weights=cell_lengths, minlength=n_clusters)
+
+    # Points and extent of each cluster
+    point_labels = np.full(n_points, -1)
+    point_labels[connectivity] = cell_labels[conn_cells]
+    used = point_labels >= 0
+    point_labels = point_labels[used]
+    cluster_points = vtk_points[used]
+    n_cluster_points = np.bincount(point_labels, minlength=n_clusters)
+
+    order = np.argsort(point_labels, kind='stable')
+    starts = np.cumsum(n_cluster_points) - n_cluster_points
+    cluster_min = np.minimum.reduceat(cluster_points[order], starts, axis=0)
+    cluster_max = np.maximum.reduceat(cluster_points[order], starts, axis=0)
+
+    if domain_bounds is None:
+        domain_bounds = fractures_vtk.bounds
+
+    domain_min = np.array([domain_bounds[0], domain_bounds[2]])
+    domain_max = np.array([domain_bounds[1], domain_bounds[3]])
+    tolerance = spanning_tolerance * (domain_max - domain_min)
+
+    spanning = (cluster_min[:, :2] <= domain_min + tolerance) & (cluster_max[:, :2] >= domain_max - tolerance)
+
+    clusters_df = DataFrame({'n_fractures': n_fractures,
+                             'n_points': n_cluster_points,
+                             'length': lengths,
+                             'spanning_x': spanning[:, 0],
+                             'spanning_y': spanning[:, 1],
+                             'spanning': spanning.any(axis=1)})
+
+    # Sort the clusters (largest first) and relabel the fractures with the sorted cluster index
+    rank = np.lexsort((-lengths, -n_fractures))
+    clusters_df = clusters_df.iloc[rank].reset_index(drop=True)
+
+    new_labels = np.empty(n_clusters, dtype=int)
+    new_labels[rank] = np.arange(n_clusters)
+    cell_labels = new_labels[cell_labels]
+
+    if top_k is not None:
+        clusters_df = clusters_df.iloc[:top_k]
+        cell_labels[cell_labels >= top_k] = -1
+
+    clusters_df.index.name = 'cluster'
+
+    return cell_labels, clusters_df
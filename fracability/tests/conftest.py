@@ -0,0 +1,35 @@
+"""
+Shared fixtures of the fracability tests. The networks are built from the bundled Pontrelli dataset.
+"""
+
+import pytest
+
+from fracability import Entities
+from fracability.examples import data
+
+
+@pytest.fixture(scope='session')
+def pontrelli():
+    """Factory of FractureNetwork objects of the Pontrelli dataset made of the given fracture sets and of the
+    interpretation boundary. A new network is built at each call, so tests can modify it."""
+
+    data_dict = data.Pontrelli().data_dict
+
+    def build(sets: tuple = ('Set_a.shp', 'Set_b.shp', 'Set_c.shp')) -> Entities.FractureNetwork:
+        network = Entities.FractureNetwork()
+        for set_n, set_name in enumerate(sets, start=1):
+            network.add_fractures(Entities.Fractures(shp=data_dict[set_name], set_n=set_n))
+        network.add_boundaries(Entities.Boundary(shp=data_dict['Interpretation_boundary.shp'], group_n=1))
+        return network
+
+    return build
+
+
+@pytest.fixture(scope='session')
+def pontrelli_topology(pontrelli) -> Entities.FractureNetwork:
+    """FractureNetwork of the three Pontrelli sets with the topology calculated. The network is shared by the tests
+    of the session and must not be modified."""
+
+    network = pontrelli()
+    network.calculate_topology()
+    return network
@@ -0,0 +1,63 @@
+import networkx as nx
+import numpy as np
+import pytest
+from pyvista import PolyData
+
+from fracability import Adapters, Entities
+from fracability.examples import data
+from fracability.utils.general_use import vtk_lines_arrays
+
+
+def baseline_networkx_rep(input_object: PolyData) -> nx.Graph:
+    """Baseline networkx_rep, correct only for line cells of two points"""
+    lines = np.delete(input_object.lines, np.arange(0, input_object.lines.size, 3)).reshape(-1, 2)
+    network = nx.Graph()
+    network.add_edges_from(lines)
+    return network
+
+
+@pytest.fixture(scope='module')
+def set_a_vtk() -> PolyData:
+    return Entities.Fractures(shp=data.Pontrelli().data_dict['Set_a.shp'], set_n=1).vtk_object
+
+
+def segments(polylines: PolyData) -> np.ndarray:
+    """Pairs of consecutive points of the line cells"""
+    offsets, connectivity = vtk_lines_arrays(polylines)
+    cells = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    same_cell = cells[:-1] == cells[1:]
+    return np.column_stack((connectivity[:-1][same_cell], connectivity[1:][same_cell]))
+
+
+def test_networkx_rep_baseline_segments(set_a_vtk):
+    # On cells of two points the baseline representation was correct
+    pairs = segments(set_a_vtk)
+    lines = np.column_stack((np.full(len(pairs), 2), pairs)).ravel()
+    segments_vtk = PolyData(set_a_vtk.points, lines=lines)
+
+    network = Adapters.networkx_rep(segments_vtk)
+    baseline = baseline_networkx_rep(segments_vtk)
+
+    assert network.number_of_edges() == baseline.number_of_edges()
+    assert set(map(frozenset, network.edges)) == set(map(frozenset, baseline.edges))
+
+
+def test_networkx_rep_polylines(set_a_vtk):
+    pairs = np.sort(segments(set_a_vtk), axis=1)
+    pairs = np.unique(pairs[pairs[:, 0] != pairs[:, 1]], axis=0)
+
+    network = Adapters.networkx_rep(set_a_vtk)
+    csr = Adapters.csr_rep(set_a_vtk)
+
+    assert network.number_of_edges() == csr.n_edges == len(pairs) == 19066
+    assert set(map(frozenset, network.edges)) == set(map(frozenset, pairs.tolist()))
+    assert np.array_equal(csr.edges, pairs)
+
+
+def test_fracture_network_edges(pontrelli_topology):
+    # The baseline gave 14920 edges on the Pontrelli network, since its polylines were read as pairs of points
+    network = pontrelli_topology.network_object()
+    csr = pontrelli_topology.network_object(backend='csr')
+
+    assert network.number_of_edges() == csr.n_edges == 36215
+    assert sorted(dict(network.degree).values()) == sorted(csr.degree()[csr.degree() > 0])
@@ -0,0 +1,186 @@
+import numpy as np
+import pytest
+from geopandas import GeoDataFrame, read_file
+from shapely.geometry import LineString, MultiLineString, Polygon
+
+from fracability import Entities, Plotters
+from fracability.examples import data
+
+
+@pytest.fixture
+def fractures():
+    gdf = GeoDataFrame({'id': [0, 1], 'geometry': [LineString([(0, 0), (1, 0)]), LineString([(0, 1), (1, 2)])]})
+    return Entities.Fractures(gdf=gdf, set_n=1)
+
+
+@pytest.fixture
+def fracture_network():
+    fractures = GeoDataFrame({'geometry': [LineString([(0, 1), (4, 1)]), LineString([(2, 0), (2, 3)])]})
+    boundary = GeoDataFrame({'geometry': [LineString([(0, 0), (4, 0), (4, 3), (0, 3), (0, 0)])]})
+
+    network = Entities.FractureNetwork()
+    network.add_fractures(Entities.Fractures(gdf=fractures, set_n=1))
+    network.add_boundaries(Entities.Boundary(gdf=boundary, group_n=1))
+    network.calculate_topology()
+
+    return network
+
+
+def test_set_region_geometries(fractures):
+    fractures._set_region_geometries(np.array([1]), np.array([LineString([(0, 1), (2, 2)])]))
+
+    assert fractures.entity_df.geometry.tolist() == [LineString([(0, 0), (1, 0)]), LineString([(0, 1), (2, 2)])]
+
+
+def test_set_region_geometries_unmatched_ids(fractures):
+    fractures.entity_df['id'] = None
+    fractures._set_region_geometries(np.array([0, 1]), np.array([LineString([(0, 1), (2, 2)])] * 2))
+
+    assert fractures.entity_df.geometry.tolist() == [LineString([(0, 0), (1, 0)]), LineString([(0, 1), (1, 2)])]
+
+
+@pytest.mark.parametrize('entity, name', [(Entities.Fractures, 'Set_a.shp'),
+                                          (Entities.Boundary, 'Interpretation_boundary.shp')])
+def test_vtk_object_setter_baseline(entity, name):
+    # The ids of the Pontrelli shapefiles are not set, as in the baseline the geometries are left unchanged
+    entity = entity(shp=data.Pontrelli().data_dict[name])
+    geometries = entity.entity_df.geometry.copy()
+
+    entity.vtk_object = entity.vtk_object
+
+    assert entity.entity_df.geometry.geom_equals_exact(geometries, 0).all()
+
+
+def test_set_region_geometries_empty_regions(fractures):
+    fractures._set_region_geometries(np.array([], dtype=int), np.array([], dtype=object))
+
+    assert fractures.entity_df.geometry.tolist() == [LineString([(0, 0), (1, 0)]), LineString([(0, 1), (1, 2)])]
+
+
+@pytest.mark.parametrize('backend', ['networkx', 'csr'])
+def test_cached_representations_are_copies(fractures, backend):
+    vtk_object = fractures.vtk_object
+    vtk_object['f_set'] = np.full(vtk_object.n_cells, -1)
+    vtk_object.points[:] = 0
+
+    assert (fractures.vtk_object['f_set'] == 1).all()
+    assert fractures.vtk_object.points.any()
+
+    network_object = fractures.network_object(backend)
+    n_edges = network_object.number_of_edges() if backend == 'networkx' else network_object.n_edges
+    if backend == 'networkx':
+        network_object.clear()
+    else:
+        network_object.indices[:] = 0
+
+    network_object = fractures.network_object(backend)
+    assert (network_object.number_of_edges() if backend == 'networkx' else network_object.n_edges) == n_edges
+    assert fractures.cache_info['misses'] == 2
+
+
+def test_fracture_network_returns_copies(fracture_network):
+    for name in ('nodes', 'fractures', 'boundaries'):
+        entity = getattr(fracture_network, name)
+        entity.entity_df = entity.entity_df.iloc[:0]
+
+        assert not getattr(fracture_network, name).entity_df.empty
+
+    fracture_network.sets.append(2)
+    assert fracture_network.sets == [1]
+
+    vtk_object = fracture_network.vtk_object()
+    vtk_object.points[:] = 0
+    assert fracture_network.vtk_object().points.any()
+
+    network_object = fracture_network.network_object()
+    n_edges = network_object.number_of_edges()
+    network_object.clear()
+    assert fracture_network.network_object().number_of_edges() == n_edges
+
+
+def test_vtkplot_nodes_leaves_network_unchanged(fracture_network):
+    array_names = fracture_network.nodes.vtk_object.array_names
+
+    Plotters.vtkplot_nodes(fracture_network.nodes, return_plot=True, off_screen=True)
+
+    assert fracture_network.nodes.vtk_object.array_names == array_names
+
+
+def baseline_overlaps(gdf) -> list:
+    """og_line_id of the geometries overlapping another geometry found by the baseline check (loop on the rows)"""
+    return [og_line_id for og_line_id, geometry in zip(gdf['og_line_id'], gdf.geometry) if gdf.overlaps(geometry).any()]
+
+
+def test_check_geometries_overlaps():
+    lines = [[(0, 0), (2, 0)], [(1, 0), (3, 0)], [(0, 1), (2, 1)], [(0, 1), (2, 1)], [(5, 0), (5, 2)],
+             [(5, 1), (5, 3), (6, 3)], [(0, 2), (2, 2)], [(2, 2), (3, 2)]]
+    fractures = Entities.Fractures(gdf=GeoDataFrame({'geometry': [LineString(line) for line in lines]}), set_n=1)
+
+    report = fractures.check_geometries()
+
+    assert sorted(zip(report['og_line_id_1'], report['og_line_id_2'])) == [(1, 2), (5, 6)]
+    assert sorted(set(report[['og_line_id_1', 'og_line_id_2']].values.ravel())) == \
+        baseline_overlaps(fractures.entity_df)
+
+
+@pytest.mark.parametrize('set_name', ['Set_a.shp', 'Set_b.shp', 'Set_c.shp'])
+def test_check_geometries_baseline(set_name):
+    # The baseline check found no overlaps in the Pontrelli sets
+    fractures = Entities.Fractures(shp=data.Pontrelli().data_dict[set_name], set_n=1)
+
+    assert fractures.check_geometries().empty
+
+
+def test_check_network_baseline(pontrelli):
+    # Fractures crossing the boundary found by the baseline check for each set (no overlaps were found)
+    baseline = {1: [1, 14, 20, 21, 27, 29, 39, 40, 66, 71, 74, 172, 173, 176, 189, 191, 208, 210, 221, 224, 226, 252,
+                    271, 285, 288, 493, 673, 686, 727, 789, 889, 892, 986, 987, 1096, 1098, 1147, 1219, 1224, 1227,
+                    1621, 1660, 1933],
+                2: [148, 221, 247, 282, 1081, 1513],
+                3: [76, 273, 432, 700, 701]}
+
+    findings = pontrelli().check_network()
+
+    assert set(findings['check']) == {'boundary_crossing'}
+    assert (findings['type_2'] == 'boundary').all()
+    assert {f_set: sorted(df['og_line_id_1']) for f_set, df in findings.groupby('f_set_1')} == baseline
+
+
+def test_fractures_normalization():
+    gdf = GeoDataFrame({'geometry': [LineString([(0, 0), (1, 0)]),
+                                     MultiLineString([[(0, 1), (1, 1)], [(2, 1), (3, 1)]]),
+                                     LineString([(0, 2), (1.23456, 2)])]})
+
+    df = Entities.Fractures(gdf=gdf, set_n=2).entity_df
+
+    # As in the baseline, the multilines are removed and the og_line_id is the row of the input
+    assert df.index.tolist() == [0, 1]
+    assert df.geometry.tolist() == [LineString([(0, 0), (1, 0)]), LineString([(0, 2), (1.23456, 2)])]
+    assert df['og_line_id'].tolist() == [1, 3]
+    assert df['type'].tolist() == ['fracture', 'fracture']
+    assert df['censored'].tolist() == [0, 0]
+    assert df['f_set'].tolist() == [2, 2]
+    assert df['length'].tolist() == [1.0, 1.2346]
+
+
+def test_boundary_normalization():
+    gdf = GeoDataFrame({'geometry': [Polygon([(0, 0), (4, 0), (4, 3), (0, 3)])]})
+
+    df = Entities.Boundary(gdf=gdf, group_n=3).entity_df
+
+    assert df.geometry.tolist() == [LineString([(0, 0), (4, 0), (4, 3), (0, 3), (0, 0)])]
+    assert df[['og_line_id', 'type', 'b_group']].values.tolist() == [[1, 'boundary', 3]]
+
+
+def test_fractures_normalization_baseline():
+    path = data.Pontrelli().data_dict['Set_a.shp']
+    df = Entities.Fractures(shp=path, set_n=1).entity_df
+
+    # Columns and types of the baseline entity_df of Pontrelli Set_a
+    assert df.columns.tolist() == ['id', 'Fault', 'Set', 'dir', 'geometry', 'og_line_id', 'type', 'censored',
+                                   'f_set', 'length']
+    assert [str(dtype) for dtype in df.dtypes] == ['object', 'int64', 'int64', 'float64', 'geometry', 'int64',
+                                                   'object', 'int64', 'int64', 'float64']
+    assert df['og_line_id'].tolist() == list(range(1, 1942))
+    assert df['length'].sum() == pytest.approx(7781.0952, abs=1e-6)
+    assert df.geometry.geom_equals_exact(read_file(path).geometry, 0).all()
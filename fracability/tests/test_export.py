@@ -0,0 +1,44 @@
+import os
+
+import pytest
+from geopandas import GeoDataFrame
+from shapely.geometry import LineString
+
+from fracability import Entities
+from fracability.utils import export
+
+
+@pytest.fixture
+def fracture_network():
+    fractures = GeoDataFrame({'geometry': [LineString([(0, 1), (4, 1)]), LineString([(2, 0), (2, 3)])]})
+    boundary = GeoDataFrame({'geometry': [LineString([(0, 0), (4, 0), (4, 3), (0, 3), (0, 0)])]})
+
+    network = Entities.FractureNetwork()
+    network.add_fractures(Entities.Fractures(gdf=fractures, set_n=1))
+    network.add_boundaries(Entities.Boundary(gdf=boundary, group_n=1))
+
+    return network
+
+
+def test_network_export_figures_arguments(monkeypatch, fracture_network):
+    received = []
+    monkeypatch.setattr(export, 'export_figures', lambda *args: received.append(args))
+
+    fracture_network.export_figures('figures', ['vtk_map'], ['png'], dpi=300, window_size=(800, 600))
+
+    assert received == [(fracture_network, 'figures', ['vtk_map'], ['png'], ('lognorm',), None, 300, (800, 600))]
+
+
+def test_vtkplot_frac_net_off_screen(fracture_network):
+    import fracability.Plotters as plts
+
+    actors = plts.vtkplot_frac_net(fracture_network, return_plot=True, notebook=False, off_screen=True)
+
+    assert len(actors) == 2
+
+
+def test_export_map(tmp_path, fracture_network):
+    paths = export.export_figures(fracture_network, str(tmp_path), figures=['map'], formats=['png', 'svg'])
+
+    assert paths == [os.path.join(str(tmp_path), 'map.png'), os.path.join(str(tmp_path), 'map.svg')]
+    assert all(os.path.getsize(path) > 0 for path in paths)
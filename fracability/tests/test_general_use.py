@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+import shapely
+
+from fracability import Entities
+from fracability.examples import data
+from fracability.utils import general_use
+
+
+@pytest.fixture(scope='module')
+def set_a():
+    return Entities.Fractures(shp=data.Pontrelli().data_dict['Set_a.shp'], set_n=1).entity_df
+
+
+def test_shp2vtk_baseline(set_a):
+    vtk_obj = general_use.shp2vtk(set_a)
+
+    # Size of the PolyData of the baseline converter (per-row loop, repeated points merged)
+    assert (vtk_obj.n_points, vtk_obj.n_cells) == (20978, 1941)
+    assert sorted(vtk_obj.cell_data.keys()) == sorted(set_a.columns.drop('geometry'))
+
+    offsets, connectivity = general_use.vtk_lines_arrays(vtk_obj)
+    for cell, geometry in enumerate(set_a.geometry):
+        cell_points = vtk_obj.points[connectivity[offsets[cell]:offsets[cell+1]], :2]
+        assert np.array_equal(cell_points, shapely.get_coordinates(geometry))
+
+    assert np.array_equal(vtk_obj['og_line_id'], set_a['og_line_id'].values)
+
+
+def test_shp2vtk_nodes(pontrelli_topology):
+    nodes = pontrelli_topology.nodes.entity_df
+
+    vtk_obj = general_use.shp2vtk(nodes, nodes=True)
+
+    assert np.array_equal(vtk_obj.points[:, :2], shapely.get_coordinates(nodes.geometry.values))
+    assert np.array_equal(vtk_obj['n_type'], nodes['n_type'].values)
+
+
+def baseline_km(z_values, Z, delta_list, kind='quicksort'):
+    """Baseline Kaplan-Meier curve (product over the data lower than each input value)"""
+
+    sorted_args = np.argsort(Z, kind=kind)
+    Z_sort = Z[sorted_args]
+    delta_list_sort = delta_list[sorted_args]
+
+    G = np.ones_like(z_values)
+    n = len(Z)
+    for i, z in enumerate(z_values):
+        if z < Z_sort[0]:
+            G[i] = 0
+        elif z <= Z_sort[-1]:
+            product = 1
+            for j in np.where(Z_sort <= z)[0]:
+                product *= ((n - j - 1) / (n - j)) ** delta_list_sort[j]
+            G[i] = 1 - product
+    return G
+
+
+def test_km_baseline():
+    rng = np.random.default_rng(0)
+    Z = rng.lognormal(0, 1, 300)
+    delta = (rng.random(300) > 0.2).astype(int)
+    z_values = np.concatenate([[0, Z.max() + 1], rng.choice(Z, 50), rng.uniform(0, Z.max(), 50)])
+
+    assert np.allclose(general_use.KM(z_values, Z, delta), baseline_km(z_values, Z, delta), rtol=1e-12, atol=0)
+
+
+def test_km_baseline_ties(pontrelli_topology):
+    # The Pontrelli lengths have ties. The baseline order of the tied values depends on the sorting algorithm, KM
+    # places the complete values before the censored ones
+    fractures = pontrelli_topology.fractures.entity_df
+    fractures = fractures.loc[fractures['f_set'] == 1]
+    Z = fractures['length'].values
+    delta = 1 - fractures['censored'].values
+
+    order = np.lexsort((-delta, Z))
+    Z, delta = Z[order], delta[order]
+
+    assert len(np.unique(Z)) < len(Z)
+    assert np.allclose(general_use.KM(Z, Z, delta), baseline_km(Z, Z, delta, kind='stable'), rtol=1e-12, atol=0)
@@ -0,0 +1,79 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+import shapely
+from geopandas import GeoDataFrame
+from shapely.geometry import LineString
+
+from fracability.operations import Geometry
+
+
+def same_geometries(geometries_1, geometries_2) -> bool:
+    return len(geometries_1) == len(geometries_2) and all(
+        geometry_1.equals_exact(geometry_2, 0) and len(geometry_1.coords) == len(geometry_2.coords)
+        for geometry_1, geometry_2 in zip(geometries_1, geometries_2))
+
+
+def test_tidy_intersections_baseline(pontrelli_topology):
+    # Output of the baseline tidy_intersections (loop over all the geometries) on the Pontrelli dataset
+    fractures = pontrelli_topology.fractures.entity_df.geometry
+    boundaries = pontrelli_topology.boundaries.entity_df.geometry
+
+    assert len(fractures) == 4268
+    assert shapely.get_num_coordinates(fractures.values).sum() == 44105
+    assert fractures.length.sum() == pytest.approx(10799.233716150273, rel=1e-12)
+    assert boundaries.length.sum() == pytest.approx(827.266227057723, rel=1e-12)
+
+
+@pytest.fixture(scope='module')
+def set_a_components(pontrelli):
+    network = pontrelli(('Set_a.shp',))
+
+    gdf = network.fracture_network_to_components_df()
+    gdf = gdf.loc[gdf['type'] != 'node'].reset_index(drop=True)
+
+    return gdf, Geometry.tidy_geometries(gdf)
+
+
+@pytest.mark.parametrize('tiles, halo', [((2, 2), None), ((3, 3), 0.0), ((4, 1), 5.0), ((1, 3), None)])
+def test_tiled_tidy_same_as_untiled(set_a_components, tiles, halo):
+    gdf, untiled = set_a_components
+
+    tiled = Geometry.tiled_tidy_geometries(gdf, tiles, halo)
+
+    assert same_geometries(tiled, untiled)
+
+
+def test_tiled_tidy_intersections_with_executor(pontrelli):
+    network = pontrelli(('Set_a.shp',))
+    untiled = Geometry.tidy_intersections(network, inplace=False)
+
+    with ProcessPoolExecutor(2) as executor:
+        tiled = Geometry.tidy_intersections(network, inplace=False, tiles=(2, 2), executor=executor)
+
+    assert same_geometries(tiled.fractures.entity_df.geometry.values, untiled.fractures.entity_df.geometry.values)
+    assert same_geometries(tiled.boundaries.entity_df.geometry.values, untiled.boundaries.entity_df.geometry.values)
+
+
+@pytest.mark.filterwarnings('error')
+@pytest.mark.parametrize('axis', [0, 1])
+def test_tiled_tidy_degenerate_bounds(axis):
+    # All the fractures lie on the same vertical (or horizontal) line, so the network has no width (or height)
+    lines = [[(0, 0), (0, 1)], [(0, 2), (0, 3)], [(0, 3.5), (0, 4)], [(-1, -1), (1, -1), (1, 4), (-1, 4), (-1, -1)]]
+    if axis == 1:
+        lines = [[point[::-1] for point in line] for line in lines]
+
+    gdf = GeoDataFrame({'type': ['fracture', 'fracture', 'fracture', 'boundary'],
+                        'geometry': [LineString(line) for line in lines]})
+
+    tiled = Geometry.tiled_tidy_geometries(gdf, (3, 3))
+
+    assert same_geometries(tiled, Geometry.tidy_geometries(gdf))
+
+
+def test_grid_cell():
+    values = np.array([0, 0.5, 1, 2])
+
+    assert Geometry._grid_cell(values, 0, 2, 2).tolist() == [0, 0, 1, 1]
+    assert Geometry._grid_cell(values, 0, 0, 1).tolist() == [0, 0, 0, 0]
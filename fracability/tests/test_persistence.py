@@ -0,0 +1,49 @@
+import pytest
+from geopandas import GeoDataFrame
+from shapely.geometry import LineString
+
+from fracability import Entities, Statistics
+
+pytest.importorskip('pyarrow')
+
+from fracability.utils import persistence
+
+
+def test_save_load_baseline(pontrelli_topology, tmp_path):
+    pontrelli_topology.save_parquet(str(tmp_path))
+
+    network = persistence.load_network(str(tmp_path))
+
+    # The loaded topology is the one calculated by the baseline nodes_conn, without calculating it again
+    assert network.nodes.node_count == {1: 6037, 3: 2284, 4: 886, 5: 212}
+    for name in ('nodes', 'fractures', 'boundaries'):
+        entity_df, loaded_df = getattr(pontrelli_topology, name).entity_df, getattr(network, name).entity_df
+        assert loaded_df.equals(entity_df)
+        assert loaded_df.crs == entity_df.crs
+
+
+def test_save_load_state(tmp_path):
+    fractures = [LineString([(0, 1), (4, 1)]), LineString([(2, 0), (2, 3)]), LineString([(1, 1), (1, 2)])]
+    boundary = [LineString([(0, 0), (4, 0), (4, 3), (0, 3), (0, 0)])]
+
+    network = Entities.FractureNetwork()
+    network.add_fractures(Entities.Fractures(gdf=GeoDataFrame({'geometry': fractures[:2]}), set_n=1))
+    network.add_fractures(Entities.Fractures(gdf=GeoDataFrame({'geometry': fractures[2:]}), set_n=2))
+    network.add_boundaries(Entities.Boundary(gdf=GeoDataFrame({'geometry': boundary}), group_n=1))
+    network.calculate_topology()
+    network.calculate_backbone()
+    network.activate_fractures([2])
+
+    fitter = Statistics.NetworkFitter(network)
+    fitter.fit('expon')
+    network.save_parquet(str(tmp_path), fitter)
+
+    loaded, loaded_fitter = persistence.load_network(str(tmp_path), return_fitter=True)
+
+    components = network.entity_df[['type', 'active']].values.tolist()
+    assert loaded.entity_df[['type', 'active']].values.tolist() == components
+    assert loaded.sets == [2]
+    assert loaded.fractures.entity_df.equals(network.fractures.entity_df)
+    assert loaded.backbone[0].entity_df.equals(network.backbone[0].entity_df)
+    assert loaded_fitter.get_fitted_distribution('expon').distribution_parameters == \
+        fitter.get_fitted_distribution('expon').distribution_parameters
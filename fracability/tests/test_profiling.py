@@ -0,0 +1,24 @@
+import tracemalloc
+
+from fracability.utils import profiling
+
+
+def test_disable_stops_own_tracemalloc():
+    assert not tracemalloc.is_tracing()
+
+    profiling.enable(memory=True)
+    assert tracemalloc.is_tracing()
+
+    profiling.disable()
+    assert not tracemalloc.is_tracing()
+
+
+def test_disable_keeps_external_tracemalloc():
+    tracemalloc.start()
+    try:
+        profiling.enable(memory=True)
+        profiling.disable()
+
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
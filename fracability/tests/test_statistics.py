@@ -0,0 +1,145 @@
+import numpy as np
+import pytest
+import scipy.stats as ss
+from geopandas import GeoDataFrame
+from shapely.geometry import LineString
+
+from fracability import Entities, Statistics
+from fracability.utils import mle
+
+
+@pytest.fixture
+def fractures():
+    """Parallel fractures with lognormal lengths, 20% of them censored"""
+
+    rng = np.random.default_rng(0)
+    lengths = rng.lognormal(0, 0.5, 200)
+    censored = (rng.random(200) < 0.2).astype(int)
+    gdf = GeoDataFrame({'geometry': [LineString([(0, i), (length, i)]) for i, length in enumerate(lengths)],
+                        'censored': censored})
+
+    return Entities.Fractures(gdf=gdf, set_n=1)
+
+
+@pytest.mark.parametrize('error', [ValueError, RuntimeError, ArithmeticError, ZeroDivisionError,
+                                   np.linalg.LinAlgError])
+def test_bootstrap_distribution_failed_replicates(monkeypatch, error):
+    def failing_fit(*args):
+        raise error
+
+    monkeypatch.setattr(Statistics, 'fit_distribution', failing_fit)
+
+    results = Statistics.bootstrap_distribution('lognorm', np.ones(10), np.ones(10), (1, 0, 1), [0.5], 5, 0)
+
+    assert results.shape == (5, 4)
+    assert np.isnan(results).all()
+
+
+def test_bootstrap_no_converged_replicate(monkeypatch, fractures):
+    fitter = Statistics.NetworkFitter(fractures)
+    fitter.fit('lognorm')
+
+    def failing_fit(*args):
+        raise np.linalg.LinAlgError
+
+    monkeypatch.setattr(Statistics, 'fit_distribution', failing_fit)
+
+    intervals = fitter.bootstrap(['lognorm'], n_replicates=10, seed=0)
+
+    assert (intervals['n_valid'] == 0).all()
+    assert (intervals['n_failed'] == 10).all()
+    assert intervals[['std_error', 'lower', 'upper']].isna().all().all()
+    assert intervals['estimate'].notna().all()
+
+
+def test_bootstrap_seeded(fractures):
+    fitter = Statistics.NetworkFitter(fractures)
+    fitter.fit('lognorm')
+
+    intervals_1 = fitter.bootstrap(['lognorm'], n_replicates=20, seed=1, chunk_size=7)
+    intervals_2 = fitter.bootstrap(['lognorm'], n_replicates=20, seed=1, chunk_size=7)
+
+    assert intervals_1.equals(intervals_2)
+    assert (intervals_1['n_valid'] == 20).all()
+    assert (intervals_1['lower'] <= intervals_1['upper']).all()
+
+
+def censored_log_likelihood(distribution, params, uncensored, censored) -> float:
+    return np.sum(distribution.logpdf(uncensored, *params)) + np.sum(distribution.logsf(censored, *params))
+
+
+@pytest.mark.parametrize('distribution_name', ['lognorm', 'weibull_min', 'expon', 'norm'])
+def test_mle_fit_censored(distribution_name):
+    # Right censored sample: the lengths longer than a random window are censored at the window length
+    rng = np.random.default_rng(1)
+    lengths = rng.lognormal(0, 0.5, 500)
+    window = rng.uniform(0.5, 3, 500)
+    complete = lengths <= window
+    uncensored, censored = lengths[complete], window[~complete]
+
+    distribution = getattr(ss, distribution_name)
+    data = ss.CensoredData(uncensored=uncensored, right=censored)
+    if distribution_name == 'norm':
+        scipy_params = distribution.fit(data)
+    else:
+        scipy_params = distribution.fit(data, floc=0)
+
+    params = mle.fit(distribution_name, uncensored, censored)
+
+    assert np.allclose(params, scipy_params, rtol=1e-3, atol=1e-6)
+    assert censored_log_likelihood(distribution, params, uncensored, censored) >= \
+        censored_log_likelihood(distribution, scipy_params, uncensored, censored) - 1e-6
+
+
+def test_fit_distribution_censored_gamma():
+    rng = np.random.default_rng(2)
+    lengths = rng.gamma(2, 1.5, 300)
+    uncensored, censored = lengths[lengths <= 5], np.full(np.sum(lengths > 5), 5.0)
+
+    with pytest.raises(ValueError):
+        mle.fit('gamma', uncensored, censored)
+
+    params = Statistics.fit_distribution('gamma', uncensored, censored)
+    scipy_params = ss.gamma.fit(ss.CensoredData(uncensored=uncensored, right=censored), floc=0)
+
+    assert np.allclose(params, scipy_params)
+
+
+def test_fit_distribution_complete_gamma():
+    rng = np.random.default_rng(3)
+    lengths = rng.gamma(2, 1.5, 300)
+
+    params = Statistics.fit_distribution('gamma', lengths)
+    scipy_params = ss.gamma.fit(lengths, floc=0)
+
+    assert np.allclose(params, scipy_params, rtol=1e-3)
+    assert np.sum(ss.gamma.logpdf(lengths, *params)) >= np.sum(ss.gamma.logpdf(lengths, *scipy_params)) - 1e-6
+
+
+# Parameters fitted by the baseline (scipy fit on CensoredData) on the Pontrelli Set_a after the topology
+BASELINE_FITS = {'lognorm': (1.0149894045014471, 0.0, 2.7398325504401138),
+                 'expon': (0.0, 4.403586655710402),
+                 'norm': (4.320768047636181, 4.583291179227298),
+                 'weibull_min': (1.0461455041600232, 0.0, 4.471434831714838),
+                 'gamma': (1.1956481599585973, 0.0, 3.647440163199806)}
+
+
+@pytest.fixture(scope='module')
+def set_a_fitter(pontrelli_topology):
+    fractures = pontrelli_topology.fractures
+    fractures.entity_df = fractures.entity_df.loc[fractures.entity_df['f_set'] == 1]
+    return Statistics.NetworkFitter(fractures)
+
+
+@pytest.mark.parametrize('distribution_name', BASELINE_FITS.keys())
+def test_fit_baseline(set_a_fitter, distribution_name):
+    set_a_fitter.fit(distribution_name)
+    params = set_a_fitter.get_fitted_distribution(distribution_name).distribution_parameters
+    baseline_params = BASELINE_FITS[distribution_name]
+
+    uncensored, censored = set_a_fitter.network_data.fit_lengths
+    distribution = getattr(ss, distribution_name)
+
+    assert np.allclose(params, baseline_params, rtol=1e-4, atol=1e-9)
+    assert censored_log_likelihood(distribution, params, uncensored, censored) >= \
+        censored_log_likelihood(distribution, baseline_params, uncensored, censored) - 1e-9
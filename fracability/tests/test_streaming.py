@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from shapely import box
+
+from fracability.examples import data
+
+pytest.importorskip('pyogrio')
+
+from fracability.utils import streaming
+
+USE_ARROW = [False] + ([True] if streaming._has_pyarrow() else [])
+
+
+@pytest.fixture(scope='module')
+def paths():
+    data_dict = data.Pontrelli().data_dict
+    return {1: data_dict['Set_a.shp'], 2: data_dict['Set_b.shp']}, {1: data_dict['Interpretation_boundary.shp']}
+
+
+@pytest.mark.parametrize('use_arrow', USE_ARROW)
+def test_read_chunks_rows(paths, use_arrow):
+    fractures, _ = paths
+
+    chunks = list(streaming.read_chunks(fractures[1], chunk_size=100, rows=(10, 250), use_arrow=use_arrow))
+
+    assert [len(chunk) for chunk in chunks] == [100, 100, 40]
+    assert np.concatenate([chunk.index.values for chunk in chunks]).tolist() == list(range(10, 250))
+
+
+@pytest.mark.parametrize('use_arrow', USE_ARROW)
+def test_read_network_same_as_whole_files(pontrelli, paths, use_arrow):
+    fractures, boundaries = paths
+    whole = pontrelli(('Set_a.shp', 'Set_b.shp'))
+
+    network = streaming.read_network(fractures, boundaries, chunk_size=300, use_arrow=use_arrow)
+
+    for entity, whole_entity in ((network.fractures, whole.fractures), (network.boundaries, whole.boundaries)):
+        df, whole_df = entity.entity_df, whole_entity.entity_df
+        assert df.index.tolist() == list(range(len(df)))
+        assert df['og_line_id'].tolist() == whole_df['og_line_id'].tolist()
+        assert df.geometry.geom_equals_exact(whole_df.geometry, 0).all()
+
+
+@pytest.mark.parametrize('use_arrow', USE_ARROW)
+def test_read_network_bbox(pontrelli, paths, use_arrow):
+    fractures, boundaries = paths
+    whole = pontrelli(('Set_a.shp', 'Set_b.shp')).fractures.entity_df
+
+    xmin, ymin, xmax, ymax = whole.total_bounds
+    bbox = (xmin, ymin, (xmin + xmax) / 2, (ymin + ymax) / 2)
+
+    df = streaming.read_network(fractures, boundaries, bbox=bbox, chunk_size=100,
+                                use_arrow=use_arrow).fractures.entity_df
+    expected = whole.loc[whole.intersects(box(*bbox))]
+
+    assert sorted(zip(df['f_set'], df['og_line_id'])) == sorted(zip(expected['f_set'], expected['og_line_id']))
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from geopandas import GeoDataFrame
+from pyvista import PolyData
+from shapely.geometry import LineString
+
+from fracability import Entities
+from fracability.operations import Topology
+
+
+@pytest.fixture
+def fracture_network():
+    # A fracture crossing the box, one abutting it and one abutting the first with a free end
+    fractures = GeoDataFrame({'geometry': [LineString([(0, 1), (4, 1)]), LineString([(2, 0), (2, 3)]),
+                                           LineString([(1, 1), (1, 2)])]})
+    boundary = GeoDataFrame({'geometry': [LineString([(0, 0), (4, 0), (4, 3), (0, 3), (0, 0)])]})
+
+    network = Entities.FractureNetwork()
+    network.add_fractures(Entities.Fractures(gdf=fractures, set_n=1))
+    network.add_boundaries(Entities.Boundary(gdf=boundary, group_n=1))
+    network.calculate_topology()
+
+    return network
+
+
+def test_nodes_classification(fracture_network):
+    nodes = fracture_network.nodes.entity_df
+
+    assert sorted(zip(nodes['n_type'], nodes.geometry.x, nodes.geometry.y)) == [
+        (1, 1, 2), (3, 1, 1), (4, 2, 1), (5, 0, 1), (5, 2, 0), (5, 2, 3), (5, 4, 1)]
+
+
+def test_nodes_classification_baseline(pontrelli_topology):
+    # Node count of the baseline nodes_conn (loop over the points of the network) on the Pontrelli dataset
+    assert pontrelli_topology.nodes.node_count == {1: 6037, 3: 2284, 4: 886, 5: 212}
+
+
+def test_fractures_censoring(fracture_network):
+    # The fractures touching the boundary are censored
+    assert fracture_network.fractures.entity_df['censored'].tolist() == [1, 1, 0]
+
+
+def test_boundary_contacts():
+    boundary = GeoDataFrame({'geometry': [LineString([(0, 0), (4, 0), (4, 3), (0, 3), (0, 0)])]})
+    boundary_vtk = Entities.Boundary(gdf=boundary, group_n=1).vtk_object
+
+    # On a vertex, on a segment, within the tolerance of a segment, inside the box, just outside the tolerance
+    fracture_points = np.array([[0, 0, 0], [2, 0, 0], [4 - 1e-7, 2, 0], [1, 1, 0], [2, 3 + 1e-4, 0]])
+
+    assert Topology.boundary_contacts(fracture_points, boundary_vtk, 1e-5).tolist() == [0, 1, 2]
+
+
+def test_censored_fractures_baseline(pontrelli_topology):
+    # Censored fractures and U nodes of the baseline nodes_conn on the Pontrelli dataset
+    assert pontrelli_topology.fractures.entity_df['censored'].sum() == 207
+    assert pontrelli_topology.nodes.n_censored == 212
+
+
+def test_fracture_clusters():
+    # Two crossing fractures, a fracture abutting them and an isolated one
+    points = np.array([[0, 1, 0], [4, 1, 0], [2, 0, 0], [2, 3, 0], [2, 1, 0], [3, 2, 0], [6, 0, 0], [6, 1, 0]],
+                      dtype=float)
+    lines = [3, 0, 4, 1, 3, 2, 4, 3, 2, 1, 5, 2, 6, 7]
+    fractures_vtk = PolyData(points, lines=lines)
+
+    labels, clusters = Topology.fracture_clusters(fractures_vtk, domain_bounds=(0, 6, 0, 3, 0, 0))
+
+    assert labels.tolist() == [0, 0, 0, 1]
+    assert clusters['n_fractures'].tolist() == [3, 1]
+    assert clusters['n_points'].tolist() == [6, 2]
+    assert clusters['length'].tolist() == pytest.approx([7 + np.sqrt(2), 1])
+    assert clusters['spanning_x'].tolist() == [False, False]
+    assert clusters['spanning_y'].tolist() == [True, False]
+
+
+def test_fracture_clusters_baseline(pontrelli_topology):
+    # The largest cluster is the baseline backbone (vtkConnectivityFilter largest region) of the Pontrelli dataset
+    clusters, labels = pontrelli_topology.calculate_clusters(top_k=1, return_labels=True)
+
+    assert clusters.loc[0, ['n_fractures', 'n_points']].tolist() == [1144, 8433]
+    assert clusters.loc[0, 'length'] == pytest.approx(1833.224749, abs=1e-6)
+    assert np.sum(labels == 0) == 1144
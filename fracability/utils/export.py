@@ -0,0 +1,219 @@
+"""
+Collection of methods used to export the figures of one or many fracture networks directly to files (PNG, SVG, PDF,
+...) without opening any window. The matplotlib figures are drawn with the non-interactive Agg backend and the
+pyvista figures are rendered off screen, so the export can run on headless machines and in worker processes.
+
+The available figures are:
+
+    + map: fracture network (fractures, boundaries and nodes) drawn with matplotlib
+    + backbone: backbone of the network drawn with matplotlib (calculated if missing)
+    + ternary: I, Y, X node proportions in a ternary diagram (the topology is calculated if missing)
+    + summary: PDF, CDF, SF and summary table of each fitted distribution (one file per distribution)
+    + tick: tick plot of the fitted distributions
+    + vtk_map: fracture network rendered with pyvista. VTK must be able to render off screen (EGL/OSMesa build or
+      a virtual X server such as Xvfb), otherwise VTK aborts the process. For this reason it is not in the defaults.
+
+Examples:
+    >>> from concurrent.futures import ProcessPoolExecutor
+    >>> from fracability.utils.export import export_batch
+    >>> with ProcessPoolExecutor() as executor:
+    ...     export_batch({'outcrop_1': 'saved/outcrop_1', 'outcrop_2': 'saved/outcrop_2'}, 'figures',
+    ...                  formats=['png', 'svg'], executor=executor)
+"""
+
+import os
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from itertools import repeat
+
+FIGURES = ['map', 'backbone', 'ternary', 'summary', 'tick', 'vtk_map']
+DEFAULT_FIGURES = ['map', 'ternary', 'summary']
+
+VECTOR_FORMATS = ['svg', 'eps', 'ps', 'pdf', 'tex']  # Formats saved with save_graphic for the pyvista figures
+
+
+@contextmanager
+def headless_backend():
+    """
+    Context manager used to draw the matplotlib figures with the Agg backend. The previous backend is restored when
+    leaving the block. Switching backend closes the open figures.
+    """
+    import matplotlib
+    import matplotlib.pyplot as plt
+
+    backend = matplotlib.get_backend()
+    switch = backend.lower() != 'agg'
+
+    if switch:
+        plt.switch_backend('Agg')
+    try:
+        yield
+    finally:
+        if switch:
+            plt.switch_backend(backend)
+
+
+def _save_figure(figure, output_dir: str, file_name: str, formats: list, dpi: int) -> list:
+    """Save a matplotlib figure in each format, close it and return the list of saved paths"""
+    import matplotlib.pyplot as plt
+
+    paths = []
+    for file_format in formats:
+        path = os.path.join(output_dir, f'{file_name}.{file_format}')
+        figure.savefig(path, dpi=dpi, bbox_inches='tight')
+        paths.append(path)
+
+    plt.close(figure)
+
+    return paths
+
+
+def _save_vtk_figure(fracture_network, output_dir: str, file_name: str, formats: list,
+                     window_size: tuple) -> list:
+    """Render the fracture network off screen with pyvista and save it in each format"""
+    from pyvista import Plotter
+    import fracability.Plotters as plts
+
+    actors = plts.vtkplot_frac_net(fracture_network, return_plot=True, notebook=False, off_screen=True)
+
+    plotter = Plotter(off_screen=True, window_size=list(window_size))
+    plotter.background_color = 'white'
+    for actor in actors.values():
+        plotter.add_actor(actor)
+    plotter.view_xy()
+    plotter.reset_camera()
+
+    paths = []
+    for file_format in formats:
+        path = os.path.join(output_dir, f'{file_name}.{file_format}')
+        if file_format in VECTOR_FORMATS:
+            plotter.save_graphic(path)
+        else:
+            plotter.screenshot(path)
+        paths.append(path)
+
+    plotter.close()
+
+    return paths
+
+
+def export_figures(fracture_network, output_dir: str, figures: list = None, formats: list = ('png',),
+                   distributions: list = ('lognorm',), fitter=None, dpi: int = 150,
+                   window_size: tuple = (1920, 1080)) -> list:
+    """
+    Export the figures of a fracture network to files without showing them.
+
+    :param fracture_network: FractureNetwork object
+    :param output_dir: Directory of the output files. If it does not exist it will be created
+    :param figures: List of the figures to export (see FIGURES). If None (default) DEFAULT_FIGURES are exported
+    :param formats: List of the output formats (any format supported by matplotlib savefig). Default is png
+    :param distributions: Distributions fitted for the summary and tick figures when no fitter is given.
+     Default is lognorm
+    :param fitter: NetworkFitter object used for the summary and tick figures. If None (default) the distributions
+     are fitted on the fracture network
+    :param dpi: Resolution of the matplotlib figures. Default is 150
+    :param window_size: Size in pixels of the pyvista figures. Default is (1920, 1080)
+    :return: List of the paths of the saved files
+    """
+    import matplotlib.pyplot as plt
+    import fracability.Plotters as plts
+
+    if figures is None:
+        figures = DEFAULT_FIGURES
+
+    unknown = set(figures) - set(FIGURES)
+    if unknown:
+        raise ValueError(f'Unknown figures {sorted(unknown)}, the available figures are {FIGURES}')
+
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+
+    paths = []
+
+    with headless_backend():
+        if 'map' in figures:
+            ax = plts.matplot_frac_net(fracture_network, return_plot=True)
+            paths += _save_figure(ax.figure, output_dir, 'map', formats, dpi)
+
+        if 'backbone' in figures:
+            ax = plts.matplot_backbone(fracture_network, return_plot=True)
+            paths += _save_figure(ax.figure, output_dir, 'backbone', formats, dpi)
+
+        if 'ternary' in figures:
+            if fracture_network.nodes is None:
+                fracture_network.calculate_topology()
+            tax = plts.matplot_ternary(fracture_network, return_plot=True)
+            paths += _save_figure(tax.get_axes().figure, output_dir, 'ternary', formats, dpi)
+
+        if 'summary' in figures or 'tick' in figures:
+            if fitter is None:
+                from fracability.Statistics import NetworkFitter
+
+                fitter = NetworkFitter(fracture_network)
+                fitter.fit_many(list(distributions))
+
+            if 'summary' in figures:
+                plts.matplot_stats_summary(fitter, show_plot=False)
+                for name in fitter.get_fitted_distribution_names():
+                    figure = plt.figure(num=f'{name} summary plot')
+                    paths += _save_figure(figure, output_dir, f'summary_{name}', formats, dpi)
+
+            if 'tick' in figures:
+                plts.matplot_tick_plot(fitter, show_plot=False)
+                paths += _save_figure(plt.figure(num='Tick plot'), output_dir, 'tick', formats, dpi)
+
+        if 'vtk_map' in figures:
+            paths += _save_vtk_figure(fracture_network, output_dir, 'vtk_map', formats, window_size)
+
+    return paths
+
+
+def _export_network(network, output_dir: str, figures: list, formats: list, distributions: list, dpi: int,
+                    window_size: tuple) -> list:
+    """Export the figures of a network given as object or as path of a saved dataset (used by export_batch)"""
+
+    fitter = None
+    if isinstance(network, (str, os.PathLike)):
+        from fracability.utils.persistence import load_network
+
+        network, fitter = load_network(network, return_fitter=True)
+
+    return export_figures(network, output_dir, figures, formats, distributions, fitter, dpi, window_size)
+
+
+def export_batch(networks: dict, output_dir: str, figures: list = None, formats: list = ('png',),
+                 distributions: list = ('lognorm',), dpi: int = 150, window_size: tuple = (1920, 1080),
+                 executor: Executor = None) -> dict:
+    """
+    Export the figures of many fracture networks, each one in its own sub-directory of output_dir. The networks
+    are independent and can be exported in parallel using a concurrent.futures executor.
+
+    :param networks: Dictionary {name: network}. Each network is a FractureNetwork object or the path of a dataset
+     saved with FractureNetwork.save_parquet. With a ProcessPoolExecutor paths are preferred, since the workers
+     load the networks instead of receiving them pickled. The fitted distributions saved with a dataset are used
+     for the summary and tick figures
+    :param output_dir: Directory of the output files. The figures of each network are saved in output_dir/name
+    :param figures: List of the figures to export (see FIGURES). If None (default) DEFAULT_FIGURES are exported
+    :param formats: List of the output formats. Default is png
+    :param distributions: Distributions fitted for the summary and tick figures when the network has no saved fit.
+     Default is lognorm
+    :param dpi: Resolution of the matplotlib figures. Default is 150
+    :param window_size: Size in pixels of the pyvista figures. Default is (1920, 1080)
+    :param executor: concurrent.futures Executor (e.g. ProcessPoolExecutor) used to export the networks. If None
+     (default) the networks are exported sequentially. Matplotlib is not thread safe, do not use a
+     ThreadPoolExecutor
+    :return: Dictionary {name: list of the paths of the saved files}
+    """
+
+    names = list(networks)
+    output_dirs = [os.path.join(output_dir, str(name)) for name in names]
+
+    args = (networks.values(), output_dirs, repeat(figures), repeat(formats), repeat(distributions), repeat(dpi),
+            repeat(window_size))
+
+    if executor is None:
+        results = list(map(_export_network, *args))
+    else:
+        results = list(executor.map(_export_network, *args))
+
+    return dict(zip(names, results))
@@ -1,13 +1,24 @@
-import scooby
-import pyperclip
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 import numpy as np
-import pyvista as pv
-from geopandas import GeoDataFrame
-from vtkmodules.vtkFiltersCore import vtkCleanPolyData
+from shapely import get_coordinates, linestrings
+
+from fracability.utils.profiling import profiled
+
+# pyvista, vtk and geopandas are imported when first used so that the modules needing only the statistical
+# functions (e.g. Statistics with KM) do not load the vtk stack
+if TYPE_CHECKING:
+    import pyvista as pv
+    from geopandas import GeoDataFrame
 
 
 def report():
     """ Method used to create a report using scooby and copy it in the clipboard"""
+    import scooby
+    import pyperclip
+
     core = ['fracability', 'pyvista', 'vtk', 'numpy', 'geopandas', 'shapely']
     text = scooby.Report(core=core, ncol=3, text_width=80, sort=True, additional=None, optional=None)
     print(text)
@@ -25,6 +36,7 @@ def centers_to_lines(center_coords, lengths, frac_dir, assign_id=True) -> pv.Pol
 
     :return: Pyvista polydata with the same number of fracture as centers.
     """
+    import pyvista as pv
 
     half_lengths = lengths/2
     xyz1 = center_coords.copy()
@@ -47,53 +59,128 @@ def centers_to_lines(center_coords, lengths, frac_dir, assign_id=True) -> pv.Pol
     return lines
 
 
+@profiled
 def KM(z_values, Z, delta_list):
 
     """
     Calculate the Kaplan-Meier curve given an input z, data Z and list of deltas.
+    The ^p estimator (formula 2.6) is calculated once for the data as a cumulative product and
+    the input values are then located in the sorted data with np.searchsorted. Tied values
+    are all included in the product up to the input value and, within the ties, the complete values are
+    placed before the censored ones (i.e. the censored values are still at risk at the tied value).
+
     :param z_values: Input
     :param Z: Data (sorted)
     :param delta_list: list of deltas (sorted as Z)
     :return:
     """
 
-    def p_cap(n, j_index, d_list):
-        """
-        Calculate the ^p estimator (formula 2.6)
-        :param n: total number
-        :param j_index: index list
-        :param d_list: delta list
-        :return:
-        """
-        product = 1  # initiate product as 1 (so that the first step p1 will be product=p1
-
-        for j in j_index:  # for each index in the index list
-            d = d_list[j]
-            real_j = j+1
-            p = ((n - real_j) / (n - real_j + 1)) ** d
-            product *= p
-
-        return 1 - product
+    z_values = np.asarray(z_values, dtype=float)
+    Z = np.asarray(Z)
+    delta_list = np.asarray(delta_list)
 
     # Sort Z in case it is not sorted at input (also delta_list needs to be sorted in the same order of Z)
-    sorted_args = np.argsort(Z)
+    sorted_args = np.lexsort((-delta_list, Z))
     Z_sort = Z[sorted_args]
     delta_list_sort = delta_list[sorted_args]
 
-    G = np.ones_like(z_values)
     n = len(Z)
-    for i, z in enumerate(z_values):
-        if z < Z_sort[0]:
-            G[i] = 0
-        elif z <= Z_sort[-1]:
-            j_index = np.where(Z_sort <= z)[0]  # Get the index in which the data Z is lower than z
-            G[i] = p_cap(n, j_index, delta_list_sort)  # Calculate the p_cap
-        elif z > Z_sort[-1]:
-            G[i] = 1
+    real_j = np.arange(1, n+1)
+    p = ((n - real_j) / (n - real_j + 1)) ** delta_list_sort  # ^p estimator for each j
+    product = np.cumprod(p)
+
+    index = np.searchsorted(Z_sort, z_values, side='right') - 1  # Last index in which the data Z is lower than z
+
+    G = np.ones_like(z_values)  # z > Z_sort[-1] is 1
+    G[z_values < Z_sort[0]] = 0
+    inside = (z_values >= Z_sort[0]) & (z_values <= Z_sort[-1])
+    G[inside] = 1 - product[index[inside]]
 
     return G
 
 
+def vtk_lines_arrays(vtk_obj: pv.PolyData) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Get the offsets and connectivity arrays of the line cells of a PolyData (i.e. the lines without padding).
+
+    :param vtk_obj: Input PolyData
+    :return: offsets and connectivity arrays. The point ids of cell c are connectivity[offsets[c]:offsets[c+1]]
+    """
+    from vtkmodules.util.numpy_support import vtk_to_numpy
+
+    lines = vtk_obj.GetLines()
+    offsets = vtk_to_numpy(lines.GetOffsetsArray()).astype(int)
+    connectivity = vtk_to_numpy(lines.GetConnectivityArray()).astype(int)
+
+    return offsets, connectivity
+
+
+@profiled
+def vtk_regions_to_lines(vtk_obj: pv.PolyData, region_ids: np.ndarray,
+                         close: bool = False) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Convert the line cells of a PolyData in a LineString for each region. The cells are sorted by region id and the
+    connectivity is sliced once so that all the LineStrings are built in bulk. The points of each region are taken
+    once, in order of first appearance in the connectivity of the region cells.
+
+    :param vtk_obj: Input PolyData
+    :param region_ids: Region id of each cell
+    :param close: If True, close the LineStrings by adding the first point at the end (if different from the last).
+     Default is False
+    :return: Sorted unique region ids and array of the corresponding LineStrings
+    """
+
+    offsets, connectivity = vtk_lines_arrays(vtk_obj)
+    n_cell_points = np.diff(offsets)
+
+    regions, region_index = np.unique(region_ids, return_inverse=True)
+
+    # Slice the connectivity of the cells sorted by region
+    order = np.argsort(region_index, kind='stable')
+    starts = offsets[:-1][order]
+    lengths = n_cell_points[order]
+    conn_index = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+    point_ids = connectivity[conn_index]
+    point_regions = np.repeat(region_index[order], lengths)
+
+    # Keep the first appearance of each point in each region
+    keys = point_regions * vtk_obj.n_points + point_ids
+    _, first = np.unique(keys, return_index=True)
+    first = np.sort(first)
+    point_ids = point_ids[first]
+    point_regions = point_regions[first]
+
+    coords = vtk_obj.points[point_ids]
+
+    if close:
+        region_starts = np.searchsorted(point_regions, np.arange(len(regions)))
+        region_ends = np.append(region_starts[1:], len(point_regions)) - 1
+        is_open = np.any(coords[region_starts] != coords[region_ends], axis=1)
+        coords = np.insert(coords, region_ends[is_open] + 1, coords[region_starts[is_open]], axis=0)
+        point_regions = np.insert(point_regions, region_ends[is_open] + 1, np.where(is_open)[0])
+
+    geometry = linestrings(coords, indices=point_regions)
+
+    return regions, geometry
+
+
+def grid_bboxes(bounds: tuple, n_x: int, n_y: int) -> list:
+    """
+    Split the given bounds in a regular grid of bounding boxes.
+
+    :param bounds: Bounds to split (xmin, ymin, xmax, ymax)
+    :param n_x: Number of columns
+    :param n_y: Number of rows
+    :return: List of bounding boxes (xmin, ymin, xmax, ymax) ordered by row
+    """
+
+    x = np.linspace(bounds[0], bounds[2], n_x + 1)
+    y = np.linspace(bounds[1], bounds[3], n_y + 1)
+
+    return [(x[i], y[j], x[i+1], y[j+1]) for j in range(n_y) for i in range(n_x)]
+
+
 def ecdf_find_x(samples: np.ndarray, ecdf_prob: np.ndarray, y_values: np.ndarray) -> list:
     """
     Find the corresponding sample value of the ecdf given an array of y values
@@ -160,6 +247,7 @@ def setFigLinesBW(fig):
         setAxLinesBW(ax)
 
 
+@profiled
 def shp2vtk(df: GeoDataFrame, nodes=False) -> pv.PolyData:
     """
     Quickly convert a GeoDataFrame to a PolyData
@@ -171,42 +259,24 @@ def shp2vtk(df: GeoDataFrame, nodes=False) -> pv.PolyData:
     ------
     All the columns of the geodataframe, except for the geomtry column, will be written as cell data
     """
+    import pyvista as pv
+    from vtkmodules.vtkFiltersCore import vtkCleanPolyData
 
-    get_coord_df = df.geometry.get_coordinates(ignore_index=False, index_parts=True)
-    get_coord_df.reset_index(inplace=True)
-    get_coord_df.columns = ['parts', 'indexes', 'x', 'y']
-    get_coord_df['indexes'] = range(0, len(get_coord_df))
-    get_coord_df['parts'] += 1
-
-    get_coord_df['z'] = np.zeros(len(get_coord_df['x']))
-    get_coord_df['points'] = get_coord_df.loc[:, ['x', 'y', 'z']].values.tolist()
-    get_coord_df['points'] = get_coord_df['points'].map(tuple)
-    duplicate_mask_first = get_coord_df.duplicated(subset=['x', 'y', 'z'], keep='last')
-    first_repeats = get_coord_df[duplicate_mask_first]
-    # other_repeats = get_coord_df[duplicate_mask_other]
+    coords, parts = get_coordinates(df.geometry.values, return_index=True)
+    points = np.column_stack((coords, np.zeros(len(coords))))
 
-    values = first_repeats['indexes'].values
-    keys = first_repeats['points'].values
-
-    unique_values_dict = dict(zip(keys, values))
-
-    # to change the indexes as the ones that are in the dict we get the values from the dict with apply(get) and fill the na with the index column.
-    get_coord_df['indexes'] = get_coord_df['points'].apply(func=lambda x: unique_values_dict.get(x)).fillna(
-        get_coord_df['indexes']).astype(int)
-
-    mem = 0
-    conn = list()
-    for part, index in zip(get_coord_df['parts'], get_coord_df.index):
-        if part != mem:
-            nparts = len(get_coord_df[get_coord_df['parts'] == part])
-            conn.append(nparts)
-        conn.append(get_coord_df.loc[index, 'indexes'])
-        mem = part
-
-    points = np.array(get_coord_df.loc[:, ['x', 'y', 'z']].values.tolist())
     if nodes:
         vtk_obj = pv.PolyData(points)
     else:
+        # Collapse the exactly repeated points in one and write the connectivity of each geometry as
+        # [n_points, id_1, ..., id_n] (geometries without coordinates do not create a line)
+        points, connectivity = np.unique(points, axis=0, return_inverse=True)
+        connectivity = connectivity.reshape(-1)
+        n_points = np.bincount(parts)
+        n_points = n_points[n_points > 0]
+        offsets = np.cumsum(n_points) - n_points
+        conn = np.insert(connectivity, offsets, n_points)
+
         vtk_obj = pv.PolyData(points, lines=conn)
 
     arrays = list(df.columns)
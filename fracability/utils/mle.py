@@ -0,0 +1,246 @@
+"""
+Maximum likelihood fit of the common length distributions (lognorm, weibull_min, expon, gamma and norm) on complete
+and right censored data.
+
+The log-likelihood of the sample is
+
+    LL = sum(log f(x_i)) + sum(log S(c_j))
+
+where x_i are the complete (uncensored) values, c_j the right censored values, f the pdf and S the survival
+function. For each distribution the log-likelihood and its gradient are written in closed form with respect to
+unconstrained parameters (log of the shape and scale parameters) together with the Hessian, so that a Newton trust
+region method is used. The exponential distribution is solved in closed form, as norm, lognorm and gamma without
+censored values. The derivative of the gamma survival function with respect to the shape parameter is not available
+in closed form, so gamma is fitted only on complete values (see CENSORED_DISTRIBUTIONS).
+
+The location is fixed to 0 except for norm, as in fracability.Statistics.fit_distribution. The fitted parameters
+are returned in the scipy order (e.g. (s, loc, scale) for lognorm).
+"""
+
+import numpy as np
+from scipy.optimize import minimize
+from scipy.special import digamma, log_ndtr, polygamma
+
+DISTRIBUTIONS = ['lognorm', 'weibull_min', 'expon', 'gamma', 'norm']
+CENSORED_DISTRIBUTIONS = ['lognorm', 'weibull_min', 'expon', 'norm']  # distributions fitted also on censored values
+
+_LOG_2PI = np.log(2 * np.pi)
+
+
+def _norm_hazard(z: np.ndarray) -> np.ndarray:
+    """Hazard function of the standard normal (inverse Mills ratio) phi(z)/(1-Phi(z)), stable for large z"""
+
+    return np.exp(-0.5 * z ** 2 - 0.5 * _LOG_2PI - log_ndtr(-z))
+
+
+def _normal_family(theta: np.ndarray, u: np.ndarray, v: np.ndarray) -> tuple:
+    """
+    Negative log-likelihood, gradient and Hessian of the normal distribution in (mu, log sigma) for complete values u
+    and right censored values v. Used for norm (u = x) and lognorm (u = ln x).
+    """
+
+    mu, eta = theta
+    sigma = np.exp(eta)
+
+    z = (u - mu) / sigma
+    zc = (v - mu) / sigma
+    h = _norm_hazard(zc)
+    dh = h * (h - zc)  # derivative of the hazard with respect to z
+
+    ll = np.sum(-eta - 0.5 * _LOG_2PI - 0.5 * z ** 2) + np.sum(log_ndtr(-zc))
+
+    grad = np.array([np.sum(z) / sigma + np.sum(h) / sigma,
+                     np.sum(z ** 2 - 1) + np.sum(h * zc)])
+
+    hess = np.empty((2, 2))
+    hess[0, 0] = -len(u) / sigma ** 2 - np.sum(dh) / sigma ** 2
+    hess[0, 1] = hess[1, 0] = -2 * np.sum(z) / sigma - np.sum(dh * zc + h) / sigma
+    hess[1, 1] = -2 * np.sum(z ** 2) - np.sum(zc * (dh * zc + h))
+
+    return -ll, -grad, -hess
+
+
+def _weibull(theta: np.ndarray, x: np.ndarray, xc: np.ndarray) -> tuple:
+    """Negative log-likelihood, gradient and Hessian of weibull_min in (log c, log scale)"""
+
+    kappa, nu = theta
+    c = np.exp(kappa)
+
+    log_x = np.log(x)
+    w = log_x - nu
+    w_all = np.concatenate((w, np.log(xc) - nu))
+
+    L = c * w_all  # log((x/scale)^c)
+    y = np.exp(L)  # (x/scale)^c
+
+    ll = np.sum(kappa + c * w - log_x) - np.sum(y)
+
+    grad = np.array([len(x) + c * np.sum(w) - np.sum(L * y),
+                     -c * len(x) + c * np.sum(y)])
+
+    hess = np.empty((2, 2))
+    hess[0, 0] = c * np.sum(w) - np.sum(L * y * (1 + L))
+    hess[0, 1] = hess[1, 0] = -c * len(x) + c * np.sum(y * (1 + L))
+    hess[1, 1] = -c ** 2 * np.sum(y)
+
+    return -ll, -grad, -hess
+
+
+def _complete_gamma(x: np.ndarray) -> tuple:
+    """
+    Gamma fit on complete values: the shape solves ln(a) - digamma(a) = ln(mean(x)) - mean(ln(x)) (solved with
+    Newton iterations) and the scale is mean(x)/a
+    """
+
+    mean = np.mean(x)
+    s = np.log(mean) - np.mean(np.log(x))
+
+    if s <= 0:
+        return None
+
+    a = (3 - s + np.sqrt((s - 3) ** 2 + 24 * s)) / (12 * s)
+    for _ in range(50):
+        step = (np.log(a) - digamma(a) - s) / (1 / a - polygamma(1, a))
+        a = max(a - step, a / 10)
+        if abs(step) < 1e-12 * a:
+            break
+
+    return float(a), 0.0, float(mean / a)
+
+
+def _start(distribution_name: str, x: np.ndarray, xc: np.ndarray) -> np.ndarray:
+    """Starting values of the unconstrained parameters, from the moments of all the values"""
+
+    values = np.concatenate((x, xc))
+
+    if distribution_name == 'norm':
+        return np.array([np.mean(values), np.log(np.std(values) or 1.0)])
+
+    if distribution_name == 'lognorm':
+        log_values = np.log(values)
+        return np.array([np.mean(log_values), np.log(np.std(log_values) or 1.0)])
+
+    if distribution_name == 'weibull_min':
+        # ln x of a Weibull variable is Gumbel distributed with std pi/(c*sqrt(6)). The scale maximizes the
+        # likelihood for the given c
+        std = np.std(np.log(values)) or 1.0
+        c = np.pi / (std * np.sqrt(6))
+        scale = (np.sum(values ** c) / len(x)) ** (1 / c)
+        return np.array([np.log(c), np.log(scale)])
+
+
+def _params_to_theta(distribution_name: str, params: tuple) -> np.ndarray:
+    """Convert parameters in the scipy order to the unconstrained parameters used by the likelihood functions"""
+
+    if distribution_name == 'norm':
+        return np.array([params[0], np.log(params[1])])
+    elif distribution_name == 'lognorm':
+        return np.array([np.log(params[2]), np.log(params[0])])
+    else:
+        return np.array([np.log(params[0]), np.log(params[2])])
+
+
+def fit(distribution_name: str, uncensored: np.ndarray, censored: np.ndarray = None, start: tuple = None) -> tuple:
+    """
+    Fit a distribution with maximum likelihood on complete and right censored values.
+
+    :param distribution_name: Name of the distribution (see DISTRIBUTIONS)
+    :param uncensored: Array of the complete values
+    :param censored: Array of the right censored values. Default is None (no censored values). Censored values are
+     supported only by the CENSORED_DISTRIBUTIONS
+    :param start: Starting parameters in the scipy order (e.g. the parameters fitted on the original sample when
+     fitting bootstrap replicates). If None (default) or if the fit from start does not converge the starting
+     values are estimated from the moments of the data
+    :return: Tuple of the fitted parameters in the scipy order or None if the fit did not converge
+    """
+
+    if distribution_name not in DISTRIBUTIONS:
+        raise ValueError(f'{distribution_name} is not supported, the supported distributions are {DISTRIBUTIONS}')
+
+    x = np.asarray(uncensored, dtype=float)
+    xc = np.zeros(0) if censored is None else np.asarray(censored, dtype=float)
+
+    if len(xc) > 0 and distribution_name not in CENSORED_DISTRIBUTIONS:
+        raise ValueError(f'{distribution_name} cannot be fitted on censored values, the supported distributions are '
+                         f'{CENSORED_DISTRIBUTIONS}')
+
+    if len(x) == 0:
+        return None  # The likelihood has no maximum without complete values
+
+    if distribution_name == 'expon':
+        return 0.0, float((np.sum(x) + np.sum(xc)) / len(x))
+
+    if distribution_name != 'norm' and (np.any(x <= 0) or np.any(xc <= 0)):
+        return None
+
+    # Closed forms without censored values
+    if distribution_name == 'gamma':
+        return _complete_gamma(x)
+
+    if len(xc) == 0 and len(x) > 1:
+        if distribution_name == 'norm':
+            return float(np.mean(x)), float(np.std(x))
+        elif distribution_name == 'lognorm':
+            log_x = np.log(x)
+            return float(np.std(log_x)), 0.0, float(np.exp(np.mean(log_x)))
+
+    if distribution_name == 'norm':
+        objective, args = _normal_family, (x, xc)
+    elif distribution_name == 'lognorm':
+        objective, args = _normal_family, (np.log(x), np.log(xc))
+    else:
+        objective, args = _weibull, (x, xc)
+
+    starts = [_start(distribution_name, x, xc)]
+    if start is not None:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            theta0 = _params_to_theta(distribution_name, start)
+        if np.all(np.isfinite(theta0)):
+            starts.insert(0, theta0)
+
+    for theta0 in starts:
+        theta = _minimize(objective, args, theta0, len(x) + len(xc))
+        if theta is not None:
+            break
+    else:
+        return None
+
+    first, second = theta
+
+    if distribution_name == 'norm':
+        return float(first), float(np.exp(second))
+    elif distribution_name == 'lognorm':
+        return float(np.exp(second)), 0.0, float(np.exp(first))
+    else:
+        return float(np.exp(first)), 0.0, float(np.exp(second))
+
+
+def _minimize(objective, args: tuple, theta0: np.ndarray, n_values: int) -> np.ndarray:
+    """Minimize the negative log-likelihood from theta0, return the optimum or None if it did not converge"""
+
+    # The mean negative log-likelihood is minimized so that the size of the first steps does not depend on the
+    # number of values
+    cache = dict()  # the value, gradient and Hessian are calculated once for each point
+
+    def evaluate(theta):
+        key = theta.tobytes()
+        if key not in cache:
+            cache.clear()
+            cache[key] = [value / n_values for value in objective(theta, *args)]
+        return cache[key]
+
+    # The default gtol (1e-4) stops the Newton steps before the optimum of the mean log-likelihood is reached, the
+    # quadratic convergence makes the few extra steps cheap
+    result = minimize(lambda theta: evaluate(theta)[0], theta0, method='trust-exact',
+                      jac=lambda theta: evaluate(theta)[1], hess=lambda theta: evaluate(theta)[2],
+                      options={'gtol': 1e-10})
+
+    if not np.all(np.isfinite(result.x)) or not np.isfinite(result.fun):
+        return None
+
+    # The line search can stop close to the optimum with a precision loss warning, accept the result if the
+    # gradient is small
+    if not result.success and np.max(np.abs(result.jac)) > 1e-6:
+        return None
+
+    return result.x
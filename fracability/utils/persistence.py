@@ -0,0 +1,127 @@
+"""
+Collection of methods used to save and load the complete state of a FractureNetwork (nodes, fractures, boundaries,
+backbones and activation flags) and optionally the fitted distributions of a NetworkFitter.
+
+The network is saved in a directory with a GeoParquet file (WKB geometries) for each type of component and a
+json file with the components, their activation flags and the fitted parameters. Since the saved geometries and
+nodes are the ones of the analysed network, loading does not repeat any tidying or topology calculation.
+"""
+
+import json
+import os
+
+import pandas as pd
+from geopandas import GeoDataFrame, read_parquet
+
+COMPONENT_FILES = {'nodes': 'nodes.parquet',
+                   'fractures': 'fractures.parquet',
+                   'boundary': 'boundaries.parquet',
+                   'backbone': 'backbone.parquet'}
+
+COMPONENT_KEYS = {'nodes': 'n_type', 'fractures': 'f_set', 'boundary': 'b_group', 'backbone': 'f_set'}
+
+METADATA_FILE = 'network.json'
+
+
+def save_network(fracture_network, path: str, fitter=None):
+    """
+    Save a FractureNetwork in a GeoParquet dataset.
+
+    :param fracture_network: FractureNetwork object
+    :param path: Path of the directory of the dataset. If it does not exist it will be created
+    :param fitter: NetworkFitter object whose fitted distributions are saved with the network. Default is None
+    """
+
+    if not os.path.isdir(path):
+        os.makedirs(path)
+
+    components_df = fracture_network.entity_df
+
+    for component_type, file_name in COMPONENT_FILES.items():
+        objects = components_df.loc[components_df['type'] == component_type, 'object']
+
+        if not objects.empty:
+            gdf = pd.concat([GeoDataFrame(), *[obj.entity_df for obj in objects]], ignore_index=True)
+            gdf = GeoDataFrame(gdf, geometry='geometry', crs=fracture_network.crs)
+            gdf.to_parquet(os.path.join(path, file_name), index=False)
+
+    # The components are saved in the order in which they were added to the network
+    components = [{'type': row['type'], 'key': int(row[COMPONENT_KEYS[row['type']]]), 'active': int(row['active'])}
+                  for _, row in components_df.iterrows()]
+
+    metadata = {'components': components}
+
+    if fitter is not None:
+        records = fitter.fit_records()
+        metadata['fit'] = {'use_survival': bool(fitter.network_data.use_survival),
+                           'complete_only': bool(fitter.network_data.complete_only),
+                           'use_AIC': bool(fitter.use_AIC),
+                           'distributions': [{'name': name,
+                                              'parameters': [float(p) for p in distribution.distribution_parameters]}
+                                             for name, distribution in zip(records['name'], records['distribution'])]}
+
+    with open(os.path.join(path, METADATA_FILE), 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+
+def load_network(path: str, return_fitter: bool = False):
+    """
+    Load a FractureNetwork saved with save_network.
+
+    :param path: Path of the directory of the dataset
+    :param return_fitter: If True return also a NetworkFitter with the saved fitted distributions (None if no
+     distribution was saved). Default is False
+    :return: FractureNetwork object (and NetworkFitter object if return_fitter is True)
+    """
+    from fracability.Entities import FractureNetwork, Nodes, Fractures, Boundary, Backbone
+
+    with open(os.path.join(path, METADATA_FILE)) as f:
+        metadata = json.load(f)
+
+    tables = {component_type: read_parquet(os.path.join(path, file_name))
+              for component_type, file_name in COMPONENT_FILES.items()
+              if os.path.isfile(os.path.join(path, file_name))}
+
+    fracture_network = FractureNetwork()
+
+    for component in metadata['components']:
+        component_type, key = component['type'], component['key']
+        table = tables[component_type]
+        gdf = table.loc[table[COMPONENT_KEYS[component_type]] == key].reset_index(drop=True)
+
+        if component_type == 'nodes':
+            fracture_network.add_nodes(Nodes(gdf=gdf, node_type=key))
+        elif component_type == 'fractures':
+            fracture_network.add_fractures(Fractures(gdf=gdf, set_n=key))
+        elif component_type == 'boundary':
+            fracture_network.add_boundaries(Boundary(gdf=gdf, group_n=key))
+        else:
+            fracture_network.add_backbone(Backbone(gdf=gdf, set_n=key))
+
+    active = {component_type: [c['key'] for c in metadata['components']
+                               if c['type'] == component_type and c['active'] == 1]
+              for component_type in COMPONENT_FILES}
+
+    if 'nodes' in tables:
+        fracture_network.activate_nodes(active['nodes'])
+    if 'fractures' in tables:
+        fracture_network.activate_fractures(active['fractures'])
+    if 'boundary' in tables:
+        fracture_network.activate_boundaries(active['boundary'])
+
+    if not return_fitter:
+        return fracture_network
+
+    fitter = None
+
+    if 'fit' in metadata:
+        from fracability.Statistics import NetworkFitter
+
+        fit = metadata['fit']
+        fitter = NetworkFitter(fracture_network, use_survival=fit['use_survival'],
+                               complete_only=fit['complete_only'], use_AIC=fit['use_AIC'])
+        fitter.add_fitted_distributions([d['name'] for d in fit['distributions']],
+                                        [tuple(d['parameters']) for d in fit['distributions']])
+
+    return fracture_network, fitter
+
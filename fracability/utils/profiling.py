@@ -0,0 +1,231 @@
+"""
+Opt-in instrumentation of the main processing stages (geometry tidying, topology, vtk and graph representations,
+fitting). When enabled, each profiled stage records the number of calls, the wall time, the number of processed
+items and optionally the peak memory (traced with tracemalloc). When disabled the profiled functions are called
+directly, with the cost of a single flag check.
+
+Progress of the long loops is reported through a throttled progress callback instead of printing each iteration.
+
+The records are kept at module level and are not thread safe. Stages run in other processes (e.g. with a
+ProcessPoolExecutor) are not recorded.
+
+Examples:
+    >>> from fracability.utils import profiling
+    >>> with profiling.profile(memory=True):
+    ...     fracture_network.calculate_topology()
+    >>> profiling.report_df()
+"""
+
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+
+from pandas import DataFrame
+
+_enabled: bool = False
+_trace_memory: bool = False
+_started_tracemalloc: bool = False  # True if tracemalloc was started by enable (and so is stopped by disable)
+_records: dict = dict()  # stage: {'calls', 'time', 'items', 'peak_memory'}
+_stack: list = []  # open stages: [name, start time, start memory, peak memory]
+
+_progress_interval: float = 0.5
+_progress_last: dict = dict()  # stage: time of the last call of the progress callback
+
+
+def print_progress(stage: str, done: int, total: int):
+    """Default progress callback: print the progress of the stage on a single line"""
+
+    end = '\n' if done >= total else '\r'
+    print(f'{stage}: {done}/{total}', end=end)
+
+
+_progress_callback = print_progress  # function called by progress, None to disable the progress report
+
+
+def enable(memory: bool = False):
+    """
+    Enable the recording of the profiled stages.
+
+    :param memory: Record also the peak memory of each stage using tracemalloc. This slows down the
+     execution. Default is False
+    """
+    global _enabled, _trace_memory, _started_tracemalloc
+
+    _enabled = True
+    _trace_memory = memory
+
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracemalloc = True
+
+
+def disable():
+    """Disable the recording of the profiled stages. The records are kept until reset is called. tracemalloc is
+    stopped only if it was started by enable."""
+    global _enabled, _trace_memory, _started_tracemalloc
+
+    if _started_tracemalloc and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _started_tracemalloc = False
+
+    _enabled = False
+    _trace_memory = False
+    _stack.clear()
+
+
+def is_enabled() -> bool:
+    """Return True if the recording is enabled"""
+
+    return _enabled
+
+
+def reset():
+    """Delete the records"""
+
+    _records.clear()
+
+
+@contextmanager
+def profile(memory: bool = False, reset_records: bool = True):
+    """
+    Context manager used to enable the recording only inside a block.
+
+    :param memory: Record also the peak memory of each stage. Default is False
+    :param reset_records: Delete the previous records when entering the block. Default is True
+    """
+
+    if reset_records:
+        reset()
+
+    enable(memory)
+    try:
+        yield
+    finally:
+        disable()
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Context manager used to record a stage. Stages can be nested: the time and memory of a stage include the ones
+    of the inner stages.
+
+    :param name: Name of the stage
+    """
+
+    if not _enabled:
+        yield
+        return
+
+    start_memory = 0
+    if _trace_memory:
+        current, peak = tracemalloc.get_traced_memory()
+        if _stack:
+            _stack[-1][3] = max(_stack[-1][3], peak)  # keep the peak of the outer stage before resetting it
+        tracemalloc.reset_peak()
+        start_memory = current
+
+    _stack.append([name, time.perf_counter(), start_memory, 0])
+
+    try:
+        yield
+    finally:
+        name, start_time, start_memory, inner_peak = _stack.pop()
+
+        record = _records.setdefault(name, {'calls': 0, 'time': 0.0, 'items': 0, 'peak_memory': None})
+        record['calls'] += 1
+        record['time'] += time.perf_counter() - start_time
+
+        if _trace_memory:
+            peak = max(inner_peak, tracemalloc.get_traced_memory()[1])
+            record['peak_memory'] = max(record['peak_memory'] or 0, peak - start_memory)
+            if _stack:
+                _stack[-1][3] = max(_stack[-1][3], peak)
+
+
+def profiled(function):
+    """
+    Decorator used to record each call of the function as a stage named module.function (e.g.
+    Geometry.tidy_intersections).
+    """
+
+    name = f'{function.__module__.split(".")[-1]}.{function.__qualname__}'
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return function(*args, **kwargs)
+        with stage(name):
+            return function(*args, **kwargs)
+
+    return wrapper
+
+
+def add_items(n_items: int):
+    """
+    Add the number of processed items (e.g. lines, pairs, nodes) to the innermost open stage.
+
+    :param n_items: Number of items
+    """
+
+    if _enabled and _stack:
+        _records.setdefault(_stack[-1][0], {'calls': 0, 'time': 0.0, 'items': 0, 'peak_memory': None})
+        _records[_stack[-1][0]]['items'] += int(n_items)
+
+
+def set_progress_callback(callback=print_progress, interval: float = 0.5):
+    """
+    Set the function called to report the progress of the long loops.
+
+    :param callback: Function callback(stage, done, total). Use None to disable the progress report.
+     Default is print_progress
+    :param interval: Minimum time in seconds between two calls of the callback. The callback is always called at
+     the end of the loop. Default is 0.5
+    """
+    global _progress_callback, _progress_interval
+
+    _progress_callback = callback
+    _progress_interval = interval
+
+
+def progress(stage_name: str, done: int, total: int):
+    """
+    Report the progress of a loop through the progress callback, at most once every interval seconds.
+
+    :param stage_name: Name of the loop
+    :param done: Number of items processed
+    :param total: Total number of items
+    """
+
+    if _progress_callback is None:
+        return
+
+    now = time.monotonic()
+    if done >= total or now - _progress_last.get(stage_name, 0) >= _progress_interval:
+        _progress_last[stage_name] = now
+        _progress_callback(stage_name, done, total)
+
+
+def report() -> dict:
+    """
+    Return the records of the profiled stages.
+
+    :return: Dictionary {stage: {'calls', 'time', 'items', 'peak_memory'}}. Time is in seconds and peak_memory in
+     bytes (None if the memory was not traced)
+    """
+
+    return {name: dict(record) for name, record in _records.items()}
+
+
+def report_df() -> DataFrame:
+    """
+    Return the records of the profiled stages as a DataFrame sorted by time.
+
+    :return: DataFrame indexed by stage with the calls, time, items and peak_memory columns
+    """
+
+    df = DataFrame.from_dict(report(), orient='index', columns=['calls', 'time', 'items', 'peak_memory'])
+    df.index.name = 'stage'
+
+    return df.sort_values(by='time', ascending=False)
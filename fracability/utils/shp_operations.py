@@ -2,8 +2,23 @@
 import numpy as np
 import shapely.geometry as geom
 from shapely.affinity import scale
+from shapely import get_coordinates
 from shapely.ops import split
 
+
+def line_coords(line) -> np.ndarray:
+    """Function used to get the coordinates array of a line (with z only if the line has z)"""
+
+    return get_coordinates(line, include_z=line.has_z)
+
+
+def join_lines(lines) -> geom.LineString:
+    """Function used to join the coordinates of the given lines in a single LineString (the joined vertex is repeated).
+    The coordinates are concatenated as arrays, avoiding the creation of a tuple for each vertex of long lines."""
+
+    return geom.LineString(np.concatenate([line_coords(line) for line in lines]))
+
+
 def int_node(line1, line2, idx_list, gdf):
     """
     Function used to add the intersection node to a line crossed or touched by a second line.
@@ -38,34 +53,33 @@ def int_node(line1, line2, idx_list, gdf):
     try:
         if line1.crosses(line2):
             split_lines1 = split(line1, line2)
-            outcoords1 = [list(i.coords) for i in split_lines1.geoms]
             split_lines2 = split(line2, line1)
-            outcoords2 = [list(i.coords) for i in split_lines2.geoms]
 
-            new_line1 = geom.LineString([i for sublist in outcoords1 for i in sublist])
-            new_line2 = geom.LineString([i for sublist in outcoords2 for i in sublist])
+            new_line1 = join_lines(split_lines1.geoms)
+            new_line2 = join_lines(split_lines2.geoms)
             new_geom_dict[idx_list[0]] = new_line1
             new_geom_dict[idx_list[1]] = new_line2
         else:
             for counter in range(3):
-                if len(line2.coords) == 2:
+                line2_coords = line_coords(line2)
+                if len(line2_coords) == 2:
                     scaled_segment1 = scale(line2, xfact=fac, yfact=fac, origin=line2.boundary.geoms[0])
                     scaled_segment2 = scale(scaled_segment1, xfact=fac, yfact=fac, origin=scaled_segment1.boundary.geoms[1])
                     extended_line = geom.LineString(scaled_segment2)
-                elif len(line2.coords) == 3:
-                    first_seg = geom.LineString(line2.coords[:2])
-                    last_seg = geom.LineString(line2.coords[-2:])
+                elif len(line2_coords) == 3:
+                    first_seg = geom.LineString(line2_coords[:2])
+                    last_seg = geom.LineString(line2_coords[-2:])
                     scaled_first_segment = scale(first_seg, xfact=fac, yfact=fac, origin=first_seg.boundary.geoms[1])
                     scaled_last_segment = scale(last_seg, xfact=fac, yfact=fac, origin=last_seg.boundary.geoms[0])
                     extended_line = geom.LineString([*scaled_first_segment.coords, *scaled_last_segment.coords])
                 else:
-                    first_seg = geom.LineString(line2.coords[:2])
-                    last_seg = geom.LineString(line2.coords[-2:])
+                    first_seg = geom.LineString(line2_coords[:2])
+                    last_seg = geom.LineString(line2_coords[-2:])
                     # print(np.array(first_seg.boundary.geoms), idx_list)
                     scaled_first_segment = scale(first_seg, xfact=fac, yfact=fac, origin=first_seg.boundary.geoms[1])
                     scaled_last_segment = scale(last_seg, xfact=fac, yfact=fac, origin=last_seg.boundary.geoms[0])
-                    extended_line = geom.LineString(
-                        [*scaled_first_segment.coords, *line2.coords[2:-2], *scaled_last_segment.coords])
+                    extended_line = geom.LineString(np.concatenate((line_coords(scaled_first_segment), line2_coords[2:-2],
+                                                                    line_coords(scaled_last_segment))))
 
                 split_lines = split(line1, extended_line)
 
@@ -80,8 +94,7 @@ def int_node(line1, line2, idx_list, gdf):
                 elif len(split_lines.geoms) == 1 and counter >= 2:
                     new_geom_dict = {}
                 else:
-                    outcoords = [list(i.coords) for i in split_lines.geoms]
-                    new_line = geom.LineString([i for sublist in outcoords for i in sublist])
+                    new_line = join_lines(split_lines.geoms)
                     new_geom_dict[idx_list[counter]] = new_line
 
                     # # Plot results to visualize intersections
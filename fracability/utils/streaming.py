@@ -0,0 +1,207 @@
+"""
+Collection of methods used to read large shapefiles or GeoPackages in chunks (by row range and/or bounding box)
+instead of loading the whole file in memory with geopandas read_file. The chunks are read with pyogrio, using Arrow
+record batches when pyarrow is available, and can be fed directly to Fractures, Boundary or FractureNetwork objects.
+
+The index of each chunk is the FID of the features in the source file so that the og_line_id of the entities
+(index + 1) is the same as reading the whole file.
+"""
+
+from typing import Iterator
+
+import pandas as pd
+from geopandas import GeoDataFrame
+from shapely import from_wkb
+
+from fracability.utils.general_use import grid_bboxes  # bounding boxes of stream_network_tiles
+
+
+def _import_pyogrio():
+    try:
+        import pyogrio
+    except ImportError:
+        raise ImportError('pyogrio is needed to read files in chunks, install it with pip install pyogrio')
+    return pyogrio
+
+
+def _has_pyarrow() -> bool:
+    try:
+        import pyarrow
+    except ImportError:
+        return False
+    return True
+
+
+def read_chunks(path: str, chunk_size: int = 65536, bbox: tuple = None, rows: tuple = None, columns: list = None,
+                layer=None, use_arrow: bool = None) -> Iterator[GeoDataFrame]:
+    """
+    Read a vector file (shapefile, GeoPackage, ...) in chunks. Only one chunk at a time is kept in memory and
+    each chunk is yielded as soon as it is read.
+
+    :param path: Path of the file
+    :param chunk_size: Maximum number of features of each chunk. Default is 65536
+    :param bbox: Read only the features intersecting the bounding box (xmin, ymin, xmax, ymax). Default is None
+    :param rows: Read only the features in the row range (start, stop). If bbox is used, the range applies to the
+     filtered features. Default is None
+    :param columns: List of the columns to read. If None (default) all the columns are read
+    :param layer: Layer to read (for multi-layer files). Default is None (first layer)
+    :param use_arrow: Use Arrow record batches. If None (default) Arrow is used when pyarrow is available
+    :return: Iterator of GeoDataFrame chunks, indexed by the FID of the features
+    """
+
+    pyogrio = _import_pyogrio()
+
+    if use_arrow is None:
+        use_arrow = _has_pyarrow()
+
+    skip_features = 0
+    max_features = None
+
+    if rows is not None:
+        skip_features = rows[0]
+        max_features = rows[1] - rows[0]
+
+    if use_arrow:
+        from pyogrio.raw import open_arrow
+
+        # max_features is not supported by the Arrow stream, the end of the row range is applied on the batches
+        with open_arrow(path, layer=layer, columns=columns, bbox=bbox, skip_features=skip_features,
+                        return_fids=True, batch_size=chunk_size, use_pyarrow=True) as source:
+            meta, reader = source
+            geometry_name = meta['geometry_name'] or 'wkb_geometry'
+            fid_column = meta['fid_column']
+            remaining = max_features
+
+            for batch in reader:
+                if remaining is not None:
+                    if remaining <= 0:
+                        break
+                    batch = batch.slice(0, remaining)
+                    remaining -= batch.num_rows
+
+                df = batch.to_pandas()
+                geometry = from_wkb(df.pop(geometry_name).values)
+                fids = df.pop(fid_column).values if fid_column in df.columns else None
+                yield GeoDataFrame(df, geometry=geometry, crs=meta['crs'], index=pd.Index(fids))
+    else:
+        read = 0
+        while max_features is None or read < max_features:
+            n_features = chunk_size if max_features is None else min(chunk_size, max_features - read)
+
+            chunk = pyogrio.read_dataframe(path, layer=layer, columns=columns, bbox=bbox,
+                                           skip_features=skip_features + read, max_features=n_features,
+                                           fid_as_index=True)
+            if chunk.empty:
+                break
+
+            read += len(chunk)
+            chunk.index.name = None
+            yield chunk
+
+            if len(chunk) < n_features:
+                break
+
+
+def stream_fractures(path: str, set_n: int = 1, chunk_size: int = 65536, bbox: tuple = None, rows: tuple = None,
+                     **kwargs) -> Iterator:
+    """
+    Read a fracture file in chunks and yield a Fractures object for each chunk.
+
+    :param path: Path of the file
+    :param set_n: Set number of the fractures. Default is 1
+    :param chunk_size: Maximum number of fractures of each chunk. Default is 65536
+    :param bbox: Read only the fractures intersecting the bounding box (xmin, ymin, xmax, ymax). Default is None
+    :param rows: Read only the fractures in the row range (start, stop). Default is None
+    :param kwargs: Other arguments passed to read_chunks
+    :return: Iterator of Fractures objects
+    """
+    from fracability.Entities import Fractures
+
+    for chunk in read_chunks(path, chunk_size=chunk_size, bbox=bbox, rows=rows, **kwargs):
+        yield Fractures(gdf=chunk, set_n=set_n)
+
+
+def stream_boundaries(path: str, group_n: int = 1, chunk_size: int = 65536, bbox: tuple = None, rows: tuple = None,
+                      **kwargs) -> Iterator:
+    """
+    Read a boundary file in chunks and yield a Boundary object for each chunk.
+
+    :param path: Path of the file
+    :param group_n: Group number of the boundaries. Default is 1
+    :param chunk_size: Maximum number of boundaries of each chunk. Default is 65536
+    :param bbox: Read only the boundaries intersecting the bounding box (xmin, ymin, xmax, ymax). Default is None
+    :param rows: Read only the boundaries in the row range (start, stop). Default is None
+    :param kwargs: Other arguments passed to read_chunks
+    :return: Iterator of Boundary objects
+    """
+    from fracability.Entities import Boundary
+
+    for chunk in read_chunks(path, chunk_size=chunk_size, bbox=bbox, rows=rows, **kwargs):
+        yield Boundary(gdf=chunk, group_n=group_n)
+
+
+def _read_file(path: str, chunk_size: int = 65536, bbox: tuple = None, **kwargs) -> GeoDataFrame:
+    """
+    Internal function used to read all the chunks of a file in a single GeoDataFrame with a positional index. The
+    og_line_id (FID + 1, as when reading the whole file) is set on each chunk before the FID index is dropped.
+
+    :return: GeoDataFrame of the features read or None if no feature was read
+    """
+
+    chunks = [chunk if 'og_line_id' in chunk.columns else chunk.assign(og_line_id=chunk.index.values + 1)
+              for chunk in read_chunks(path, chunk_size=chunk_size, bbox=bbox, **kwargs)]
+
+    if not chunks:
+        return None
+
+    return pd.concat(chunks, ignore_index=True)
+
+
+def read_network(fractures: dict, boundaries: dict = None, bbox: tuple = None, chunk_size: int = 65536, **kwargs):
+    """
+    Build a FractureNetwork reading the fracture and boundary files in chunks. The chunks of each file are
+    concatenated and the entity is built once on the whole content read, which is kept in memory: with a bounding
+    box only the features intersecting it are read (so the memory depends on the size of the window), without it
+    the whole files are loaded. Use stream_fractures and stream_boundaries to process one chunk at a time.
+
+    :param fractures: Dictionary of the fracture files {set_n: path}
+    :param boundaries: Dictionary of the boundary files {group_n: path}. Default is None
+    :param bbox: Read only the features intersecting the bounding box (xmin, ymin, xmax, ymax). Default is None
+    :param chunk_size: Maximum number of features of each chunk. Default is 65536
+    :param kwargs: Other arguments passed to read_chunks
+    :return: FractureNetwork object
+    """
+    from fracability.Entities import FractureNetwork, Fractures, Boundary
+
+    fracture_network = FractureNetwork()
+
+    for set_n, path in fractures.items():
+        gdf = _read_file(path, chunk_size, bbox, **kwargs)
+        if gdf is not None:
+            fracture_network.add_fractures(Fractures(gdf=gdf, set_n=set_n))
+
+    if boundaries is not None:
+        for group_n, path in boundaries.items():
+            gdf = _read_file(path, chunk_size, bbox, **kwargs)
+            if gdf is not None:
+                fracture_network.add_boundaries(Boundary(gdf=gdf, group_n=group_n))
+
+    return fracture_network
+
+
+def stream_network_tiles(fractures: dict, boundaries: dict = None, bboxes: list = None,
+                         chunk_size: int = 65536, **kwargs) -> Iterator[tuple]:
+    """
+    Yield a FractureNetwork for each bounding box, so that each window can be processed while the following
+    ones are not yet read. Fractures crossing the edge of a window are read in all the windows they intersect.
+
+    :param fractures: Dictionary of the fracture files {set_n: path}
+    :param boundaries: Dictionary of the boundary files {group_n: path}. Default is None
+    :param bboxes: List of bounding boxes (xmin, ymin, xmax, ymax), see grid_bboxes
+    :param chunk_size: Maximum number of features of each chunk. Default is 65536
+    :param kwargs: Other arguments passed to read_chunks
+    :return: Iterator of (bbox, FractureNetwork) tuples
+    """
+
+    for bbox in bboxes:
+        yield bbox, read_network(fractures, boundaries, bbox, chunk_size, **kwargs)